@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark against a local HTTP stand-in for the gateway.
+
+Starts a ThreadingHTTPServer on localhost that answers chat completion
+requests with a fixed tool call after a simulated model latency, then sends
+the same requests through
+  - a new httpx client per request (a new connection every time),
+  - one pooled client from src.http_client.create_http_client,
+  - Portkey clients built by create_portkey_client on that pool (if portkey_ai
+    is installed), as main.py builds them.
+It reports throughput and the pool metrics (connections opened, reuse rate,
+peak in-flight). The stand-in is plain HTTP, so it shows the TCP setup that
+pooling saves but not the TLS handshakes it also saves against the real gateway.
+
+    python benchmarks/http_pool_bench.py --requests 200 --concurrency 8 --latency 0.02
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.http_client import PoolMetrics, create_http_client, create_portkey_client  # noqa: E402
+
+COMPLETION = {
+    "id": "chatcmpl-local",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "local-stand-in",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "tool_calls",
+        "message": {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": "call_0",
+                "type": "function",
+                "function": {"name": "reply_to_buyer", "arguments": "{\"text\": \"Hello, how can I help you today?\"}"}
+            }]
+        }
+    }],
+    "usage": {"prompt_tokens": 900, "completion_tokens": 20, "total_tokens": 920}
+}
+
+
+def make_handler(latency: float):
+    body = json.dumps(COMPLETION).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def request_payload():
+    return {
+        "model": "local-stand-in",
+        "messages": [{"role": "system", "content": "You are a sourcing concierge."}, {"role": "user", "content": "Hi"}],
+        "tool_choice": "required"
+    }
+
+
+def run(label: str, send, num_requests: int, concurrency: int, metrics: PoolMetrics = None):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: send(), range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    line = f"{label:<28}{num_requests / elapsed:>10.1f} req/s"
+    if metrics is not None:
+        stats = metrics.snapshot()
+        line += (f"  {stats['connections_opened']:>4} connections  {stats['reuse_rate']:>5.0%} reuse"
+                 f"  peak in flight {stats['peak_in_flight']}")
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request and pooled HTTP clients against a local server")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client setup (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated model latency in seconds (default: 0.02)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    url = base_url + "/chat/completions"
+
+    def unpooled():
+        with httpx.Client() as client:
+            client.post(url, json=request_payload()).raise_for_status()
+
+    run("new client per request", unpooled, args.requests, args.concurrency)
+
+    metrics = PoolMetrics()
+    with create_http_client(max_connections=args.concurrency, metrics=metrics) as client:
+        run("pooled httpx client", lambda: client.post(url, json=request_payload()).raise_for_status(),
+            args.requests, args.concurrency, metrics)
+
+    try:
+        import portkey_ai  # noqa: F401
+    except ImportError:
+        print("portkey_ai is not installed, skipping the Portkey client run")
+    else:
+        metrics = PoolMetrics()
+        with create_http_client(max_connections=args.concurrency + 1, metrics=metrics) as client:
+            light_client = create_portkey_client("local", None, client)
+            light_client.base_url = base_url
+            light_client.openai_client.base_url = base_url
+
+            def portkey_call():
+                light_client.chat.completions.create(messages=request_payload()["messages"], model="local-stand-in")
+
+            run("pooled Portkey client", portkey_call, args.requests, args.concurrency, metrics)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Prompt runtime micro-benchmark.
+
+Times the per-request overhead of building a task request and parsing its
+tool call with src.runtime.PromptRuntime, against rebuilding the messages and
+tool list on every request, and reports the bytes allocated per request
+(tracemalloc). A published candidate can be given; otherwise the default
+initial prompt is published to a temporary file.
+
+    python benchmarks/runtime_bench.py --turns 8 --requests 20000
+    python benchmarks/runtime_bench.py --candidate results/best_candidate.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.runtime import PromptRuntime, publish_candidate  # noqa: E402
+from src.tool_validator import ToolCallValidator  # noqa: E402
+from src.tools import get_available_tools  # noqa: E402
+
+FALLBACK_PROMPT = "You are a sourcing concierge AI assistant helping buyers find products and services. " * 20
+
+RESPONSE = {"choices": [{"message": {"role": "assistant", "content": None, "tool_calls": [{
+    "id": "call_0", "type": "function",
+    "function": {"name": "reply_to_buyer", "arguments": json.dumps({"text": "What quantity do you need?"})},
+}]}}]}
+
+
+def conversation(turns):
+    return [{"role": "user" if i % 2 == 0 else "assistant",
+             "content": f"Turn {i}: we need 250 ergonomic office chairs delivered to Berlin by March."}
+            for i in range(turns)]
+
+
+def rebuild_request(system_prompt, history):
+    """What the service did before: messages, tools and validator built per request."""
+    messages = [{"role": "system", "content": system_prompt}]
+    messages.extend(history)
+    return json.dumps({"messages": messages, "tools": get_available_tools(), "tool_choice": "required"}).encode("utf-8")
+
+
+def rebuild_parse(response):
+    tool_call = response["choices"][0]["message"]["tool_calls"][0]["function"]
+    parsed = {"name": tool_call["name"], "arguments": json.loads(tool_call["arguments"])}
+    if ToolCallValidator(get_available_tools()).validate(parsed):
+        raise ValueError("invalid tool call")
+    return parsed
+
+
+def measure(fn, requests):
+    """Microseconds and bytes allocated per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return seconds / requests * 1e6, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time per-request overhead of the prompt runtime")
+    parser.add_argument("--candidate", help="Published candidate file (default: the initial prompt)")
+    parser.add_argument("--turns", type=int, default=8, help="Conversation turns per request (default: 8)")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per measurement (default: 20000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.candidate
+        if path is None:
+            try:
+                from config.config import DEFAULT_INITIAL_PROMPT as prompt
+            except ImportError:
+                prompt = FALLBACK_PROMPT
+            path = publish_candidate(os.path.join(tmp, "best_candidate.json"), {"system_prompt": prompt})
+        runtime = PromptRuntime(path)
+        history = conversation(args.turns)
+        body = json.dumps(RESPONSE)
+
+        assert json.loads(runtime.build_request_body(history)) == json.loads(rebuild_request(runtime.system_prompt, history))
+
+        rows = [
+            ("rebuild + serialize per request", lambda: rebuild_request(runtime.system_prompt, history)),
+            ("runtime.build_request", lambda: runtime.build_request(history)),
+            ("runtime.build_request + json.dumps", lambda: json.dumps(runtime.build_request(history)).encode("utf-8")),
+            ("runtime.build_request_body", lambda: runtime.build_request_body(history)),
+            ("rebuild validator + parse", lambda: rebuild_parse(RESPONSE)),
+            ("runtime.parse_tool_call (dict)", lambda: runtime.parse_tool_call(RESPONSE)),
+            ("runtime.parse_tool_call (body)", lambda: runtime.parse_tool_call(body)),
+        ]
+        print(f"{args.turns}-turn conversation, {len(runtime.system_prompt):,} character system prompt, "
+              f"{len(runtime.tools)} tools, {args.requests:,} requests per row")
+        print(f"{'':<38}{'us/request':>12}{'bytes allocated':>18}")
+        for label, fn in rows:
+            micros, allocated = measure(fn, args.requests)
+            print(f"{label:<38}{micros:>12.1f}{allocated:>18,}")
+
+        start = time.perf_counter()
+        os.utime(path)
+        runtime._next_check = 0.0
+        reloaded = runtime.maybe_reload()
+        print(f"hot reload of the published candidate: {(time.perf_counter() - start) * 1e3:.2f} ms (reloaded: {reloaded})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Significance engine benchmark.
+
+Times the paired bootstrap interval and sign-flip permutation test of
+src.significance on synthetic per-instance score vectors, and a plain Python
+loop over resampled indices for comparison (with fewer resamples, scaled up
+to the same count).
+
+    python benchmarks/significance_bench.py --examples 1000 --resamples 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.significance import paired_bootstrap, sign_flip_test  # noqa: E402
+
+SCORES = [0.0, 0.5, 0.625, 0.75, 0.875, 1.0]
+
+
+def python_bootstrap(differences, resamples, seed=0):
+    rng = random.Random(seed)
+    n = len(differences)
+    means = sorted(sum(differences[rng.randrange(n)] for _ in range(n)) / n for _ in range(resamples))
+    return means[int(0.025 * resamples)], means[int(0.975 * resamples) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the vectorized significance tests against a Python loop")
+    parser.add_argument("--examples", type=int, default=1000, help="Paired scores per vector (default: 1000)")
+    parser.add_argument("--resamples", type=int, default=1_000_000, help="Resamples per test (default: 1000000)")
+    parser.add_argument("--loop-resamples", type=int, default=2000,
+                        help="Resamples for the Python loop, extrapolated (default: 2000)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    baseline = rng.choice(SCORES, args.examples)
+    candidate = np.clip(baseline + rng.choice([-0.25, 0.0, 0.0, 0.125, 0.25], args.examples), 0.0, 1.0)
+    differences = candidate - baseline
+
+    start = time.perf_counter()
+    interval = paired_bootstrap(differences, args.resamples)
+    bootstrap_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    p_value = sign_flip_test(differences, args.resamples)
+    permutation_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop_interval = python_bootstrap(list(differences), args.loop_resamples)
+    loop_seconds = (time.perf_counter() - start) * args.resamples / args.loop_resamples
+
+    print(f"{args.examples} paired scores, mean improvement {differences.mean():+.4f}")
+    print(f"vectorized bootstrap    {args.resamples:>10,} resamples {bootstrap_seconds:>8.2f}s  "
+          f"95% CI {interval['low']:+.4f} to {interval['high']:+.4f}")
+    print(f"vectorized permutation  {args.resamples:>10,} resamples {permutation_seconds:>8.2f}s  p={p_value:.2g}")
+    print(f"python loop bootstrap   {args.resamples:>10,} resamples {loop_seconds:>8.0f}s  (extrapolated from "
+          f"{args.loop_resamples:,}, 95% CI {loop_interval[0]:+.4f} to {loop_interval[1]:+.4f})")
+
+
+if __name__ == "__main__":
+    main()
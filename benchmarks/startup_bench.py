@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the entry points.
+
+Runs each command in a fresh interpreter under `python -X importtime`, and
+reports the median wall-clock time, the total import time and the slowest
+top-level imports. A command that exits non-zero fails the benchmark rather
+than being timed. With --budget-ms it exits non-zero when any command's
+median wall time is over budget, so it can run as a regression check.
+
+    python benchmarks/startup_bench.py
+    python benchmarks/startup_bench.py --runs 10 --budget-ms 300 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Environment the commands run with on top of the current one
+COMMAND_ENV = {"DATA_DIR": os.path.join(REPO_ROOT, "data")}
+
+COMMANDS = {
+    "main --help": ["main.py", "--help"],
+    "main --validate-data": ["main.py", "--validate-data"],
+    "generate_data --help": ["generate_data.py", "--help"],
+    "import data_generator": ["-c", "import src.data_generator"],
+    "bare interpreter": ["-c", "pass"],
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Top-level (cumulative microseconds, module) pairs from -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  "):
+            imports.append((name.strip(), int(cumulative)))
+    return imports
+
+
+def run_command(args: List[str]) -> Tuple[float, List[Tuple[str, int]]]:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=REPO_ROOT,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env={**os.environ, **COMMAND_ENV}
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{' '.join(args)} exited with status {completed.returncode}:\n" + "\n".join(errors[-10:]))
+    return wall_ms, parse_importtime(completed.stderr)
+
+
+def benchmark(name: str, args: List[str], runs: int) -> Dict[str, Any]:
+    wall_times = []
+    import_totals = []
+    imports = []
+    for _ in range(runs):
+        wall_ms, imports = run_command(args)
+        wall_times.append(wall_ms)
+        import_totals.append(sum(cumulative for _, cumulative in imports) / 1000)
+
+    slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "command": name,
+        "wall_ms": statistics.median(wall_times),
+        "import_ms": statistics.median(import_totals),
+        "slowest_imports": [{"module": module, "ms": cumulative / 1000} for module, cumulative in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure entry point startup time")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (default: 5)")
+    parser.add_argument("--budget-ms", type=float, help="Fail if any command's median wall time exceeds this")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = [benchmark(name, command, args.runs) for name, command in COMMANDS.items()]
+
+    print(f"{'command':<24}{'wall ms':>10}{'import ms':>12}  slowest imports")
+    for result in results:
+        slowest = ", ".join(f"{item['module']} {item['ms']:.1f}" for item in result["slowest_imports"][:3])
+        print(f"{result['command']:<24}{result['wall_ms']:>10.1f}{result['import_ms']:>12.1f}  {slowest}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None:
+        over = [r for r in results if r["wall_ms"] > args.budget_ms]
+        for result in over:
+            print(f"Over budget: {result['command']} took {result['wall_ms']:.1f} ms (budget {args.budget_ms:.1f} ms)")
+        if over:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ class OptimizationConfig:
     data_dir: str = os.getenv('DATA_DIR')
     train_split: str = "train"
     eval_split: str = "eval"
+    # Pick up training examples appended while a run is in progress
+    watch_train_data: bool = os.getenv('WATCH_TRAIN_DATA', '').lower() in ('1', 'true', 'yes')
     
     # Portkey configuration
     portkey_api_key: Optional[str] = None
@@ -25,15 +27,72 @@ class OptimizationConfig:
     # GEPA optimization parameters
     num_iterations: int = 10
     batch_size: int = 8
+    # "system_prompt" and/or tool description components, e.g. "tool:submit_request"
+    # or "tool:submit_request.b2b_or_b2c" (see src/tools.get_tool_components);
+    # COMPONENTS_TO_UPDATE is a comma-separated list
     components_to_update: list = None
+    # Worker processes to shard task-model evaluations across (0 evaluates in-process)
+    num_eval_workers: int = int(os.getenv('NUM_EVAL_WORKERS', '0'))
+    # Concurrent task-model calls when evaluating in-process
+    eval_concurrency: int = int(os.getenv('EVAL_CONCURRENCY', '1'))
+    # Completions sampled per instance in one request (n); scores are their mean
+    num_samples: int = int(os.getenv('NUM_SAMPLES', '1'))
+    # Tool schema and system prompt rendering in task requests: "original" or
+    # "short" (descriptions shortened by rule, see schema_compiler.shorten_description)
+    schema_mode: str = os.getenv('SCHEMA_MODE', 'original')
+    # Skip child candidates a local surrogate model predicts GEPA would reject,
+    # evaluating a fraction of those skips anyway to measure the hit rate
+    use_surrogate: bool = os.getenv('USE_SURROGATE', '').lower() in ('1', 'true', 'yes')
+    surrogate_audit_rate: float = float(os.getenv('SURROGATE_AUDIT_RATE', '0.2'))
+    # Reuse the scores of candidates whose system prompt is at least this similar
+    # (word 3-gram Jaccard, e.g. 0.9) instead of evaluating them again; 0 disables
+    near_duplicate_threshold: float = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0'))
+    # Score candidates during the run on a stratified, weighted subset of this many
+    # validation examples; the best candidate is confirmed on the full valset. 0 disables
+    valset_coreset_size: int = int(os.getenv('VALSET_CORESET_SIZE', '0'))
+    # Send only the last HISTORY_MAX_TURNS turns of a conversation as they are (0 sends all);
+    # older turns with slot values are pinned and the rest summarized ("extractive" or "model")
+    history_max_turns: int = int(os.getenv('HISTORY_MAX_TURNS', '0'))
+    history_summarize: bool = os.getenv('HISTORY_SUMMARIZE', 'true').lower() in ('1', 'true', 'yes')
+    history_pin_slots: bool = os.getenv('HISTORY_PIN_SLOTS', 'true').lower() in ('1', 'true', 'yes')
+    history_summarizer: str = os.getenv('HISTORY_SUMMARIZER', 'extractive')
+    # Also use every intermediate assistant reply in the labelled training conversations as an example,
+    # and in the evaluation conversations with EXPAND_EVAL_TURNS (which changes what the valset measures)
+    expand_turns: bool = os.getenv('EXPAND_TURNS', '').lower() in ('1', 'true', 'yes')
+    expand_eval_turns: bool = os.getenv('EXPAND_EVAL_TURNS', '').lower() in ('1', 'true', 'yes')
+    # Resamples of the final paired bootstrap/permutation gate of the best candidate
+    # against the seed (output_dir/significance.json); 0 skips the gate
+    significance_resamples: int = int(os.getenv('SIGNIFICANCE_RESAMPLES', '1000000'))
+    # File a production PromptRuntime watches; the best candidate is published to it
+    # when it passes the significance gate (it is always written to output_dir/best_candidate.json)
+    publish_path: Optional[str] = os.getenv('PUBLISH_PATH') or None
+    
+    # HTTP client configuration, shared by the light and heavy clients
+    http_connect_timeout: float = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+    http_read_timeout: float = float(os.getenv('HTTP_READ_TIMEOUT', '120'))
+    # HTTP/2 needs the optional h2 package
+    http2: bool = os.getenv('HTTP2', '').lower() in ('1', 'true', 'yes')
     
     # Output configuration
     output_dir: str = os.getenv('OUTPUT_DIR')
     save_intermediate: bool = True
+    # Live progress line on stderr; output_dir/metrics.json is written either way
+    show_progress: bool = True
+    # Chrome trace of the run's hot-path spans (chrome://tracing, Perfetto)
+    trace_file: Optional[str] = os.getenv('TRACE_FILE')
     
     def __post_init__(self):
         if self.components_to_update is None:
-            self.components_to_update = ["system_prompt"]
+            self.components_to_update = [
+                component.strip() for component in os.getenv('COMPONENTS_TO_UPDATE', 'system_prompt').split(',')
+                if component.strip()
+            ]
+        from src.tools import get_tool_components
+        tool_components = get_tool_components()
+        unknown = [c for c in self.components_to_update if c != "system_prompt" and c not in tool_components]
+        if unknown:
+            raise ValueError(f"Unknown components to update: {', '.join(unknown)} "
+                             f"(expected system_prompt or one of {', '.join(tool_components)})")
         
         if self.portkey_api_key is None:
             self.portkey_api_key = os.getenv("PORTKEY_API_KEY")
@@ -1,38 +1,204 @@
 #!/usr/bin/env python3
 
-import os
-import sys
-from portkey_ai import Portkey
-from dotenv import load_dotenv
+import argparse
 
-# Load environment variables from .env file
-load_dotenv()
 
-# Add src to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+def parse_args():
+    parser = argparse.ArgumentParser(description="Optimize the sourcing concierge prompt with GEPA")
+    parser.add_argument("--validate-data", action="store_true",
+                        help="Check the train/eval datasets for schema violations and leakage, then exit")
+    parser.add_argument("--estimate", action="store_true",
+                        help="Estimate the calls, tokens and time the configured run would take, without calling any model")
+    parser.add_argument("--concurrency", type=int,
+                        help="Concurrent task-model calls to assume for --estimate "
+                             "(default: NUM_EVAL_WORKERS, or EVAL_CONCURRENCY when evaluating in-process)")
+    parser.add_argument("--light-latency", type=float, default=1.5,
+                        help="Seconds per task-model call to assume for --estimate (default: 1.5)")
+    parser.add_argument("--heavy-latency", type=float, default=20.0,
+                        help="Seconds per reflection call to assume for --estimate (default: 20)")
+    parser.add_argument("--schema-report", action="store_true",
+                        help="Print the tokens the tool schemas and system prompt cost per request in each schema mode, then exit")
+    parser.add_argument("--schema-ab", action="store_true",
+                        help="Evaluate the initial prompt on the eval split once per schema mode and compare accuracy, then exit")
+    parser.add_argument("--history-report", action="store_true",
+                        help="Evaluate the initial prompt on both splits under several history policies and compare "
+                             "history tokens and accuracy, then exit")
+    return parser.parse_args()
 
-from config.config import OptimizationConfig, DEFAULT_INITIAL_PROMPT
-from src.optimize import optimize_sourcing_prompt
+
+def validate_data(config) -> int:
+    from src.dataset import SourcingDatasetLoader, report_dataset_problems
+    
+    data_loader = SourcingDatasetLoader(config.data_dir, persist_fingerprints=False)
+    train_data = data_loader.load_dataset(config.train_split)
+    eval_data = data_loader.load_dataset(config.eval_split)
+    print(f"Loaded {len(train_data)} training examples and {len(eval_data)} evaluation examples")
+    
+    problems = report_dataset_problems(train_data, eval_data, data_loader.get_tool_definitions())
+    print(f"Found {problems} problems" if problems else "No problems found")
+    return 1 if problems else 0
+
+
+def estimate(config, args):
+    from config.config import DEFAULT_INITIAL_PROMPT
+    from src.dataset import SourcingDatasetLoader
+    from src.estimate import estimate_run, format_estimate
+    from src.schema_compiler import compile_tools, compact_prompt
+    
+    data_loader = SourcingDatasetLoader(config.data_dir, persist_fingerprints=False)
+    train_data = data_loader.load_dataset(config.train_split)
+    eval_data = data_loader.load_dataset(config.eval_split)
+    # As optimize_sourcing_prompt expands them
+    from src.turns import expand_turns
+    if config.expand_turns:
+        train_data, _ = expand_turns(train_data)
+    if config.expand_eval_turns:
+        eval_data, _ = expand_turns(eval_data)
+    compacted = config.schema_mode != "original"
+    run_estimate = estimate_run(
+        train_data=train_data,
+        eval_data=eval_data,
+        system_prompt=compact_prompt(DEFAULT_INITIAL_PROMPT) if compacted else DEFAULT_INITIAL_PROMPT,
+        tool_definitions=compile_tools(data_loader.get_tool_definitions(), config.schema_mode),
+        num_iterations=config.num_iterations,
+        concurrency=args.concurrency or config.num_eval_workers or config.eval_concurrency,
+        light_latency=args.light_latency,
+        heavy_latency=args.heavy_latency,
+        num_samples=config.num_samples,
+        valset_coreset_size=config.valset_coreset_size or None
+    )
+    print(format_estimate(run_estimate))
+
+
+def schema_report():
+    from config.config import DEFAULT_INITIAL_PROMPT
+    from src.estimate import token_counter
+    from src.schema_compiler import schema_token_report, format_token_report
+    from src.tools import get_available_tools
+    
+    print(f"Tokens per request by schema mode ({token_counter()} tokenizer):")
+    print(format_token_report(schema_token_report(get_available_tools(), DEFAULT_INITIAL_PROMPT)))
+
+
+def history_policy(config):
+    if not config.history_max_turns:
+        return None
+    from src.history import HistoryPolicy
+    return HistoryPolicy(
+        max_turns=config.history_max_turns,
+        summarize=config.history_summarize,
+        pin_slots=config.history_pin_slots,
+        summarizer=config.history_summarizer
+    )
+
+
+def history_report(config, light_client):
+    from config.config import DEFAULT_INITIAL_PROMPT
+    from src.dataset import SourcingDatasetLoader
+    from src.estimate import token_counter
+    from src.history import HistoryPolicy, compare_history_policies
+    
+    # The configured window, or 4 turns, with and without pinning and summaries
+    max_turns = config.history_max_turns or 4
+    policies = [
+        None,
+        HistoryPolicy(max_turns, summarize=False, pin_slots=False),
+        HistoryPolicy(max_turns, summarize=False, pin_slots=True),
+        HistoryPolicy(max_turns, summarizer=config.history_summarizer),
+    ]
+    configured = history_policy(config)
+    if configured is not None and configured not in policies:
+        policies.append(configured)
+    
+    data_loader = SourcingDatasetLoader(config.data_dir)
+    for split in (config.train_split, config.eval_split):
+        instances = data_loader.load_dataset(split)
+        results = compare_history_policies(
+            light_client, data_loader, instances, DEFAULT_INITIAL_PROMPT,
+            {policy.describe() if policy else "full history": policy for policy in policies},
+            max_concurrency=config.eval_concurrency
+        )
+        baseline = next(iter(results.values()))
+        print(f"History policies on {len(instances)} {split} examples ({token_counter()} tokenizer):")
+        for label, result in results.items():
+            saved = 1 - result["history_tokens"] / baseline["history_tokens"] if baseline["history_tokens"] else 0.0
+            changed = f", {len(result['changed'])} scores differ" if result["changed"] else ""
+            print(f"  {label:<55} {result['history_tokens']:>7,} history tokens ({saved:>4.0%} saved), "
+                  f"mean score {result['mean_score']:.3f} ({result['mean_score'] - baseline['mean_score']:+.3f}){changed}")
+
+
+def schema_ab(config, light_client):
+    from config.config import DEFAULT_INITIAL_PROMPT
+    from src.dataset import SourcingDatasetLoader
+    from src.schema_compiler import compare_schema_modes
+    
+    data_loader = SourcingDatasetLoader(config.data_dir)
+    eval_data = data_loader.load_dataset(config.eval_split)
+    results = compare_schema_modes(light_client, data_loader, eval_data, DEFAULT_INITIAL_PROMPT,
+                                   max_concurrency=config.eval_concurrency)
+    print(f"Schema A/B on {len(eval_data)} evaluation examples:")
+    for mode, result in results.items():
+        changed = f", {len(result['changed'])} scores differ from original" if result["changed"] else ""
+        print(f"  {mode:<9} mean score {result['mean_score']:.3f}, {result['schema_tokens']} schema tokens{changed}")
 
 
 def main():
-    # Load configuration
+    args = parse_args()
+    
+    # Configuration loads the .env file
+    from config.config import OptimizationConfig, DEFAULT_INITIAL_PROMPT
     config = OptimizationConfig()
     
+    if args.validate_data:
+        return validate_data(config)
+    if args.estimate:
+        return estimate(config, args)
+    if args.schema_report:
+        return schema_report()
+    
     # Initialize Portkey client
     if not config.portkey_api_key:
         print("Error: Please set PORTKEY_API_KEY in .env file or environment variable")
         return
     
+    from functools import partial
+    from src.http_client import PoolMetrics, create_http_client, create_portkey_client
+    from src.optimize import optimize_sourcing_prompt
+    
+    # Both clients talk to the Portkey gateway, so they share one connection
+    # pool, sized for the concurrent evaluations plus a reflection call
+    pool_metrics = PoolMetrics()
+    http_client = create_http_client(
+        max_connections=config.eval_concurrency + 1,
+        connect_timeout=config.http_connect_timeout,
+        read_timeout=config.http_read_timeout,
+        http2=config.http2,
+        metrics=pool_metrics
+    )
+    light_client = create_portkey_client(config.portkey_api_key, config.portkey_config_id_light_model, http_client)
+    heavy_client = create_portkey_client(config.portkey_api_key, config.portkey_config_id_heavy_model, http_client)
+    if args.schema_ab or args.history_report:
+        try:
+            return schema_ab(config, light_client) if args.schema_ab else history_report(config, light_client)
+        finally:
+            http_client.close()
     
-    light_client = Portkey(api_key=config.portkey_api_key, config=config.portkey_config_id_light_model)
-    heavy_client = Portkey(api_key=config.portkey_api_key, config=config.portkey_config_id_heavy_model)
+    # Evaluation worker processes each build their own client and pool
+    light_client_factory = partial(
+        create_portkey_client,
+        config.portkey_api_key,
+        config.portkey_config_id_light_model,
+        connect_timeout=config.http_connect_timeout,
+        read_timeout=config.http_read_timeout,
+        http2=config.http2
+    )
     
     print("Starting GEPA optimization for sourcing concierge prompt...")
     print(f"Data directory: {config.data_dir}")
     print(f"Output directory: {config.output_dir}")
     print(f"Iterations: {config.num_iterations}")
     print(f"Batch size: {config.batch_size}")
+    print(f"Components: {', '.join(config.components_to_update)}")
     # print(f"Provider: {config.portkey_provider}")
     # print(f"Model: {config.portkey_model}")
     print()
@@ -46,7 +212,26 @@ def main():
             initial_prompt=DEFAULT_INITIAL_PROMPT,
             num_iterations=config.num_iterations,
             batch_size=config.batch_size,
-            output_dir=config.output_dir
+            output_dir=config.output_dir,
+            components_to_update=config.components_to_update,
+            watch_train_data=config.watch_train_data,
+            num_eval_workers=config.num_eval_workers,
+            light_client_factory=light_client_factory,
+            trace_file=config.trace_file,
+            show_progress=config.show_progress,
+            eval_concurrency=config.eval_concurrency,
+            pool_metrics=pool_metrics,
+            num_samples=config.num_samples,
+            schema_mode=config.schema_mode,
+            use_surrogate=config.use_surrogate,
+            surrogate_audit_rate=config.surrogate_audit_rate,
+            near_duplicate_threshold=config.near_duplicate_threshold or None,
+            valset_coreset_size=config.valset_coreset_size or None,
+            history_policy=history_policy(config),
+            expand_turns=config.expand_turns,
+            expand_eval_turns=config.expand_eval_turns,
+            significance_resamples=config.significance_resamples,
+            publish_path=config.publish_path
         )
         
         print("Optimization completed successfully!")
@@ -61,7 +246,9 @@ def main():
     except Exception as e:
         print(f"Error during optimization: {str(e)}")
         raise
+    finally:
+        http_client.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
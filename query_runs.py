@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Query the Parquet archives that optimization runs export to <output_dir>/archive.
+
+    python query_runs.py results/ --since 2026-10-01 beats-seed --tool submit_request
+    python query_runs.py results/ compare
+
+Paths are searched recursively for archives, so a directory holding many
+run output directories can be passed as is. Needs pyarrow.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare optimization runs from their archives")
+    parser.add_argument("paths", nargs="+", help="Run output directories, archive directories or their parents")
+    parser.add_argument("--since", type=_timestamp, help="Only runs started at or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=_timestamp, help="Only runs started before this date (YYYY-MM-DD)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    beats_seed = commands.add_parser("beats-seed", help="Candidates that beat their run's seed on eval examples")
+    beats_seed.add_argument("--tool", help="Only count eval examples expecting this tool, e.g. submit_request")
+    beats_seed.add_argument("--show-prompts", action="store_true", help="Print the system prompt of every candidate")
+
+    commands.add_parser("compare", help="Seed and best scores, tokens and request time per run")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    from src.run_archive import find_archives, candidates_beating_seed, compare_runs
+
+    archives = find_archives(args.paths)
+    if not archives:
+        print("No run archives found")
+        return 1
+
+    if args.command == "beats-seed":
+        winners = candidates_beating_seed(archives, args.tool, args.since, args.until)
+        scope = f"{args.tool} examples" if args.tool else "eval examples"
+        print(f"{len(winners)} candidates beat their seed on {scope} across {len(archives)} runs")
+        for winner in winners:
+            print(f"  {winner['run_id']}  candidate {winner['candidate_idx']} ({winner['candidate_hash']}): "
+                  f"{winner['score']:.3f} vs seed {winner['seed_score']:.3f} on {winner['examples']} examples")
+            if args.show_prompts:
+                print("    " + winner["system_prompt"].replace("\n", "\n    "))
+        return 0
+
+    runs = compare_runs(archives, args.since, args.until)
+    print(f"{'run':<40}{'started':>18}{'cands':>7}{'seed':>8}{'best':>8}{'evals':>8}{'prompt tok':>12}{'req s':>9}")
+    for run in runs:
+        started = datetime.fromtimestamp(run["run_started"]).strftime("%Y-%m-%d %H:%M")
+        seed = "--" if run["seed_score"] is None else f"{run['seed_score']:.3f}"
+        best = "--" if run["best_score"] is None else f"{run['best_score']:.3f}"
+        print(f"{run['run_id']:<40}{started:>18}{run['candidates']:>7}{seed:>8}{best:>8}{run['evaluations']:>8}"
+              f"{run['prompt_tokens']:>12,}{run['request_seconds']:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,30 @@
 import json
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+from dataclasses import dataclass, asdict, field
 
 from gepa import EvaluationBatch, GEPAResult, GEPAAdapter
-from .dataset import ChatDataInstance, SourcingDatasetLoader
-from .tools import get_available_tools
+from .dataset import ChatDataInstance, SourcingDatasetLoader, GrowingDataset
+from .tools import get_available_tools, apply_tool_components, parse_tool_component, TOOL_COMPONENT_PREFIX
+from .eval_cache import EvaluationCache, instance_digest, candidate_hash
+from .tracing import get_tracer, usage_attributes
+from .failure_clusters import FailureClusterIndex, failure_signature
+from .trace_store import TraceStore
+from .tool_validator import get_validator
+from .schema_compiler import SCHEMA_MODES, compile_tools, compact_prompt
+from .progress import RunMetrics
+from .surrogate import CandidateSurrogate
+from .candidate_registry import CandidateRegistry
+from .coreset import Coreset
+from .history import HistoryPolicy, HistoryShaper, model_summarizer
+from .turns import prefix_order_key
+from .run_archive import EvaluationLog
+
+# Sources of the results evaluate_instances did not evaluate itself
+RESULT_CACHED = "cached"
+RESULT_REUSED = "reused"
 
 
 @dataclass
@@ -16,106 +36,453 @@ class ToolCallTrajectory:
     success: bool = False
 
 
+@dataclass(frozen=True)
+class TraceRef:
+    """Reference to a ToolCallTrajectory spooled to the adapter's trace store."""
+    trace_id: int
+
+
 @dataclass
 class ToolCallOutput:
     predicted_tool_call: Optional[Dict[str, Any]]
     confidence: float
     reasoning: str
+    # One of "correct", "partial", "wrong_tool", "schema_violation", "no_call", "error"
+    # or "skipped" (not evaluated, the surrogate predicted the candidate loses)
+    category: str = "error"
+    # With several samples per instance: the score of every sample (the
+    # instance's score is their mean) and their variance
+    sample_scores: List[float] = field(default_factory=list)
+    score_variance: float = 0.0
+    # Usage and duration of the task-model request(s) that produced this output
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_seconds: float = 0.0
 
 
 class SourcingConciergeGEPAAdapter(GEPAAdapter):
-    def __init__(self, light_client, heavy_client, data_loader: SourcingDatasetLoader):
+    def __init__(self,
+                 light_client,
+                 heavy_client,
+                 data_loader: SourcingDatasetLoader,
+                 trace_dir: Optional[str] = None,
+                 num_workers: int = 0,
+                 light_client_factory: Optional[Callable[[], Any]] = None,
+                 metrics: Optional[RunMetrics] = None,
+                 max_concurrency: int = 1,
+                 num_samples: int = 1,
+                 schema_mode: str = "original",
+                 surrogate: Optional[CandidateSurrogate] = None,
+                 candidate_registry: Optional[CandidateRegistry] = None,
+                 history_policy: Optional[HistoryPolicy] = None,
+                 evaluation_log: Optional[EvaluationLog] = None):
         self.light_client = light_client
         self.heavy_client = heavy_client
         self.data_loader = data_loader
         self.tool_definitions = data_loader.get_tool_definitions()
+        # Candidates and schema modes only change descriptions, which validation
+        # ignores, so one validator checks predictions for every rendered tool list
+        self.validator = get_validator(self.tool_definitions)
+        self.failure_index = FailureClusterIndex()
+        self.cache = EvaluationCache()
+        self.metrics = metrics or RunMetrics()
+        # Completions drawn per instance, in a single request with n=num_samples
+        self.num_samples = num_samples
+        # How tool schemas and the system prompt are serialized into requests (see schema_compiler)
+        if schema_mode not in SCHEMA_MODES:
+            raise ValueError(f"Unknown schema mode: {schema_mode} (expected one of {', '.join(SCHEMA_MODES)})")
+        self.schema_mode = schema_mode
+        # Windowing and summarization of long histories in task requests (see history.HistoryPolicy)
+        self.history_shaper = None
+        if history_policy is not None and history_policy.max_turns is not None:
+            summarizer = model_summarizer(light_client) if history_policy.summarizer == "model" else None
+            self.history_shaper = HistoryShaper(history_policy, self.tool_definitions, summarizer)
+        # Pre-screens child candidates on the reflective minibatch, see surrogate.CandidateSurrogate
+        self.surrogate = surrogate
+        self._tool_arguments = {
+            tool["function"]["name"]: list(tool["function"].get("parameters", {}).get("properties", {}))
+            for tool in self.tool_definitions
+        }
+        # (instance ids, candidate, scores) of the last evaluation with traces, i.e. the parent of the next child
+        self._reflected_batch: Optional[tuple] = None
+        # Reuses the results of near-identical candidates in evaluations without traces
+        self.candidate_registry = candidate_registry
+        # Every instance evaluation of the run, for the run archive
+        self.evaluation_log = evaluation_log
+        # (instance ids, weights) of a valset coreset whose scores are reported weighted
+        self._valset_weights: Optional[tuple] = None
+        # The valset GEPA was given, whose evaluations are full validation passes
+        self._valset: Optional[List[ChatDataInstance]] = None
+        # Traces are only built when GEPA asks for them, and are spooled to disk
+        # so that GEPA holds small references instead of whole conversations
+        self.trace_store = TraceStore(os.path.join(trace_dir, "traces.bin") if trace_dir else None)
+        self.watched_datasets: List[GrowingDataset] = []
+        # With workers, task-model calls are sharded across processes that each
+        # build their own light client from the (picklable) factory
+        self.worker_pool = None
+        if num_workers > 0:
+            if light_client_factory is None:
+                raise ValueError("light_client_factory is required when num_workers > 0")
+            from .parallel_eval import ShardedEvaluator
+            self.worker_pool = ShardedEvaluator(light_client_factory, data_loader, num_workers, {
+                "num_samples": num_samples,
+                "schema_mode": schema_mode,
+                "history_policy": history_policy
+            })
+        # In-process cache misses are sent up to max_concurrency at a time; the
+        # light client's connection pool should hold that many connections
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_concurrency) if max_concurrency > 1 else None
+    
+    def set_valset(self, valset: Optional[List[ChatDataInstance]]):
+        """
+        Report evaluations of this list to the metrics as full validation
+        passes. GEPA evaluates the valset it was given as is, so the list is
+        recognized by identity rather than by size.
+        """
+        self._valset = valset
+    
+    def set_valset_coreset(self, coreset: Optional[Coreset]):
+        """
+        Report the scores of evaluations of exactly the coreset's instances
+        multiplied by their weights, so that the mean GEPA takes is the
+        coreset's estimate of the full valset score.
+        """
+        self._valset_weights = None if coreset is None else (
+            [instance.id for instance in coreset.instances], coreset.weights
+        )
+    
+    def watch_dataset(self, dataset: GrowingDataset):
+        """
+        Refresh the dataset with newly appended records at the start of every
+        iteration. GEPA has sampled the iteration's minibatch by then, and only
+        draws new indices at epoch boundaries (see dataset.GrowingDataset).
+        """
+        self.watched_datasets.append(dataset)
     
     def evaluate(self, 
                 data_batch: List[ChatDataInstance], 
                 candidate: Dict[str, str], 
                 capture_traces: bool = False) -> EvaluationBatch:
         
-        trajectories = []
-        outputs = []
-        scores = []
+        tracer = get_tracer()
+        # Hashing the candidate is only worth it when spans are recorded
+        with tracer.span("adapter.evaluate",
+                         batch_size=len(data_batch),
+                         capture_traces=capture_traces,
+                         candidate_hash=candidate_hash(candidate) if tracer.enabled else None):
+            # GEPA captures traces for the reflective minibatch that starts each
+            # iteration, so new records show up between iterations
+            if capture_traces:
+                self.metrics.start_iteration()
+                for dataset in self.watched_datasets:
+                    added = dataset.refresh()
+                    if added:
+                        print(f"Picked up {added} new {dataset.split} examples ({len(dataset)} total)")
         
-        system_prompt = candidate.get("system_prompt", "")
+            screening = None if capture_traces else self._screen_child(data_batch, candidate)
+            if screening is not None and screening["skip"]:
+                return self._skipped_batch(screening)
         
-        for instance in data_batch:
-            try:
-                trajectory, output, score = self._evaluate_single_instance(
-                    instance, system_prompt
-                )
-                trajectories.append(trajectory)
+            trajectories = [] if capture_traces else None
+            outputs = []
+            scores = []
+            sources = []
+        
+            # Reflection needs the candidate's own outputs, so only evaluations without traces reuse near-duplicates
+            results = self.evaluate_instances(data_batch, candidate, reuse_near_duplicates=not capture_traces)
+            for instance, (output, score, error_message, source) in zip(data_batch, results):
                 outputs.append(output)
                 scores.append(score)
-            except Exception as e:
-                # Handle individual failures gracefully
-                trajectories.append(ToolCallTrajectory(
-                    conversation_history=instance.history,
-                    predicted_tool_call=None,
-                    expected_tool_call=instance.expected_tool_call,
-                    error_message=str(e),
-                    success=False
-                ))
-                outputs.append(ToolCallOutput(
-                    predicted_tool_call=None,
-                    confidence=0.0,
-                    reasoning=f"Error: {str(e)}"
-                ))
-                scores.append(0.0)
-        
-        return EvaluationBatch(
-            trajectories=trajectories,
-            outputs=outputs,
-            scores=scores
-        )
+                sources.append(source)
+                if capture_traces:
+                    trajectories.append(self._store_trajectory(ToolCallTrajectory(
+                        conversation_history=list(instance.history),
+                        predicted_tool_call=output.predicted_tool_call,
+                        expected_tool_call=instance.expected_tool_call,
+                        error_message=error_message,
+                        success=score > 0.5
+                    )))
+        
+            self.trace_store.flush()
+            if self.evaluation_log is not None:
+                self.evaluation_log.append(candidate, data_batch, outputs, scores, sources, capture_traces)
+            if self.surrogate is not None:
+                self._update_surrogate(data_batch, candidate, scores, capture_traces, screening)
+            if self._valset_weights is not None and self._valset_weights[0] == [instance.id for instance in data_batch]:
+                scores = [score * weight for score, weight in zip(scores, self._valset_weights[1])]
+            if self._valset is not None and data_batch is self._valset:
+                self.metrics.record_valset_pass(scores)
+        
+            return EvaluationBatch(
+                trajectories=trajectories,
+                outputs=outputs,
+                scores=scores
+            )
     
-    def _evaluate_single_instance(self, 
-                                 instance: ChatDataInstance, 
-                                 system_prompt: str) -> tuple:
+    def _screen_child(self,
+                      data_batch: List[ChatDataInstance],
+                      candidate: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Predict the minibatch scores of a child candidate, i.e. a candidate
+        scored without traces on the batch its parent was just reflected on,
+        and decide whether to skip evaluating it. Returns None for any other
+        evaluation.
+        """
+        if self.surrogate is None or self._reflected_batch is None:
+            return None
+        instance_ids, parent, parent_scores = self._reflected_batch
+        if instance_ids != [instance.id for instance in data_batch] or candidate == parent:
+            return None
         
-        # Prepare messages for the model
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(instance.history)
+        features = [
+            self.surrogate.features(candidate.get("system_prompt", ""), parent.get("system_prompt", ""),
+                                    instance, parent_score, self._tool_arguments)
+            for instance, parent_score in zip(data_batch, parent_scores)
+        ]
+        predicted = self.surrogate.predict(features)
+        skip = self.surrogate.should_skip(predicted, parent_scores)
+        audited = skip and self.surrogate.audit()
+        return {
+            "features": features,
+            "predicted": predicted,
+            "parent_scores": parent_scores,
+            "skip": skip and not audited,
+            "audited": audited,
+        }
+    
+    def _skipped_batch(self, screening: Dict[str, Any]) -> EvaluationBatch:
+        self.surrogate.record_skip()
+        predicted = screening["predicted"]
+        # GEPA rejects a child whose score sum does not beat the parent's
+        scores = predicted if sum(predicted) <= sum(screening["parent_scores"]) else list(screening["parent_scores"])
+        outputs = [
+            ToolCallOutput(
+                predicted_tool_call=None,
+                confidence=0.0,
+                reasoning=f"Skipped: surrogate predicted a score of {score:.2f}",
+                category="skipped"
+            )
+            for score in scores
+        ]
+        return EvaluationBatch(trajectories=None, outputs=outputs, scores=scores)
+    
+    def _update_surrogate(self,
+                          data_batch: List[ChatDataInstance],
+                          candidate: Dict[str, str],
+                          scores: List[float],
+                          capture_traces: bool,
+                          screening: Optional[Dict[str, Any]]):
+        if capture_traces:
+            self._reflected_batch = ([instance.id for instance in data_batch], candidate, scores)
+        elif screening is not None:
+            self.surrogate.learn(screening["features"], scores)
+            if screening["audited"]:
+                self.surrogate.record_audit(scores, screening["parent_scores"])
+        self.surrogate.record_scores(data_batch, scores)
+    
+    def evaluate_instances(self,
+                           data_batch: List[ChatDataInstance],
+                           candidate: Dict[str, str],
+                           reuse_near_duplicates: bool = False) -> List[tuple]:
+        """
+        Evaluate a batch without building traces, returning (output, score,
+        error_message, source) per instance in batch order, where source is
+        RESULT_CACHED for results served from the cache, RESULT_REUSED for
+        results copied from a near-duplicate candidate and None for fresh
+        ones. Cache misses are evaluated in-process, or sharded across the
+        worker pool when one is attached.
+        With reuse_near_duplicates, instances that a near-identical candidate
+        has already been scored on reuse that result (see CandidateRegistry).
+        """
+        registry = self.candidate_registry
+        system_prompt = candidate.get("system_prompt", "")
+        tool_definitions = apply_tool_components(candidate, self.tool_definitions)
+        if self.schema_mode != "original":
+            system_prompt = compact_prompt(system_prompt)
+            tool_definitions = compile_tools(tool_definitions, self.schema_mode, preserve=candidate)
+        component_key = self.cache.component_key(candidate, self._request_components(candidate))
+        
+        results = [None] * len(data_batch)
+        instance_keys = []
+        pending = []
+        for i, instance in enumerate(data_batch):
+            instance_key = instance_digest(instance.history, instance.expected_tool_call)
+            instance_keys.append(instance_key)
+            cached = self.cache.get(instance_key, component_key)
+            source = RESULT_CACHED
+            if cached is None and reuse_near_duplicates and registry is not None:
+                cached = registry.lookup(candidate, instance_key)
+                source = RESULT_REUSED
+            if cached is None:
+                pending.append(i)
+            else:
+                results[i] = (*cached, None, source)
         
-        # Call the model with tool definitions using Portkey
+        # Requests that share a conversation prefix go out back to back, so the
+        # provider can serve the prefix from its prompt cache
+        pending.sort(key=lambda i: prefix_order_key(data_batch[i]))
+        
+        self.metrics.record_cache(len(data_batch) - len(pending), len(pending))
+        if self.worker_pool is not None and pending:
+            self.metrics.task_calls_started(len(pending))
+            evaluated = self.worker_pool.evaluate([data_batch[i] for i in pending], candidate)
+        elif self.thread_pool is not None:
+            evaluated = self.thread_pool.map(
+                lambda i: self._evaluate_tracked(data_batch[i], system_prompt, tool_definitions), pending
+            )
+        else:
+            evaluated = (self._evaluate_tracked(data_batch[i], system_prompt, tool_definitions) for i in pending)
+        
+        for i, (output, score, error_message) in zip(pending, evaluated):
+            self.metrics.task_call_finished(error=error_message is not None)
+            if error_message is None:
+                self.cache.put(instance_keys[i], component_key, (output, score))
+                if registry is not None:
+                    registry.register(candidate, instance_keys[i], output, score)
+            results[i] = (output, score, error_message, None)
+        
+        return results
+    
+    def _evaluate_tracked(self,
+                          instance: ChatDataInstance,
+                          system_prompt: str,
+                          tool_definitions: List[Dict[str, Any]]) -> tuple:
+        self.metrics.task_calls_started()
+        return self._evaluate_safely(instance, system_prompt, tool_definitions)
+    
+    def _evaluate_safely(self,
+                         instance: ChatDataInstance,
+                         system_prompt: str,
+                         tool_definitions: List[Dict[str, Any]]) -> tuple:
         try:
-            response = self.light_client.chat.completions.create(
-                messages=messages,
-                tools=self.tool_definitions,
-                tool_choice="required"
+            output, score = self._evaluate_single_instance(instance, system_prompt, tool_definitions)
+            return output, score, None
+        except Exception as e:
+            # Handle individual failures gracefully
+            output = ToolCallOutput(
+                predicted_tool_call=None,
+                confidence=0.0,
+                reasoning=f"Error: {str(e)}"
             )
+            return output, 0.0, str(e)
+    
+    def close(self):
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown()
+        self.trace_store.close()
+    
+    def shape_history(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """The turns of a conversation history that a task request sends."""
+        return self.history_shaper.shape(history) if self.history_shaper is not None else history
+    
+    def _store_trajectory(self, trajectory: ToolCallTrajectory) -> TraceRef:
+        return TraceRef(self.trace_store.append(asdict(trajectory)))
+    
+    def _load_trajectory(self, trajectory: Any) -> ToolCallTrajectory:
+        if isinstance(trajectory, TraceRef):
+            return ToolCallTrajectory(**self.trace_store.get(trajectory.trace_id))
+        return trajectory
+    
+    def _evaluate_single_instance(self, 
+                                 instance: ChatDataInstance, 
+                                 system_prompt: str,
+                                 tool_definitions: Optional[List[Dict[str, Any]]] = None) -> tuple:
+        
+        with get_tracer().span("adapter.task_call", instance_id=instance.id) as span:
+            # Prepare messages for the model
+            messages = [{"role": "system", "content": system_prompt}]
+            messages.extend(self.shape_history(instance.history))
+        
+            # Call the model with tool definitions using Portkey
+            try:
+                start = time.perf_counter()
+                choices, prompt_tokens, completion_tokens = self._sample_choices(messages, tool_definitions, span)
+                latency = time.perf_counter() - start
+                predicted_tool_calls = [self._extract_tool_call(choice) for choice in choices]
             
-            # Extract tool call from response
-            predicted_tool_call = None
-            if response.choices[0].message.tool_calls:
-                tool_call = response.choices[0].message.tool_calls[0]
-                predicted_tool_call = {
-                    "name": tool_call.function.name,
-                    "arguments": json.loads(tool_call.function.arguments)
-                }
-            
-            # Calculate score based on correctness
-            score = self._calculate_score(predicted_tool_call, instance.expected_tool_call)
+                # Calculate score based on correctness
+                sample_scores = [self._calculate_score(p, instance.expected_tool_call) for p in predicted_tool_calls]
+                score = sum(sample_scores) / len(sample_scores)
             
-            trajectory = ToolCallTrajectory(
-                conversation_history=instance.history,
-                predicted_tool_call=predicted_tool_call,
-                expected_tool_call=instance.expected_tool_call,
-                success=score > 0.5
-            )
+                # Reflection sees the worst sample, so failures the prompt still
+                # allows are not hidden behind a lucky draw
+                worst = min(range(len(choices)), key=lambda j: sample_scores[j])
+                predicted_tool_call = predicted_tool_calls[worst]
+                agreement = sum(p == predicted_tool_call for p in predicted_tool_calls) / len(predicted_tool_calls)
             
-            output = ToolCallOutput(
-                predicted_tool_call=predicted_tool_call,
-                confidence=1.0 if predicted_tool_call else 0.0,
-                reasoning=response.choices[0].message.content or ""
-            )
+                output = ToolCallOutput(
+                    predicted_tool_call=predicted_tool_call,
+                    confidence=agreement if predicted_tool_call else 0.0,
+                    reasoning=choices[worst].message.content or "",
+                    category=self._categorize(predicted_tool_call, instance.expected_tool_call, sample_scores[worst]),
+                    sample_scores=sample_scores if len(sample_scores) > 1 else [],
+                    score_variance=sum((x - score) ** 2 for x in sample_scores) / len(sample_scores),
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    latency_seconds=latency
+                )
             
-            return trajectory, output, score
+                return output, score
             
-        except Exception as e:
-            raise Exception(f"Model call failed: {str(e)}")
+            except Exception as e:
+                raise Exception(f"Model call failed: {str(e)}")
+    
+    def _sample_choices(self,
+                        messages: List[Dict[str, str]],
+                        tool_definitions: Optional[List[Dict[str, Any]]],
+                        span: Any) -> tuple:
+        """
+        Draw num_samples completions for one request. Providers that ignore n
+        return fewer choices; the rest are requested again with the same
+        messages, which providers with prompt caching serve from the cached prefix.
+        Returns the choices and the prompt and completion tokens used.
+        """
+        choices = []
+        prompt_tokens = completion_tokens = 0
+        while len(choices) < self.num_samples:
+            request = {
+                "messages": messages,
+                "tools": tool_definitions if tool_definitions is not None else self.tool_definitions,
+                "tool_choice": "required"
+            }
+            if self.num_samples > 1:
+                request["n"] = self.num_samples - len(choices)
+            response = self.light_client.chat.completions.create(**request)
+            if not response.choices:
+                raise Exception("Response contained no choices")
+            choices.extend(response.choices)
+            usage = usage_attributes(response)
+            prompt_tokens += usage.get("prompt_tokens") or 0
+            completion_tokens += usage.get("completion_tokens") or 0
+        span.set_attributes(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, samples=len(choices))
+        return choices[:self.num_samples], prompt_tokens, completion_tokens
+    
+    def _extract_tool_call(self, choice: Any) -> Optional[Dict[str, Any]]:
+        if not choice.message.tool_calls:
+            return None
+        tool_call = choice.message.tool_calls[0]
+        return {
+            "name": tool_call.function.name,
+            "arguments": json.loads(tool_call.function.arguments)
+        }
+    
+    def _request_components(self, candidate: Dict[str, str]) -> List[str]:
+        """Names of the candidate components that are rendered into a task request."""
+        return ["system_prompt"] + [c for c in candidate if c.startswith(TOOL_COMPONENT_PREFIX)]
+    
+    def _categorize(self,
+                    predicted: Optional[Dict[str, Any]],
+                    expected: Dict[str, Any],
+                    score: float) -> str:
+        if not predicted:
+            return "no_call"
+        if self.validator.validate(predicted):
+            return "schema_violation"
+        if predicted["name"] != expected["name"]:
+            return "wrong_tool"
+        return "correct" if score >= 1.0 else "partial"
     
     def _calculate_score(self, 
                         predicted: Optional[Dict[str, Any]], 
@@ -150,59 +517,116 @@ class SourcingConciergeGEPAAdapter(GEPAAdapter):
                                evaluation_batch: EvaluationBatch, 
                                components_to_update: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         
-        ret_d: Dict[str, List[Dict[str, Any]]] = {}
+        tracer = get_tracer()
+        with tracer.span("adapter.make_reflective_dataset",
+                         batch_size=len(evaluation_batch.scores),
+                         components=",".join(components_to_update),
+                         candidate_hash=candidate_hash(candidate) if tracer.enabled else None):
+            ret_d: Dict[str, List[Dict[str, Any]]] = {}
+        
+            trajectories = [self._load_trajectory(t) for t in evaluation_batch.trajectories]
+            trace_instances = list(zip(trajectories, evaluation_batch.scores, evaluation_batch.outputs, strict=False))
+        
+            # Count every failure once, however many components reflect on it
+            self.failure_index.record([
+                self._failure_signature(trajectory)
+                for trajectory, score, _ in trace_instances if score < 1.0
+            ])
         
-        assert len(components_to_update) == 1, f"Expected 1 component to update, got {len(components_to_update)}"
-        comp = components_to_update[0]
+            for comp in components_to_update:
+                # Each tool component only gets the examples in which its tool was
+                # expected or called, falling back to the whole batch if there are none
+                relevant = [t for t in trace_instances if self._depends_on_component(t[0], comp)]
+                ret_d[comp] = self._build_reflective_items(relevant or trace_instances)
         
+            if not ret_d or any(len(items) == 0 for items in ret_d.values()):
+                raise Exception("No valid predictions found for any module.")
+            return ret_d
+    
+    def _depends_on_component(self, trajectory: ToolCallTrajectory, component: str) -> bool:
+        if not component.startswith(TOOL_COMPONENT_PREFIX):
+            return True
+        
+        tool_name, param_name = parse_tool_component(component)
+        predicted = trajectory.predicted_tool_call or {}
+        if param_name is None:
+            return tool_name in (trajectory.expected_tool_call["name"], predicted.get("name"))
+        
+        return (trajectory.expected_tool_call["name"] == tool_name
+                and (param_name in trajectory.expected_tool_call.get("arguments", {})
+                     or param_name in predicted.get("arguments", {})))
+    
+    def _build_reflective_items(self, trace_instances: List[tuple]) -> List[Dict[str, Any]]:
         items: List[Dict[str, Any]] = []
-        trace_instances = list(zip(evaluation_batch.trajectories, evaluation_batch.scores, evaluation_batch.outputs, strict=False))
         
+        # Group the minibatch by outcome so reflection sees one representative per
+        # distinct mistake (and per correctly handled tool) together with its count
+        successes: Dict[str, List[Any]] = {}
+        failures = []
         for trajectory, score, output in trace_instances:
-            # Format conversation history as input
-            conversation_lines = []
-            for msg in trajectory.conversation_history:
-                conversation_lines.append(f"{msg['role'].title()}: {msg['content']}")
-            input_text = "\n".join(conversation_lines)
-            
-            # Format the generated tool call as output
-            if trajectory.predicted_tool_call:
-                generated_output = f"Tool call: {trajectory.predicted_tool_call['name']}({trajectory.predicted_tool_call.get('arguments', {})})"
-            else:
-                generated_output = "No tool call made"
-            
-            # Create feedback based on performance
             if score >= 1.0:
-                feedback = f"The tool call is correct. Successfully called {trajectory.expected_tool_call['name']} with proper arguments."
+                successes.setdefault(trajectory.expected_tool_call['name'], []).append(trajectory)
             else:
-                expected_call = f"{trajectory.expected_tool_call['name']}({trajectory.expected_tool_call.get('arguments', {})})"
-                error_analysis = self._analyze_error(trajectory, output)
-                feedback = f"The tool call is incorrect. Expected: {expected_call}. Error: {error_analysis}"
-            
-            # Create the sample in GEPA's expected format
-            d = {
-                "Inputs": input_text,
-                "Generated Outputs": generated_output,
-                "Feedback": feedback,
-            }
-            
-            items.append(d)
+                signature = self._failure_signature(trajectory)
+                failures.append((signature, (trajectory, output), score))
         
-        ret_d[comp] = items
+        for tool_name, tool_trajectories in successes.items():
+            feedback = f"The tool call is correct. Successfully called {tool_name} with proper arguments."
+            if len(tool_trajectories) > 1:
+                feedback += f" ({len(tool_trajectories) - 1} other examples expecting {tool_name} in this batch were also correct.)"
+            items.append(self._reflective_record(tool_trajectories[0], feedback))
         
-        if len(items) == 0:
-            raise Exception("No valid predictions found for any module.")
-        print(ret_d)
-        return ret_d
+        for cluster in self.failure_index.cluster(failures):
+            trajectory, output = cluster.representative
+            expected_call = f"{trajectory.expected_tool_call['name']}({trajectory.expected_tool_call.get('arguments', {})})"
+            error_analysis = self._analyze_error(trajectory, output)
+            feedback = f"The tool call is incorrect. Expected: {expected_call}. Error: {error_analysis}."
+            feedback += (f" This mistake occurred in {cluster.count} of "
+                         f"{len(trace_instances)} examples in this batch and "
+                         f"{self.failure_index.total_count(cluster.signature)} times so far in this run.")
+            if output.sample_scores:
+                correct = sum(1 for x in output.sample_scores if x >= 1.0)
+                feedback += f" For this example {correct} of {len(output.sample_scores)} sampled responses were correct."
+            items.append(self._reflective_record(trajectory, feedback))
+        
+        return items
+    
+    def _reflective_record(self, trajectory: ToolCallTrajectory, feedback: str) -> Dict[str, Any]:
+        # Format conversation history as input
+        conversation_lines = []
+        for msg in trajectory.conversation_history:
+            conversation_lines.append(f"{msg['role'].title()}: {msg['content']}")
+        input_text = "\n".join(conversation_lines)
+        
+        # Format the generated tool call as output
+        if trajectory.predicted_tool_call:
+            generated_output = f"Tool call: {trajectory.predicted_tool_call['name']}({trajectory.predicted_tool_call.get('arguments', {})})"
+        else:
+            generated_output = "No tool call made"
+        
+        # Create the sample in GEPA's expected format
+        return {
+            "Inputs": input_text,
+            "Generated Outputs": generated_output,
+            "Feedback": feedback,
+        }
+    
+    def _schema_errors(self, trajectory: ToolCallTrajectory) -> List[str]:
+        if not trajectory.predicted_tool_call:
+            return []
+        return self.validator.validate(trajectory.predicted_tool_call)
+    
+    def _failure_signature(self, trajectory: ToolCallTrajectory):
+        return failure_signature(trajectory.predicted_tool_call,
+                                 trajectory.expected_tool_call,
+                                 bool(self._schema_errors(trajectory)))
     
     def _analyze_error(self, 
                       trajectory: ToolCallTrajectory, 
                       output: ToolCallOutput) -> str:
-        if not trajectory.predicted_tool_call:
-            return "No tool call was made"
-        
-        if trajectory.predicted_tool_call["name"] != trajectory.expected_tool_call["name"]:
-            return f"Wrong tool selected: predicted {trajectory.predicted_tool_call['name']}, expected {trajectory.expected_tool_call['name']}"
+        signature = failure_signature(trajectory.predicted_tool_call, trajectory.expected_tool_call)
+        if signature.kind != "wrong_args":
+            return signature.describe()
         
         pred_args = trajectory.predicted_tool_call.get("arguments", {})
         exp_args = trajectory.expected_tool_call.get("arguments", {})
@@ -216,5 +640,8 @@ class SourcingConciergeGEPAAdapter(GEPAAdapter):
             error_parts.append(f"Missing arguments: {list(missing_args)}")
         if incorrect_args:
             error_parts.append(f"Incorrect arguments: {incorrect_args}")
+        schema_errors = self._schema_errors(trajectory)
+        if schema_errors:
+            error_parts.append(f"Schema violations: {schema_errors}")
         
         return "; ".join(error_parts) if error_parts else "Unknown error"
\ No newline at end of file
@@ -0,0 +1,127 @@
+import hashlib
+import re
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from .dedup import normalize_text
+from .eval_cache import text_digest
+
+_WORD = re.compile(r"[a-z0-9_]+")
+# Mersenne prime modulus of the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+
+def prompt_shingles(text: str, size: int = 3) -> Set[str]:
+    """Word n-grams of the normalized prompt, so case, whitespace and punctuation do not matter."""
+    words = _WORD.findall(normalize_text(text))
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHasher:
+    """MinHash signatures from num_perm universal hash permutations with a fixed seed."""
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        self._params = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "little") % (_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], "little") % _PRIME
+            self._params.append((a, b))
+
+    def signature(self, shingles: Set[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+                  for s in shingles]
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._params)
+
+
+class _Entry:
+    def __init__(self, shingles: Set[str]):
+        self.shingles = shingles
+        # instance digest -> (output, score)
+        self.results: Dict[str, Tuple[Any, float]] = {}
+
+
+class CandidateRegistry:
+    """
+    Evaluation results of every candidate seen in the run, indexed by a
+    MinHash/LSH index over the normalized system prompt.
+
+    A candidate whose system prompt is near-identical (word 3-gram Jaccard
+    similarity of at least threshold) to already scored candidates with the
+    same other components reuses their results: an instance's score is the
+    similarity-weighted mean over those neighbours and its output is the
+    closest neighbour's. Exact repeats are served by the evaluation cache
+    already; this catches rewrites that only change whitespace, sentence
+    order or a trivial sentence.
+    """
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._entries: Dict[str, _Entry] = {}
+        # (other components digest, band, band hash) -> candidate keys
+        self._buckets: Dict[Tuple[str, int, int], Set[str]] = {}
+        self._neighbours: Dict[str, List[Tuple[str, float]]] = {}
+        self.reused = 0
+        self.reused_candidates: Set[str] = set()
+
+    def _keys(self, candidate: Dict[str, str]) -> Tuple[str, str]:
+        others = text_digest(repr(sorted((k, v) for k, v in candidate.items() if k != "system_prompt")))
+        return text_digest(others + candidate.get("system_prompt", "")), others
+
+    def _bands(self, signature: Tuple[int, ...]) -> List[int]:
+        return [hash(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _entry(self, candidate: Dict[str, str]) -> Tuple[str, _Entry]:
+        key, others = self._keys(candidate)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(prompt_shingles(candidate.get("system_prompt", "")))
+            self._entries[key] = entry
+            self._neighbours.clear()
+            for band, band_hash in enumerate(self._bands(self.hasher.signature(entry.shingles))):
+                self._buckets.setdefault((others, band, band_hash), set()).add(key)
+        return key, entry
+
+    def neighbours(self, candidate: Dict[str, str]) -> List[Tuple[str, float]]:
+        """(candidate key, similarity) of the other registered candidates at or above the threshold."""
+        key, entry = self._entry(candidate)
+        if key not in self._neighbours:
+            _, others = self._keys(candidate)
+            matches = set()
+            for band, band_hash in enumerate(self._bands(self.hasher.signature(entry.shingles))):
+                matches |= self._buckets.get((others, band, band_hash), set())
+            matches.discard(key)
+            scored = [(match, jaccard(entry.shingles, self._entries[match].shingles)) for match in matches]
+            self._neighbours[key] = sorted([m for m in scored if m[1] >= self.threshold], key=lambda m: -m[1])
+        return self._neighbours[key]
+
+    def lookup(self, candidate: Dict[str, str], instance_key: str) -> Optional[Tuple[Any, float]]:
+        """Reused (output, score) for one instance, or None if no near-duplicate has scored it."""
+        scored = [(similarity, self._entries[match].results[instance_key])
+                  for match, similarity in self.neighbours(candidate)
+                  if instance_key in self._entries[match].results]
+        if not scored:
+            return None
+        self.reused += 1
+        self.reused_candidates.add(self._keys(candidate)[0])
+        total = sum(similarity for similarity, _ in scored)
+        score = sum(similarity * result[1] for similarity, result in scored) / total
+        return scored[0][1][0], score
+
+    def register(self, candidate: Dict[str, str], instance_key: str, output: Any, score: float):
+        _, entry = self._entry(candidate)
+        entry.results[instance_key] = (output, score)
+
+    def summary(self) -> str:
+        return (f"Near-duplicate candidates: reused {self.reused} instance scores for "
+                f"{len(self.reused_candidates)} of {len(self._entries)} candidates "
+                f"(similarity threshold {self.threshold})")
@@ -0,0 +1,100 @@
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Any, Tuple
+
+# Upper bounds of the history length buckets (in turns) that split strata
+_HISTORY_BUCKETS = (2, 4, 8)
+
+
+def stratum_key(instance: Any) -> Tuple[str, Tuple[str, ...], int]:
+    """Expected tool, its set of argument names and the history length bucket of an instance."""
+    expected = instance.expected_tool_call
+    turns = len(instance.history)
+    bucket = next((i for i, bound in enumerate(_HISTORY_BUCKETS) if turns <= bound), len(_HISTORY_BUCKETS))
+    return expected["name"], tuple(sorted(expected.get("arguments", {}))), bucket
+
+
+@dataclass
+class Coreset:
+    """
+    Weighted subset of the validation set. Each representative stands for
+    the N_h / n_h instances of its stratum, so the weighted mean of its
+    scores is the stratified estimate of the full-set mean.
+    """
+    instances: List[Any]
+    # Normalized to a mean of 1, so the plain mean of weighted scores is the estimate
+    weights: List[float]
+    # Stratum key -> (instances in the full set, representatives)
+    strata: Dict[Tuple, Tuple[int, int]]
+    full_size: int
+
+    def estimate(self, scores: List[float]) -> float:
+        return sum(w * s for w, s in zip(self.weights, scores)) / len(scores)
+
+    def error_bound(self, full_data: List[Any], full_scores: List[float], z: float = 1.96) -> float:
+        """
+        Half-width of the z confidence interval of the estimate's error, from
+        the within-stratum variance of full_scores (scores of every instance
+        of full_data) with the finite population correction.
+        """
+        by_stratum: Dict[Tuple, List[float]] = {}
+        for instance, score in zip(full_data, full_scores):
+            by_stratum.setdefault(stratum_key(instance), []).append(score)
+
+        variance = 0.0
+        for key, (population, sampled) in self.strata.items():
+            scores = by_stratum.get(key, [])
+            if len(scores) < 2 or sampled >= population:
+                continue
+            mean = sum(scores) / len(scores)
+            stratum_variance = sum((s - mean) ** 2 for s in scores) / (len(scores) - 1)
+            share = population / self.full_size
+            variance += share ** 2 * stratum_variance / sampled * (1 - sampled / population)
+        return z * math.sqrt(variance)
+
+
+def build_coreset(data: List[Any], size: int, seed: int = 0) -> Coreset:
+    """
+    Pick size representatives of data by stratified sampling: every stratum
+    (see stratum_key) gets at least one, the rest are allocated in proportion
+    to stratum size, and representatives are drawn at random within their
+    stratum.
+    """
+    strata: Dict[Tuple, List[Any]] = {}
+    for instance in data:
+        strata.setdefault(stratum_key(instance), []).append(instance)
+    if size < len(strata):
+        print(f"Warning: coreset size {size} is below the number of strata ({len(strata)}), using {len(strata)}")
+        size = len(strata)
+
+    # One per stratum, then the largest remainders of the proportional allocation
+    allocation = {key: 1 for key in strata}
+    spare = size - len(strata)
+    quotas = {key: spare * len(members) / len(data) for key, members in strata.items()}
+    for key, quota in quotas.items():
+        allocation[key] += int(quota)
+    leftover = size - sum(allocation.values())
+    for key in sorted(quotas, key=lambda k: quotas[k] - int(quotas[k]), reverse=True)[:leftover]:
+        allocation[key] += 1
+
+    rng = random.Random(seed)
+    instances, weights, sizes = [], [], {}
+    for key, members in strata.items():
+        sampled = min(allocation[key], len(members))
+        sizes[key] = (len(members), sampled)
+        for instance in rng.sample(members, sampled):
+            instances.append(instance)
+            weights.append(len(members) / sampled)
+
+    norm = len(instances) / len(data)
+    return Coreset(instances=instances, weights=[w * norm for w in weights], strata=sizes, full_size=len(data))
+
+
+def format_coreset_report(coreset: Coreset, full_data: List[Any], full_scores: List[float]) -> str:
+    full_mean = sum(full_scores) / len(full_scores)
+    by_id = {instance.id: score for instance, score in zip(full_data, full_scores)}
+    estimate = coreset.estimate([by_id[instance.id] for instance in coreset.instances])
+    return (f"Valset coreset: {len(coreset.instances)} of {coreset.full_size} examples in {len(coreset.strata)} strata. "
+            f"Seed score {full_mean:.3f} on the full valset, {estimate:.3f} estimated from the coreset "
+            f"(95% error bound +/-{coreset.error_bound(full_data, full_scores):.3f})")
@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
 import os
 import uuid
 from typing import Dict, List, Any, Optional
 from .tools import get_available_tools, get_tool_names
-from dotenv import load_dotenv
-
-load_dotenv()
+from .entry_index import DataEntryIndex
+from .entry_writer import DataEntryWriter
+from .tool_validator import get_validator
 
 class InteractiveDataGenerator:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.tools = get_available_tools()
         self.tool_names = get_tool_names()
+        self.validator = get_validator(self.tools)
         self.current_conversation = []
         self.current_id = None
         self.navigation_stack = []  # For back navigation
@@ -21,6 +23,9 @@ class InteractiveDataGenerator:
         # Ensure directories exist
         os.makedirs(os.path.join(data_dir, "train"), exist_ok=True)
         os.makedirs(os.path.join(data_dir, "eval"), exist_ok=True)
+        
+        self.index = DataEntryIndex(data_dir)
+        self.writer = DataEntryWriter(data_dir, self.index)
     
     def push_navigation_state(self, state_name: str, data: dict = None):
         """Push current state to navigation stack."""
@@ -44,56 +49,33 @@ class InteractiveDataGenerator:
         """Clear navigation stack for new conversation."""
         self.navigation_stack = []
     
-    def load_existing_data_entries(self):
-        """Load all existing data entries from train and eval directories."""
-        all_entries = []
-        
-        for split in ["train", "eval"]:
-            split_dir = os.path.join(self.data_dir, split)
-            if not os.path.exists(split_dir):
-                continue
-                
-            for filename in os.listdir(split_dir):
-                if filename.endswith('.jsonl'):
-                    filepath = os.path.join(split_dir, filename)
-                    try:
-                        with open(filepath, 'r') as f:
-                            for line_num, line in enumerate(f, 1):
-                                line = line.strip()
-                                if line and not line.startswith('//'):  # Skip comments
-                                    try:
-                                        entry = json.loads(line)
-                                        entry['_source_file'] = filename
-                                        entry['_source_split'] = split
-                                        entry['_line_number'] = line_num
-                                        all_entries.append(entry)
-                                    except json.JSONDecodeError as e:
-                                        print(f"⚠️ Skipping invalid JSON in {filename}:{line_num}")
-                    except Exception as e:
-                        print(f"⚠️ Error reading {filepath}: {e}")
-        
-        return all_entries
-    
     def copy_existing_data(self):
         """Copy an existing data entry to modify."""
         print("\n📋 Copy Existing Data Entry")
         print("=" * 40)
         
-        # Load all existing entries
-        entries = self.load_existing_data_entries()
+        # Bring the index up to date with entries written since it was last opened
+        self.index.sync()
         
-        if not entries:
-            print("❌ No existing data entries found.")
-            input("Press Enter to continue...")
-            return False
+        page_size = 10
+        query = ""
+        page = 0
         
         # Display entries with search functionality
         while True:
-            print(f"\nFound {len(entries)} existing data entries:")
+            total, entries = self.index.search(query, limit=page_size, offset=page * page_size)
             
-            # Display first 10 entries
-            display_entries = entries[:10]
-            for i, entry in enumerate(display_entries, 1):
+            if total == 0 and not query:
+                print("❌ No existing data entries found.")
+                input("Press Enter to continue...")
+                return False
+            
+            if query:
+                print(f"\nFound {total} entries matching '{query}':")
+            else:
+                print(f"\nFound {total} existing data entries:")
+            
+            for i, entry in enumerate(entries, 1):
                 history_preview = entry['history'][:2] if entry['history'] else []
                 preview_text = " -> ".join([f"{msg['role']}: {msg['content'][:50]}..." 
                                           for msg in history_preview])
@@ -102,13 +84,19 @@ class InteractiveDataGenerator:
                 
                 print(f"{i:2}. {entry['id']} ({entry['_source_split']}) - {preview_text}")
             
-            if len(entries) > 10:
-                print(f"    ... and {len(entries)-10} more entries")
+            num_pages = max(1, (total + page_size - 1) // page_size)
+            print(f"    Page {page + 1} of {num_pages}")
             
             print(f"\nOptions:")
-            print(f"1-{min(10, len(entries))}. Copy entry by number")
-            print("s. Search by ID")
-            print("a. Show all entries")
+            if entries:
+                print(f"1-{len(entries)}. Copy entry by number")
+            print("s. Search by ID, message text or tool name")
+            if query:
+                print("c. Clear search")
+            if page + 1 < num_pages:
+                print("n. Next page")
+            if page > 0:
+                print("p. Previous page")
             print("b. Back to main menu")
             
             choice = input("Choose option: ").strip().lower()
@@ -116,32 +104,27 @@ class InteractiveDataGenerator:
             if choice == 'b':
                 return False
             elif choice == 's':
-                search_id = input("Enter ID to search: ").strip()
-                matching = [e for e in entries if search_id.lower() in e['id'].lower()]
-                if matching:
-                    entries = matching
-                    print(f"Found {len(matching)} matching entries")
-                else:
-                    print("❌ No matching entries found")
+                query = input("Enter search text: ").strip()
+                page = 0
                 continue
-            elif choice == 'a':
-                for i, entry in enumerate(entries, 1):
-                    history_preview = entry['history'][:2] if entry['history'] else []
-                    preview_text = " -> ".join([f"{msg['role']}: {msg['content'][:50]}..." 
-                                              for msg in history_preview])
-                    if len(entry['history']) > 2:
-                        preview_text += f" ... (+{len(entry['history'])-2} more messages)"
-                    
-                    print(f"{i:3}. {entry['id']} ({entry['_source_split']}) - {preview_text}")
+            elif choice == 'c':
+                query = ""
+                page = 0
+                continue
+            elif choice == 'n' and page + 1 < num_pages:
+                page += 1
+                continue
+            elif choice == 'p' and page > 0:
+                page -= 1
                 continue
             else:
                 try:
                     idx = int(choice) - 1
-                    if 0 <= idx < min(10, len(entries)):
+                    if 0 <= idx < len(entries):
                         selected_entry = entries[idx]
                         break
                     else:
-                        print(f"❌ Please enter a number between 1 and {min(10, len(entries))}")
+                        print(f"❌ Please enter a number between 1 and {len(entries)}")
                 except ValueError:
                     print("❌ Invalid input")
         
@@ -342,9 +325,19 @@ class InteractiveDataGenerator:
         
         print(f"\n✅ Created expected tool call:")
         print(json.dumps(expected_tool_call, indent=2))
+        self._print_schema_errors(expected_tool_call)
         
         return expected_tool_call
     
+    def _print_schema_errors(self, expected_tool_call: Dict[str, Any]) -> bool:
+        """Print the schema violations of a tool call, returning True if there were any."""
+        schema_errors = self.validator.validate(expected_tool_call)
+        if schema_errors:
+            print("⚠️ Tool call does not match the tool schema:")
+            for error in schema_errors:
+                print(f"  - {error}")
+        return bool(schema_errors)
+    
     def review_and_modify_data(self, expected_tool_call: Dict[str, Any]) -> tuple[bool, Dict[str, Any]]:
         """Review the complete data entry and allow modifications."""
         print("\n" + "=" * 60)
@@ -368,6 +361,9 @@ class InteractiveDataGenerator:
             choice = input("\nChoose option (1-4): ").strip()
             
             if choice == "1":
+                if self._print_schema_errors(expected_tool_call):
+                    print("❌ Fix the expected tool call before saving")
+                    continue
                 return True, expected_tool_call
             elif choice == "2":
                 self._modify_conversation_history()
@@ -386,18 +382,35 @@ class InteractiveDataGenerator:
             "expected_tool_call": expected_tool_call
         }
         
-        # Choose filename
-        split_dir = os.path.join(self.data_dir, split)
-        filename = f"{split}_data.jsonl"
-        filepath = os.path.join(split_dir, filename)
+        try:
+            self.writer.add(data_entry, split)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
         
-        # Append to file
-        with open(filepath, "a") as f:
-            f.write(json.dumps(data_entry) + "\n")
+        if not self.writer.flush(split):
+            return False
         
-        print(f"💾 Saved data entry to {filepath}")
+        print(f"💾 Saved data entry to {self.writer.filepath(split)}")
         return True
     
+    def import_data_entries(self, filepath: str, split: str = "train"):
+        """Bulk import data entries from a JSONL file into a split."""
+        def read_entries():
+            with open(filepath, 'r') as f:
+                for line_num, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line or line.startswith('//'):
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Skipping invalid JSON in {filepath}:{line_num}")
+        
+        written, skipped = self.writer.import_entries(read_entries(), split)
+        print(f"💾 Imported {written} data entries into {self.writer.filepath(split)} ({skipped} skipped)")
+        return written
+    
     def _display_current_conversation(self):
         """Display the current conversation history."""
         for i, msg in enumerate(self.current_conversation, 1):
@@ -636,9 +649,10 @@ class InteractiveDataGenerator:
                                 break
                             print("❌ Please enter 'train' or 'eval'")
                         
-                        self.save_data_entry(expected_tool_call, split)
-                        print("✅ Data entry saved successfully!")
-                        return True
+                        if self.save_data_entry(expected_tool_call, split):
+                            print("✅ Data entry saved successfully!")
+                            return True
+                        continue
                     else:
                         print("🗑️ Data entry discarded")
                         return False
@@ -668,8 +682,38 @@ class InteractiveDataGenerator:
 
 def main():
     """Run the interactive data generator."""
+    parser = argparse.ArgumentParser(description="Create training and evaluation data for GEPA optimization")
+    parser.add_argument("--import", dest="import_path", metavar="FILE",
+                        help="Bulk import data entries from a JSONL file instead of starting the interactive session")
+    parser.add_argument("--split", choices=["train", "eval"], default="train",
+                        help="Split to import or generate entries into (default: train)")
+    parser.add_argument("--synthetic", type=int, metavar="ROWS",
+                        help="Generate ROWS synthetic entries from conversation templates instead of starting the interactive session")
+    parser.add_argument("--output-dir",
+                        help="Directory for synthetic shards (default: $DATA_DIR/synthetic/<split>)")
+    parser.add_argument("--shards", type=int, default=8, help="Number of synthetic JSONL shards (default: 8)")
+    parser.add_argument("--workers", type=int, help="Worker processes for synthetic generation (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic generation (default: 0)")
+    args = parser.parse_args()
+    
+    from dotenv import load_dotenv
+    load_dotenv()
+    
     data_dir = os.getenv('DATA_DIR')
+    if args.synthetic is not None:
+        if args.synthetic < 1:
+            parser.error("--synthetic needs a positive number of rows")
+        from .synthetic import generate_synthetic_dataset
+        output_dir = args.output_dir or os.path.join(data_dir or "data", "synthetic", args.split)
+        written, unique = generate_synthetic_dataset(output_dir, args.synthetic, args.shards, args.workers, args.seed)
+        print(f"💾 Generated {written} synthetic data entries in {output_dir} "
+              f"({unique} unique, {unique / written:.1%}; duplicates are dropped when loading)")
+        return
+    
     generator = InteractiveDataGenerator(data_dir)
+    if args.import_path:
+        generator.import_data_entries(args.import_path, args.split)
+        return
     generator.run_interactive_session()
 
 
@@ -1,9 +1,16 @@
 import json
 import os
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Set, Tuple
+from dataclasses import dataclass, field
 
 from .tools import get_available_tools
+from .dedup import FingerprintIndex, find_leakage
+from .tool_validator import get_validator
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where reads are left unlocked
+    fcntl = None
 
 
 @dataclass
@@ -11,36 +18,217 @@ class ChatDataInstance:
     id: str
     history: List[Dict[str, str]]  # List of conversation turns
     expected_tool_call: Dict[str, Any]  # Tool call with name and filled variables
+    fingerprint: Optional[str] = field(default=None, compare=False, repr=False)  # Normalized content hash
+
+
+@dataclass
+class _FileState:
+    offset: int  # Byte offset just past the last complete record read
+    size: int
+    mtime: float
 
 
 class SourcingDatasetLoader:
-    def __init__(self, data_dir: str):
+    """
+    Loads dataset splits from data_dir/<split>/*.jsonl, dropping records whose
+    content was already loaded for the split. Record fingerprints are cached in
+    data_dir/.fingerprints.json, which is only written when it changed and not at all with persist_fingerprints=False (for read-only
+    commands). Files are read under a shared lock, so a DataEntryWriter never
+    appends to a file between its read and its stat.
+    """
+    def __init__(self, data_dir: str, fingerprint_path: Optional[str] = None, persist_fingerprints: bool = True):
         self.data_dir = data_dir
+        self.persist_fingerprints = persist_fingerprints
+        self._file_states: Dict[str, _FileState] = {}
+        self._seen_fingerprints: Dict[str, Set[str]] = {}
+        self.fingerprint_index = FingerprintIndex(
+            fingerprint_path or os.path.join(data_dir, ".fingerprints.json")
+        )
     
     def load_dataset(self, split: str) -> List[ChatDataInstance]:
         split_dir = os.path.join(self.data_dir, split)
         instances = []
+        duplicates = 0
         
+        self._seen_fingerprints[split] = set()
         for filename in os.listdir(split_dir):
             if filename.endswith('.jsonl'):
                 filepath = os.path.join(split_dir, filename)
-                instances.extend(self._load_jsonl(filepath))
+                loaded, dropped = self._load_jsonl(split, filepath)
+                instances.extend(loaded)
+                duplicates += dropped
         
-        return instances
+        return self._finish_load(split, instances, duplicates)
     
-    def _load_jsonl(self, filepath: str) -> List[ChatDataInstance]:
+    def load_new_instances(self, split: str) -> List[ChatDataInstance]:
+        """
+        Load only the records appended to the split's .jsonl files (or files
+        created) since they were last read by this loader.
+        """
+        split_dir = os.path.join(self.data_dir, split)
         instances = []
-        with open(filepath, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    data = json.loads(line)
-                    instances.append(ChatDataInstance(
-                        id=data['id'],
-                        history=data['history'],
-                        expected_tool_call=data['expected_tool_call']
-                    ))
+        duplicates = 0
+        
+        for filename in os.listdir(split_dir):
+            if not filename.endswith('.jsonl'):
+                continue
+            filepath = os.path.join(split_dir, filename)
+            stat = os.stat(filepath)
+            state = self._file_states.get(filepath)
+            
+            if state is None:
+                loaded, dropped = self._load_jsonl(split, filepath)
+            elif stat.st_size < state.offset:
+                print(f"Warning: {filepath} was truncated or rewritten, its records are not reloaded")
+                self._file_states[filepath] = _FileState(stat.st_size, stat.st_size, stat.st_mtime)
+                continue
+            elif stat.st_size != state.size or stat.st_mtime != state.mtime:
+                loaded, dropped = self._load_jsonl(split, filepath, state.offset)
+            else:
+                continue
+            instances.extend(loaded)
+            duplicates += dropped
+        
+        return self._finish_load(split, instances, duplicates)
+    
+    def _finish_load(self, split: str, instances: List[ChatDataInstance], duplicates: int) -> List[ChatDataInstance]:
+        """Report the duplicates dropped while loading and persist the fingerprints."""
+        if duplicates:
+            print(f"Dropped {duplicates} duplicate {split} examples")
+        if self.persist_fingerprints:
+            self.fingerprint_index.save()
         return instances
     
+    def _load_jsonl(self, split: str, filepath: str, offset: int = 0) -> Tuple[List[ChatDataInstance], int]:
+        seen = self._seen_fingerprints.setdefault(split, set())
+        instances, duplicates, end_offset, stat = self._read_records(filepath, offset, seen)
+        self._file_states[filepath] = _FileState(end_offset, stat.st_size, stat.st_mtime)
+        return instances, duplicates
+    
+    def _read_records(self,
+                      filepath: str,
+                      offset: int,
+                      seen: Set[str]) -> Tuple[List[ChatDataInstance], int, int, os.stat_result]:
+        """
+        Read the records of filepath from offset, dropping those whose fingerprint
+        is in seen (and adding the others). Returns (instances, duplicates dropped,
+        end offset, stat).
+        """
+        with open(filepath, 'rb') as f:
+            # DataEntryWriter appends under an exclusive lock
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+            f.seek(offset)
+            raw = f.read()
+            stat = os.fstat(f.fileno())
+        
+        # A file with the size and mtime it had when it was last read has its
+        # fingerprints cached, so only the records that are not duplicates are parsed
+        records = None
+        cached = self.fingerprint_index.cached(filepath, stat) if offset == 0 else None
+        if cached is not None:
+            end, fingerprints = cached
+            lines = [line for line in raw[:end].decode('utf-8').splitlines() if line.strip()]
+            if len(lines) != len(fingerprints):
+                cached = None
+        
+        if cached is None:
+            # A trailing line without a newline may still be being written; it is only
+            # consumed once it parses as a complete record
+            end = raw.rfind(b"\n") + 1
+            tail = raw[end:].strip()
+            if tail:
+                try:
+                    json.loads(tail)
+                    end = len(raw)
+                except json.JSONDecodeError:
+                    pass
+            
+            lines = [line for line in raw[:end].decode('utf-8').splitlines() if line.strip()]
+            records = [json.loads(line) for line in lines]
+            fingerprints = self.fingerprint_index.fingerprints(filepath, offset, offset + end, records, stat)
+        
+        instances = []
+        duplicates = 0
+        for i, (line, fingerprint) in enumerate(zip(lines, fingerprints)):
+            if fingerprint in seen:
+                duplicates += 1
+                continue
+            seen.add(fingerprint)
+            data = records[i] if records is not None else json.loads(line)
+            instances.append(ChatDataInstance(
+                id=data['id'],
+                history=data['history'],
+                expected_tool_call=data['expected_tool_call'],
+                fingerprint=fingerprint
+            ))
+        return instances, duplicates, offset + end, stat
+    
     def get_tool_definitions(self) -> List[Dict[str, Any]]:
-        return get_available_tools()
\ No newline at end of file
+        return get_available_tools()
+
+
+class GrowingDataset(list):
+    """
+    A dataset split that picks up records appended to its files while an
+    optimization run is in progress.
+    
+    It is a plain list of instances that grows in place. GEPA's minibatch
+    sampler (EpochShuffledBatchSampler) shuffles the trainset indices once per
+    epoch, i.e. every len(trainset) / minibatch size iterations, from the
+    trainset's length at that point, and gepa 0.0.4 has no hook to refresh
+    the list before it samples. Appended instances are therefore first
+    sampled in the epoch after they were picked up, which can be up to a
+    whole epoch later.
+    
+    Appended instances get the same schema and leakage checks as the loaded
+    data (see report_dataset_problems), against eval_data if it is set.
+    """
+    def __init__(self,
+                 data_loader: SourcingDatasetLoader,
+                 split: str,
+                 eval_data: Optional[List[ChatDataInstance]] = None):
+        super().__init__(data_loader.load_dataset(split))
+        self.data_loader = data_loader
+        self.split = split
+        self.eval_data = eval_data
+    
+    def refresh(self) -> int:
+        """Append newly written records, report any problems with them, and return how many were added."""
+        new_instances = self.data_loader.load_new_instances(self.split)
+        if new_instances:
+            report_dataset_problems(new_instances, self.eval_data or [], self.data_loader.get_tool_definitions(),
+                                    validate_eval=False)
+        self.extend(new_instances)
+        return len(new_instances)
+
+
+def report_dataset_problems(train_data: List[ChatDataInstance],
+                            eval_data: List[ChatDataInstance],
+                            tool_definitions: Optional[List[Dict[str, Any]]] = None,
+                            validate_eval: bool = True) -> int:
+    """
+    Print a warning for every expected tool call that violates its tool schema
+    and for every evaluation example that also appears in the training data.
+    With validate_eval=False only the training data's tool calls are checked,
+    e.g. for training examples appended to an already checked dataset.
+    Returns the number of problems found.
+    """
+    problems = 0
+    validator = get_validator(tool_definitions)
+    splits = (("train", train_data), ("eval", eval_data)) if validate_eval else (("train", train_data),)
+    for split, instances in splits:
+        for instance in instances:
+            schema_errors = validator.validate(instance.expected_tool_call)
+            if schema_errors:
+                problems += 1
+                print(f"Warning: {split} example {instance.id} has an invalid expected tool call: {'; '.join(schema_errors)}")
+    
+    leaked = find_leakage(train_data, eval_data)
+    if leaked:
+        problems += len(leaked)
+        print(f"Warning: {len(leaked)} evaluation examples also appear in the training data:")
+        for train_id, eval_id in leaked:
+            print(f"  eval {eval_id} == train {train_id}")
+    
+    return problems
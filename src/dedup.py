@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Any, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {k: _normalize_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize_value(v) for v in value]
+    return value
+
+
+def instance_fingerprint(history: List[Dict[str, str]], expected_tool_call: Dict[str, Any]) -> str:
+    """
+    Content hash of a data instance over its normalized history and expected tool
+    call. Case and whitespace differences do not change the fingerprint.
+    """
+    payload = json.dumps({
+        "history": [[msg.get("role"), normalize_text(msg.get("content", ""))] for msg in history],
+        "expected_tool_call": _normalize_value(expected_tool_call)
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class FingerprintIndex:
+    """
+    Fingerprints of the records of every dataset file, persisted next to the data
+    so unchanged files (and the already read part of appended ones) are not
+    hashed again on the next load, and duplicates in unchanged files are
+    dropped without being parsed.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._files = json.load(f).get("files", {})
+            except (OSError, json.JSONDecodeError):
+                print(f"Warning: ignoring unreadable fingerprint file {path}")
+
+    def cached(self, filepath: str, stat: os.stat_result) -> Optional[Tuple[int, List[str]]]:
+        """
+        (end offset, fingerprints) of the records of filepath as last read, or
+        None if the file's size or mtime changed since then.
+        """
+        entry = self._files.get(os.path.abspath(filepath))
+        if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+            return None
+        return entry["offset"], entry["fingerprints"]
+
+    def fingerprints(self,
+                     filepath: str,
+                     offset: int,
+                     end_offset: int,
+                     records: List[Dict[str, Any]],
+                     stat: os.stat_result) -> List[str]:
+        """
+        Fingerprints of the records read from filepath between offset and
+        end_offset, stored after the persisted ones of the part before offset.
+        stat is the file's status when the records were read.
+        """
+        key = os.path.abspath(filepath)
+        entry = self._files.get(key)
+
+        fingerprints = [instance_fingerprint(r["history"], r["expected_tool_call"]) for r in records]
+
+        if offset > 0 and entry is not None and entry["offset"] == offset:
+            stored = entry["fingerprints"] + fingerprints
+        else:
+            stored = fingerprints
+        self._files[key] = {
+            "offset": end_offset,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "fingerprints": stored
+        }
+        self._dirty = True
+        return fingerprints
+
+    def save(self):
+        """Write the fingerprints if any were added or changed since they were loaded or saved."""
+        if not self._dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "files": self._files}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def find_leakage(train_data: List[Any], eval_data: List[Any]) -> List[Tuple[str, str]]:
+    """(train id, eval id) pairs of instances with the same fingerprint in both splits."""
+    train_ids: Dict[str, str] = {}
+    for instance in train_data:
+        train_ids.setdefault(instance.fingerprint, instance.id)
+
+    return [(train_ids[instance.fingerprint], instance.id)
+            for instance in eval_data if instance.fingerprint in train_ids]
@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+from typing import Dict, List, Any, Optional, Tuple
+
+SPLITS = ["train", "eval"]
+
+
+class DataEntryIndex:
+    """
+    Persistent SQLite index of the labelled data entries in data_dir, used by the
+    data generator to browse and search entries without re-reading every file.
+
+    Message text, ids and expected tool names are indexed with FTS5 when the
+    SQLite build supports it (falling back to LIKE scans otherwise). Files are
+    indexed incrementally: only lines appended since the last sync are read.
+    """
+    def __init__(self, data_dir: str, path: Optional[str] = None):
+        self.data_dir = data_dir
+        self.path = path or os.path.join(data_dir, ".entry_index.sqlite")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                lines INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                split TEXT NOT NULL,
+                source_file TEXT NOT NULL,
+                line_number INTEGER NOT NULL,
+                entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_id ON entries(id);
+            CREATE INDEX IF NOT EXISTS entries_file ON entries(split, source_file);
+        """)
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(id, messages, tools)"
+            )
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self.conn.commit()
+
+    def sync(self) -> int:
+        """
+        Index entries appended to any split file since the last sync and return
+        how many were added. Entries of split files that no longer exist are
+        removed from the index.
+        """
+        added = 0
+        present = set()
+        for split in SPLITS:
+            split_dir = os.path.join(self.data_dir, split)
+            if not os.path.exists(split_dir):
+                continue
+            for filename in os.listdir(split_dir):
+                if filename.endswith('.jsonl'):
+                    present.add((split, filename))
+                    added += self.sync_file(split, filename)
+        self._prune(present)
+        return added
+
+    def _prune(self, present: set):
+        """Remove the entries of indexed split files that are not in present."""
+        indexed = set(self.conn.execute("SELECT DISTINCT split, source_file FROM entries").fetchall())
+        for (path,) in self.conn.execute("SELECT path FROM files").fetchall():
+            split_dir, filename = os.path.split(path)
+            indexed.add((os.path.basename(split_dir), filename))
+        missing = [key for key in indexed if key not in present]
+        if not missing:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for split, filename in missing:
+                self._remove_file(split, filename)
+                self.conn.execute(
+                    "DELETE FROM files WHERE path = ?", (os.path.join(self.data_dir, split, filename),)
+                )
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def sync_file(self, split: str, filename: str) -> int:
+        """
+        Index the entries appended to one split file since it was last indexed.
+        The stored offset is read, the appended entries inserted and the offset
+        advanced in one write transaction, so processes syncing the same file
+        concurrently never index the same lines twice.
+        """
+        filepath = os.path.join(self.data_dir, split, filename)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            added = self._sync_file(split, filename, filepath)
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+        return added
+
+    def _sync_file(self, split: str, filename: str, filepath: str) -> int:
+        stat = os.stat(filepath)
+        row = self.conn.execute(
+            "SELECT offset, size, mtime, lines FROM files WHERE path = ?", (filepath,)
+        ).fetchone()
+
+        offset, line_number = 0, 0
+        if row is not None:
+            if row[1] == stat.st_size and row[2] == stat.st_mtime:
+                return 0
+            if stat.st_size >= row[0]:
+                offset, line_number = row[0], row[3]
+            else:
+                # The file was rewritten, so its entries are indexed from scratch
+                self._remove_file(split, filename)
+
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            raw = f.read()
+        end = raw.rfind(b"\n") + 1
+
+        added = 0
+        for line in raw[:end].decode('utf-8').split("\n")[:-1]:
+            line_number += 1
+            line = line.strip()
+            if not line or line.startswith('//'):  # Skip comments
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ Skipping invalid JSON in {filename}:{line_number}")
+                continue
+            self._insert(entry, split, filename, line_number)
+            added += 1
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, offset, size, mtime, lines) VALUES (?, ?, ?, ?, ?)",
+            (filepath, offset + end, stat.st_size, stat.st_mtime, line_number)
+        )
+        return added
+
+    def _insert(self, entry: Dict[str, Any], split: str, filename: str, line_number: int):
+        cursor = self.conn.execute(
+            "INSERT INTO entries (id, split, source_file, line_number, entry) VALUES (?, ?, ?, ?, ?)",
+            (entry.get('id', ''), split, filename, line_number, json.dumps(entry))
+        )
+        if self.has_fts:
+            messages = "\n".join(msg.get('content', '') for msg in entry.get('history', []))
+            tools = entry.get('expected_tool_call', {}).get('name', '')
+            self.conn.execute(
+                "INSERT INTO entries_fts (rowid, id, messages, tools) VALUES (?, ?, ?, ?)",
+                (cursor.lastrowid, entry.get('id', ''), messages, tools)
+            )
+
+    def _remove_file(self, split: str, filename: str):
+        if self.has_fts:
+            self.conn.execute(
+                "DELETE FROM entries_fts WHERE rowid IN "
+                "(SELECT rowid FROM entries WHERE split = ? AND source_file = ?)",
+                (split, filename)
+            )
+        self.conn.execute("DELETE FROM entries WHERE split = ? AND source_file = ?", (split, filename))
+
+    def search(self, query: str = "", limit: int = 10, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Return (total matches, one page of entries) for a search over ids, message
+        text and expected tool names, best matches first. An empty query pages
+        through all entries in file order.
+        """
+        terms = query.split()
+        if not terms:
+            total = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            rows = self.conn.execute(
+                "SELECT split, source_file, line_number, entry FROM entries ORDER BY rowid LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        elif self.has_fts:
+            # Every term is matched as a quoted prefix so ids and words can be typed partially
+            match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+            total = self.conn.execute(
+                "SELECT COUNT(*) FROM entries_fts WHERE entries_fts MATCH ?", (match,)
+            ).fetchone()[0]
+            rows = self.conn.execute(
+                "SELECT e.split, e.source_file, e.line_number, e.entry FROM entries_fts "
+                "JOIN entries e ON e.rowid = entries_fts.rowid "
+                "WHERE entries_fts MATCH ? ORDER BY bm25(entries_fts) LIMIT ? OFFSET ?",
+                (match, limit, offset)
+            ).fetchall()
+        else:
+            where = " AND ".join("(id LIKE ? OR entry LIKE ?)" for _ in terms)
+            params = [p for term in terms for p in (f"%{term}%", f"%{term}%")]
+            total = self.conn.execute(f"SELECT COUNT(*) FROM entries WHERE {where}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT split, source_file, line_number, entry FROM entries WHERE {where} "
+                "ORDER BY rowid LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        entries = []
+        for split, source_file, line_number, data in rows:
+            entry = json.loads(data)
+            entry['_source_file'] = source_file
+            entry['_source_split'] = split
+            entry['_line_number'] = line_number
+            entries.append(entry)
+        return total, entries
+
+    def contains_id(self, entry_id: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM entries WHERE id = ? LIMIT 1", (entry_id,)
+        ).fetchone() is not None
+
+    def close(self):
+        self.conn.close()
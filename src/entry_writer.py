@@ -0,0 +1,142 @@
+import json
+import os
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where appends are left unlocked
+    fcntl = None
+
+from .entry_index import DataEntryIndex
+from .tool_validator import ToolCallValidator, get_validator
+
+
+class DataEntryWriter:
+    """
+    Appends data entries to data_dir/<split>/<split>_data.jsonl.
+    
+    Entries are buffered and written in batches. Each batch is appended with a
+    single write under an exclusive lock on data_dir/.entries.lock and fsync'ed,
+    so concurrent writers never interleave or tear lines. The lock is shared by
+    all splits because ids are unique across them: ids are checked against the
+    index and the pending batch, and re-checked under the lock before writing.
+    Expected tool calls that violate the tool schemas are rejected.
+    """
+    def __init__(self,
+                 data_dir: str,
+                 index: Optional[DataEntryIndex] = None,
+                 batch_size: int = 1000,
+                 validator: Optional[ToolCallValidator] = None):
+        self.data_dir = data_dir
+        self.index = index or DataEntryIndex(data_dir)
+        self.validator = validator or get_validator()
+        self.batch_size = batch_size
+        self._buffers: Dict[str, List[Tuple[str, str]]] = {}
+        self._pending_ids: Set[str] = set()
+        self.entries_written = 0
+        
+        self.index.sync()
+    
+    def filename(self, split: str) -> str:
+        return f"{split}_data.jsonl"
+    
+    def filepath(self, split: str) -> str:
+        return os.path.join(self.data_dir, split, self.filename(split))
+    
+    def lockpath(self) -> str:
+        return os.path.join(self.data_dir, ".entries.lock")
+    
+    def add(self, entry: Dict[str, Any], split: str = "train"):
+        """
+        Buffer an entry for writing, raising ValueError if its id is already taken
+        or its expected tool call violates the tool schema.
+        """
+        entry_id = entry["id"]
+        if entry_id in self._pending_ids or self.index.contains_id(entry_id):
+            raise ValueError(f"Data entry id {entry_id} already exists")
+        
+        schema_errors = self.validator.validate(entry["expected_tool_call"])
+        if schema_errors:
+            raise ValueError(f"Data entry {entry_id} has an invalid expected tool call: {'; '.join(schema_errors)}")
+        
+        buffer = self._buffers.setdefault(split, [])
+        buffer.append((entry_id, json.dumps(entry) + "\n"))
+        self._pending_ids.add(entry_id)
+        
+        if len(buffer) >= self.batch_size:
+            self.flush(split)
+    
+    def flush(self, split: Optional[str] = None) -> int:
+        """Write the buffered entries (of one split, or all) and return how many were written."""
+        written = 0
+        for buffered_split in [split] if split else list(self._buffers):
+            buffer = self._buffers.get(buffered_split)
+            if buffer:
+                # The entries stay buffered until they are on disk, so a failed write can be retried
+                written += self._append(buffered_split, buffer)
+            self._buffers.pop(buffered_split, None)
+            for entry_id, _ in buffer or []:
+                self._pending_ids.discard(entry_id)
+        return written
+    
+    def _append(self, split: str, buffer: List[Tuple[str, str]]) -> int:
+        os.makedirs(os.path.join(self.data_dir, split), exist_ok=True)
+        lock_fd = os.open(self.lockpath(), os.O_RDWR | os.O_CREAT, 0o644)
+        fd = None
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            fd = os.open(self.filepath(split), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            
+            # Another writer, to this or another split, may have added some of these ids since they were buffered
+            self.index.sync()
+            lines = []
+            for entry_id, line in buffer:
+                if self.index.contains_id(entry_id):
+                    print(f"⚠️ Skipping data entry {entry_id}: id was written by another writer")
+                else:
+                    lines.append(line)
+            
+            data = "".join(lines).encode("utf-8")
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+            # Indexed before the lock is released, so the next writer sees these ids
+            self.index.sync_file(split, self.filename(split))
+        finally:
+            if fd is not None:
+                os.close(fd)
+            if fcntl is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
+        
+        self.entries_written += len(lines)
+        return len(lines)
+    
+    def import_entries(self, entries: Iterable[Dict[str, Any]], split: str = "train") -> Tuple[int, int]:
+        """
+        Bulk import entries, skipping malformed or schema-invalid ones and ids that
+        already exist. Returns (written, skipped).
+        """
+        written_before = self.entries_written
+        skipped = 0
+        for entry in entries:
+            if not all(key in entry for key in ("id", "history", "expected_tool_call")):
+                skipped += 1
+                continue
+            try:
+                self.add(entry, split)
+            except ValueError as e:
+                print(f"⚠️ Skipping: {e}")
+                skipped += 1
+        self.flush(split)
+        
+        written = self.entries_written - written_before
+        return written, skipped
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
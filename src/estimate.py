@@ -0,0 +1,264 @@
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+# Encoding of the tiktoken tokenizer used to count tokens (that of current OpenAI models)
+TOKENIZER_ENCODING = "o200k_base"
+# Where tiktoken downloads that encoding from, and the SHA-256 of the file
+_ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+_ENCODING_SHA256 = "446a9538cb6c348e3516120d7c08b09f57c36495e2acfffe59a5bf8b0cfb1a2d"
+
+# Pieces roughly as a BPE pre-tokenizer splits text: contractions, words with
+# their leading space, short digit runs, punctuation runs and whitespace
+_PIECES = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+
+# Common words are a single token; longer words split into chunks of about this many characters
+_CHARS_PER_WORD_TOKEN = 6
+
+# GEPA's reflection prompt around the current instruction and examples
+REFLECTION_TEMPLATE_TOKENS = 400
+# Per-message overhead of the chat format (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Labels and feedback prose the adapter adds to each reflective record
+REFLECTIVE_RECORD_OVERHEAD_TOKENS = 60
+
+# GEPA's default reflection minibatch size; optimize does not override it
+DEFAULT_MINIBATCH_SIZE = 3
+
+
+_encoding: Any = None
+
+
+def _cached_encoding_file() -> Optional[str]:
+    """
+    The encoding file in tiktoken's cache (TIKTOKEN_CACHE_DIR, DATA_GYM_CACHE_DIR
+    or the temp directory, as tiktoken.load.read_file_cached looks it up), if
+    it is there and intact.
+    """
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR", os.environ.get("DATA_GYM_CACHE_DIR"))
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return None
+    path = os.path.join(cache_dir, hashlib.sha1(_ENCODING_URL.encode()).hexdigest())
+    try:
+        with open(path, "rb") as f:
+            intact = hashlib.sha256(f.read()).hexdigest() == _ENCODING_SHA256
+    except OSError:
+        return None
+    return path if intact else None
+
+
+def _tokenizer() -> Any:
+    """
+    The tiktoken encoding, or False if tiktoken or its encoding file is not
+    available locally. Estimates never make network calls, so the file is not
+    downloaded; running tiktoken.get_encoding("o200k_base") once with network
+    access caches it.
+    """
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        try:
+            import tiktoken
+        except ImportError:
+            return _encoding
+        if _cached_encoding_file():
+            # Served from the cache checked above, without a download
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+    return _encoding
+
+
+def token_counter() -> str:
+    """Name of the tokenizer count_tokens uses, for labelling reports."""
+    return f"tiktoken {TOKENIZER_ENCODING}" if _tokenizer() else "approximate"
+
+
+def approximate_tokens(text: str) -> int:
+    """
+    Approximate the number of tokens in text, close to what BPE tokenizers
+    such as cl100k/o200k produce for English and JSON.
+    """
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        word = piece.strip()
+        if not word:
+            tokens += 1 if len(piece) > 1 else 0
+        elif word.isalpha():
+            tokens += math.ceil(len(word) / _CHARS_PER_WORD_TOKEN)
+        else:
+            tokens += len(word) if len(word) <= 2 else math.ceil(len(word) / 2)
+    return tokens
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text with tiktoken, or approximate_tokens where tiktoken is unavailable."""
+    encoding = _tokenizer()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return approximate_tokens(text)
+
+
+def _json_tokens(value: Any) -> int:
+    return count_tokens(json.dumps(value, separators=(",", ":")))
+
+
+def _history_tokens(history: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(turn.get("content", "")) + MESSAGE_OVERHEAD_TOKENS for turn in history)
+
+
+def _mean(values: List[int]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+@dataclass
+class RunEstimate:
+    light_calls: float
+    light_prompt_tokens: float
+    light_completion_tokens: float
+    heavy_calls: float
+    heavy_prompt_tokens: float
+    heavy_completion_tokens: float
+    wall_clock_seconds: float
+    concurrency: int
+    assumptions: Dict[str, Any]
+
+
+def estimate_run(train_data: List[Any],
+                 eval_data: List[Any],
+                 system_prompt: str,
+                 tool_definitions: List[Dict[str, Any]],
+                 num_iterations: int,
+                 minibatch_size: int = DEFAULT_MINIBATCH_SIZE,
+                 acceptance_rate: float = 0.5,
+                 concurrency: int = 1,
+                 light_latency: float = 1.5,
+                 heavy_latency: float = 20.0,
+                 num_samples: int = 1,
+                 valset_coreset_size: Optional[int] = None) -> RunEstimate:
+    """
+    Estimate the calls, tokens and wall-clock time of an optimization run
+    without calling any model.
+
+    GEPA evaluates the seed candidate on the whole valset, then every
+    iteration evaluates the parent candidate on a training minibatch (with
+    traces), makes one reflection call to propose a new text for one
+    component, evaluates the child on the same minibatch and, when the child
+    improves on the parent (acceptance_rate of the time), on the whole valset.
+    GEPA's num_iters budget counts those full valset passes, the seed's
+    included, so a run makes about (num_iterations - 1) / acceptance_rate
+    proposals. Cache hits and skipped perfect minibatches are ignored, so the
+    figures are an upper bound.
+
+    Light calls within a batch run concurrency at a time, each taking
+    light_latency seconds; reflection calls are sequential and take
+    heavy_latency seconds. With num_samples > 1 each light call asks for that
+    many completions, which multiplies its completion tokens only.
+
+    With a valset_coreset_size smaller than the valset, GEPA's valset passes
+    score that many instances, and the seed and the best candidate are each
+    scored once more on the full valset. train_data and eval_data are the
+    instances the run uses, i.e. after turns.expand_turns where it is enabled.
+    """
+    system_tokens = count_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+    tools_tokens = _json_tokens(tool_definitions)
+    request_overhead = system_tokens + tools_tokens
+
+    train_history = [_history_tokens(instance.history) for instance in train_data]
+    train_output = [_json_tokens(instance.expected_tool_call) for instance in train_data]
+    eval_history = [_history_tokens(instance.history) for instance in eval_data]
+    eval_output = [_json_tokens(instance.expected_tool_call) for instance in eval_data]
+
+    full_valset_size = len(eval_data)
+    full_valset_prompt = full_valset_size * request_overhead + sum(eval_history)
+    full_valset_completion = num_samples * sum(eval_output)
+    coreset = bool(valset_coreset_size) and valset_coreset_size < full_valset_size
+    valset_size = valset_coreset_size if coreset else full_valset_size
+    valset_prompt = valset_size * (request_overhead + _mean(eval_history))
+    valset_completion = num_samples * valset_size * _mean(eval_output)
+    minibatch_size = min(minibatch_size, len(train_data)) if train_data else 0
+    minibatch_prompt = minibatch_size * (request_overhead + _mean(train_history))
+    minibatch_completion = num_samples * minibatch_size * _mean(train_output)
+
+    # Seed evaluation, then per proposal: parent and child on the minibatch,
+    # and accepted children on the valset until the budget is used up
+    accepted = max(num_iterations - 1, 0)
+    proposals = accepted / acceptance_rate
+    valset_passes = 1 + accepted
+    # With a coreset, the seed's and the best candidate's full valset scores on top
+    full_passes = 2 if coreset else 0
+    light_calls = valset_passes * valset_size + proposals * 2 * minibatch_size + full_passes * full_valset_size
+    light_prompt_tokens = (valset_passes * valset_prompt + proposals * 2 * minibatch_prompt
+                           + full_passes * full_valset_prompt)
+    light_completion_tokens = (valset_passes * valset_completion + proposals * 2 * minibatch_completion
+                               + full_passes * full_valset_completion)
+
+    # One reflection call per proposal, over the minibatch's reflective records.
+    # Each record holds the conversation, the predicted call and feedback quoting the expected call.
+    record_tokens = _mean(train_history) + 2 * _mean(train_output) + REFLECTIVE_RECORD_OVERHEAD_TOKENS
+    reflection_prompt = REFLECTION_TEMPLATE_TOKENS + system_tokens + minibatch_size * record_tokens
+    heavy_calls = proposals
+    heavy_prompt_tokens = heavy_calls * reflection_prompt
+    # The reflection LM answers with a rewritten instruction of about the same length
+    heavy_completion_tokens = heavy_calls * system_tokens
+
+    concurrency = max(1, concurrency)
+    wall_clock_seconds = (
+        valset_passes * math.ceil(valset_size / concurrency) * light_latency
+        + full_passes * math.ceil(full_valset_size / concurrency) * light_latency
+        + proposals * 2 * math.ceil(minibatch_size / concurrency) * light_latency
+        + heavy_calls * heavy_latency
+    )
+
+    return RunEstimate(
+        light_calls=light_calls,
+        light_prompt_tokens=light_prompt_tokens,
+        light_completion_tokens=light_completion_tokens,
+        heavy_calls=heavy_calls,
+        heavy_prompt_tokens=heavy_prompt_tokens,
+        heavy_completion_tokens=heavy_completion_tokens,
+        wall_clock_seconds=wall_clock_seconds,
+        concurrency=concurrency,
+        assumptions={
+            "num_iterations": num_iterations,
+            "proposals": proposals,
+            "minibatch_size": minibatch_size,
+            "train_size": len(train_data),
+            "valset_size": valset_size,
+            "full_valset_size": full_valset_size,
+            "acceptance_rate": acceptance_rate,
+            "num_samples": num_samples,
+            "light_latency": light_latency,
+            "heavy_latency": heavy_latency,
+            "system_prompt_tokens": system_tokens,
+            "tool_schema_tokens": tools_tokens,
+        }
+    )
+
+
+def format_estimate(estimate: RunEstimate) -> str:
+    a = estimate.assumptions
+    minutes, seconds = divmod(int(estimate.wall_clock_seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    valset = a["valset_size"]
+    if valset != a["full_valset_size"]:
+        valset = f"{valset} (coreset; seed and best candidate also on all {a['full_valset_size']})"
+    return "\n".join([
+        f"Estimate for {a['num_iterations']} valset evaluations (~{a['proposals']:.0f} proposals at "
+        f"{a['acceptance_rate']:.0%} acceptance), minibatch size {a['minibatch_size']}, valset size {valset}, "
+        f"{a['num_samples']} sample(s) per call",
+        f"  {a['train_size']:,} training and {a['full_valset_size']:,} validation instances",
+        f"  Each request carries {a['system_prompt_tokens']:,} system prompt and {a['tool_schema_tokens']:,} tool schema tokens",
+        f"  Light model: {estimate.light_calls:,.0f} calls, {estimate.light_prompt_tokens:,.0f} prompt + "
+        f"{estimate.light_completion_tokens:,.0f} completion tokens",
+        f"  Heavy model: {estimate.heavy_calls:,.0f} calls, {estimate.heavy_prompt_tokens:,.0f} prompt + "
+        f"{estimate.heavy_completion_tokens:,.0f} completion tokens",
+        f"  Wall clock: ~{hours}h {minutes:02d}m {seconds:02d}s at concurrency {estimate.concurrency} "
+        f"({a['light_latency']}s per light call, {a['heavy_latency']}s per heavy call)",
+        f"  Tokens counted with the {token_counter()} tokenizer. Cache hits are not modelled, so these are upper bounds.",
+    ])
@@ -0,0 +1,61 @@
+import hashlib
+import json
+from typing import Dict, List, Any, Optional, Tuple
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def candidate_hash(candidate: Dict[str, str]) -> str:
+    """Short stable identifier of a candidate, over all of its components."""
+    return text_digest(json.dumps(candidate, sort_keys=True))
+
+
+def instance_digest(history: List[Dict[str, str]], expected_tool_call: Dict[str, Any]) -> str:
+    """Digest of the parts of a data instance that determine its evaluation result."""
+    payload = json.dumps({"history": list(history), "expected_tool_call": expected_tool_call}, sort_keys=True)
+    return text_digest(payload)
+
+
+class EvaluationCache:
+    """
+    Per-instance evaluation results keyed by the digests of the candidate
+    components the task request was built from.
+
+    Every task request renders the system prompt and all tool components, so
+    a result is keyed on all of them and a change to any one invalidates it;
+    components that are not rendered into requests are left out of the key.
+    Digests are memoized per component text, so a mutation that changes one
+    component only hashes that one again.
+    """
+    def __init__(self):
+        self._results: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Any] = {}
+        self._component_digests: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def component_key(self, candidate: Dict[str, str], components: List[str]) -> Tuple[Tuple[str, str], ...]:
+        key = []
+        for name in sorted(components):
+            text = candidate.get(name, "")
+            digest = self._component_digests.get(text)
+            if digest is None:
+                digest = text_digest(text)
+                self._component_digests[text] = digest
+            key.append((name, digest))
+        return tuple(key)
+
+    def get(self, instance_key: str, component_key: Tuple[Tuple[str, str], ...]) -> Optional[Any]:
+        result = self._results.get((instance_key, component_key))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, instance_key: str, component_key: Tuple[Tuple[str, str], ...], result: Any):
+        self._results[(instance_key, component_key)] = result
+
+    def __len__(self) -> int:
+        return len(self._results)
@@ -0,0 +1,101 @@
+from typing import Dict, List, Any, Optional, FrozenSet, Tuple
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class FailureSignature:
+    """Structural description of how a predicted tool call differs from the expected one."""
+    kind: str  # "no_call", "wrong_tool", "wrong_args" or "schema_violation"
+    expected_tool: str
+    predicted_tool: Optional[str] = None
+    missing_args: FrozenSet[str] = frozenset()
+    wrong_args: FrozenSet[str] = frozenset()
+
+    def describe(self) -> str:
+        if self.kind == "no_call":
+            return "No tool call was made"
+        if self.kind == "wrong_tool":
+            return f"Wrong tool selected: predicted {self.predicted_tool}, expected {self.expected_tool}"
+
+        error_parts = []
+        if self.kind == "schema_violation":
+            error_parts.append("Arguments do not match the tool schema")
+        if self.missing_args:
+            error_parts.append(f"Missing arguments: {sorted(self.missing_args)}")
+        if self.wrong_args:
+            error_parts.append(f"Incorrect arguments: {sorted(self.wrong_args)}")
+        return "; ".join(error_parts) if error_parts else "Unknown error"
+
+
+def failure_signature(predicted: Optional[Dict[str, Any]],
+                      expected: Dict[str, Any],
+                      schema_violation: bool = False) -> FailureSignature:
+    """
+    Build the failure signature of a predicted tool call against the expected one.
+    Calls to the right tool whose arguments violate its schema get their own kind.
+    """
+    if not predicted:
+        return FailureSignature(kind="no_call", expected_tool=expected["name"])
+
+    if predicted["name"] != expected["name"]:
+        return FailureSignature(
+            kind="wrong_tool",
+            expected_tool=expected["name"],
+            predicted_tool=predicted["name"]
+        )
+
+    pred_args = predicted.get("arguments", {})
+    exp_args = expected.get("arguments", {})
+
+    return FailureSignature(
+        kind="schema_violation" if schema_violation else "wrong_args",
+        expected_tool=expected["name"],
+        predicted_tool=predicted["name"],
+        missing_args=frozenset(k for k in exp_args if k not in pred_args),
+        wrong_args=frozenset(k for k in exp_args if k in pred_args and pred_args[k] != exp_args[k])
+    )
+
+
+@dataclass
+class FailureCluster:
+    signature: FailureSignature
+    representative: Any
+    representative_score: float
+    count: int = 0
+
+
+@dataclass
+class FailureClusterIndex:
+    """
+    Groups failures by signature within a minibatch and keeps running counts
+    across iterations, so reflection sees one example per distinct mistake.
+    """
+    run_counts: Dict[FailureSignature, int] = field(default_factory=dict)
+
+    def record(self, signatures: List[FailureSignature]):
+        """Add the failures of one minibatch to the run-wide counts."""
+        for signature in signatures:
+            self.run_counts[signature] = self.run_counts.get(signature, 0) + 1
+
+    def cluster(self, failures: List[Tuple[FailureSignature, Any, float]]) -> List[FailureCluster]:
+        """
+        Cluster (signature, example, score) triples from one minibatch. The lowest
+        scoring example of each cluster is kept as its representative. Clusters
+        are returned most frequent first.
+        """
+        clusters: Dict[FailureSignature, FailureCluster] = {}
+
+        for signature, example, score in failures:
+            cluster = clusters.get(signature)
+            if cluster is None:
+                cluster = FailureCluster(signature, example, score)
+                clusters[signature] = cluster
+            elif score < cluster.representative_score:
+                cluster.representative = example
+                cluster.representative_score = score
+            cluster.count += 1
+
+        return sorted(clusters.values(), key=lambda c: (-c.count, c.representative_score))
+
+    def total_count(self, signature: FailureSignature) -> int:
+        return self.run_counts.get(signature, 0)
@@ -0,0 +1,201 @@
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Optional
+
+from .eval_cache import text_digest
+from .estimate import count_tokens
+
+SUMMARIZERS = ("extractive", "model")
+
+_WORD = re.compile(r"[a-z0-9]+")
+_DIGIT = re.compile(r"\d")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Words of slot names too generic to mark a turn as carrying a slot value
+_GENERIC_SLOT_WORDS = {"or", "and", "to", "of", "the", "content", "text", "request", "id"}
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+@dataclass
+class HistoryPolicy:
+    """
+    How a conversation history is shaped before it is sent in a task request.
+
+    Only the last max_turns turns are sent as they are (None sends all).
+    Older turns that carry slot values, such as quantities, locations or
+    answers to the assistant's questions about submit_request arguments, are
+    kept verbatim when pin_slots is set; the remaining older turns are
+    replaced by one summary message when summarize is set, or dropped.
+    """
+    max_turns: Optional[int] = None
+    summarize: bool = True
+    pin_slots: bool = True
+    # "extractive" (local, first sentence of each buyer turn) or "model" (the task model)
+    summarizer: str = "extractive"
+
+    def __post_init__(self):
+        if self.summarizer not in SUMMARIZERS:
+            raise ValueError(f"Unknown summarizer: {self.summarizer} (expected one of {', '.join(SUMMARIZERS)})")
+
+    def describe(self) -> str:
+        if self.max_turns is None:
+            return "full history"
+        parts = [f"last {self.max_turns} turns"]
+        if self.pin_slots:
+            parts.append("pinned slot turns")
+        if self.summarize:
+            parts.append(f"{self.summarizer} summary")
+        return " + ".join(parts)
+
+
+def slot_words(tool_definitions: List[Dict[str, Any]]) -> set:
+    """Words of the argument names of every tool, e.g. "delivery" and "location"."""
+    words = set()
+    for tool in tool_definitions:
+        for name in tool["function"].get("parameters", {}).get("properties", {}):
+            words.update(name.lower().split("_"))
+    return words - _GENERIC_SLOT_WORDS
+
+
+def extractive_summary(turns: List[Dict[str, str]], max_words: int = 15) -> str:
+    """
+    One line per buyer turn with its first sentence, cut to max_words words.
+    Assistant turns and greetings or acknowledgements (under three words) are left out.
+    """
+    lines = []
+    for turn in turns:
+        if turn.get("role") != "user":
+            continue
+        sentence = _SENTENCE_END.split(" ".join(turn.get("content", "").split()), maxsplit=1)[0]
+        words = sentence.split()
+        if len(words) < 3:
+            continue
+        if len(words) > max_words:
+            sentence = " ".join(words[:max_words]) + " ..."
+        lines.append(f"- Buyer: {sentence}")
+    return "\n".join(lines)
+
+
+def model_summarizer(client: Any) -> Callable[[List[Dict[str, str]]], str]:
+    """Summarizer that asks the given chat client for a summary of the buyer's stated requirements."""
+    def summarize(turns: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{turn['role'].title()}: {turn['content']}" for turn in turns)
+        response = client.chat.completions.create(
+            messages=[{
+                "role": "user",
+                "content": "Summarize this part of a conversation between a buyer and a sourcing assistant "
+                           "in at most five short bullet points. Keep every requirement the buyer stated "
+                           "(product, quantity, location, timing, specifications) verbatim.\n\n" + transcript
+            }],
+            max_tokens=300,
+            temperature=0
+        )
+        return response.choices[0].message.content or extractive_summary(turns)
+    return summarize
+
+
+class HistoryShaper:
+    """
+    Applies a HistoryPolicy to conversation histories. Summaries are cached
+    by the digest of the summarized turns, so every instance and candidate
+    that shares a conversation prefix reuses one summary. With max_summaries
+    the oldest summaries are evicted beyond that many, for long-running
+    services that see an unbounded number of conversations.
+    """
+    def __init__(self,
+                 policy: HistoryPolicy,
+                 tool_definitions: List[Dict[str, Any]],
+                 summarizer: Optional[Callable[[List[Dict[str, str]]], str]] = None,
+                 max_summaries: Optional[int] = None):
+        self.policy = policy
+        self.slot_words = slot_words(tool_definitions)
+        self.summarizer = summarizer or extractive_summary
+        self.max_summaries = max_summaries
+        self._summaries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _carries_slot(self, history: List[Dict[str, str]], index: int) -> bool:
+        turn = history[index]
+        if turn.get("role") != "user":
+            return False
+        content = turn.get("content", "")
+        if _DIGIT.search(content) or set(_WORD.findall(content.lower())) & self.slot_words:
+            return True
+        # Answers to the assistant's questions about the request
+        previous = history[index - 1] if index > 0 else None
+        return (previous is not None and "?" in previous.get("content", "")
+                and bool(set(_WORD.findall(previous["content"].lower())) & self.slot_words))
+
+    def _summary(self, turns: List[Dict[str, str]]) -> str:
+        key = text_digest(json.dumps(turns, sort_keys=True))
+        with self._lock:
+            summary = self._summaries.get(key)
+        if summary is None:
+            summary = self.summarizer(turns)
+            with self._lock:
+                self._summaries[key] = summary
+                if self.max_summaries is not None and len(self._summaries) > self.max_summaries:
+                    del self._summaries[next(iter(self._summaries))]
+        return summary
+
+    def shape(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        max_turns = self.policy.max_turns
+        if max_turns is None or len(history) <= max_turns:
+            return history
+
+        cut = len(history) - max_turns
+        shaped = []
+        dropped = []
+        for index in range(cut):
+            if self.policy.pin_slots and self._carries_slot(history, index):
+                shaped.append(history[index])
+            else:
+                dropped.append(history[index])
+
+        summary = self._summary(dropped) if dropped and self.policy.summarize else ""
+        if summary:
+            shaped.insert(0, {"role": "system", "content": f"{SUMMARY_PREFIX}\n{summary}"})
+        return shaped + history[cut:]
+
+
+def history_tokens(histories: List[List[Dict[str, str]]]) -> int:
+    return sum(count_tokens(turn.get("content", "")) for history in histories for turn in history)
+
+
+def compare_history_policies(light_client: Any,
+                             data_loader: Any,
+                             instances: List[Any],
+                             system_prompt: str,
+                             policies: Dict[str, Optional[HistoryPolicy]],
+                             max_concurrency: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate system_prompt on the same instances once per history policy and
+    report the mean score, the history tokens sent and the instances whose
+    score differs from the first policy's.
+    """
+    from .adapter import SourcingConciergeGEPAAdapter
+
+    candidate = {"system_prompt": system_prompt}
+    results: Dict[str, Dict[str, Any]] = {}
+    baseline_scores = None
+    for label, policy in policies.items():
+        adapter = SourcingConciergeGEPAAdapter(light_client, None, data_loader,
+                                               max_concurrency=max_concurrency, history_policy=policy)
+        try:
+            batch = adapter.evaluate(instances, candidate)
+            histories = [adapter.shape_history(instance.history) for instance in instances]
+        finally:
+            adapter.close()
+
+        scores = batch.scores
+        if baseline_scores is None:
+            baseline_scores = scores
+        results[label] = {
+            "mean_score": sum(scores) / len(scores) if scores else 0.0,
+            "history_tokens": history_tokens(histories),
+            "changed": [instance.id for instance, score, base in zip(instances, scores, baseline_scores) if score != base],
+        }
+    return results
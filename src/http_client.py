@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import httpx
+
+# How long an idle pooled connection is kept open for reuse
+KEEPALIVE_EXPIRY = 90.0
+
+
+class PoolMetrics:
+    """
+    Thread-safe connection pool counters fed by MeteredTransport.
+
+    New TCP connections and TLS handshakes are counted from httpcore's trace
+    events, so reuse_rate is the share of requests that were sent over an
+    already open connection.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.errors = 0
+        self.retryable_responses = 0
+        self.total_seconds = 0.0
+
+    def request_started(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self, seconds: float, status_code: Optional[int]):
+        with self._lock:
+            self.in_flight -= 1
+            self.total_seconds += seconds
+            if status_code is None:
+                self.errors += 1
+            elif status_code == 429 or status_code >= 500:
+                self.retryable_responses += 1
+
+    def trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "reuse_rate": 1 - self.connections_opened / self.requests if self.requests else 0.0,
+                "errors": self.errors,
+                "retryable_responses": self.retryable_responses,
+                "mean_request_seconds": self.total_seconds / self.requests if self.requests else 0.0,
+            }
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """HTTP transport that reports every request and new connection to a PoolMetrics."""
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["trace"] = self.metrics.trace
+        self.metrics.request_started()
+        start = time.perf_counter()
+        status_code = None
+        try:
+            response = super().handle_request(request)
+            status_code = response.status_code
+            return response
+        finally:
+            self.metrics.request_finished(time.perf_counter() - start, status_code)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(max_connections: int,
+                       connect_timeout: float = 5.0,
+                       read_timeout: float = 120.0,
+                       http2: bool = False,
+                       metrics: Optional[PoolMetrics] = None) -> httpx.Client:
+    """
+    Build an httpx client whose keep-alive pool holds max_connections
+    connections, with explicit connect, read, write and pool-wait timeouts.
+
+    HTTP/2 needs the optional h2 package; without it the client falls back to
+    HTTP/1.1. Pass a PoolMetrics to collect pool usage.
+    """
+    if http2 and not _http2_available():
+        print("Warning: HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout, write=connect_timeout, pool=read_timeout)
+    transport_options = {"limits": limits, "http2": http2}
+    transport = MeteredTransport(metrics, **transport_options) if metrics is not None else httpx.HTTPTransport(**transport_options)
+    return httpx.Client(transport=transport, timeout=timeout)
+
+
+def create_portkey_client(api_key: str,
+                          config_id: Optional[str],
+                          http_client: Optional[httpx.Client] = None,
+                          max_connections: int = 1,
+                          connect_timeout: float = 5.0,
+                          read_timeout: float = 120.0,
+                          http2: bool = False):
+    """
+    Create a Portkey client that sends its requests through http_client, or
+    through a new pooled client when none is given. Partial applications of
+    this function are picklable, so they can serve as client factories for
+    evaluation worker processes.
+    """
+    from portkey_ai import Portkey
+
+    if http_client is None:
+        http_client = create_http_client(max_connections, connect_timeout, read_timeout, http2)
+    return Portkey(api_key=api_key, config=config_id, http_client=http_client)
@@ -0,0 +1,87 @@
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional
+
+_REQUEST_ID = re.compile(r"\bREQ_[A-Za-z0-9_]+")
+_QUANTITY = re.compile(r"\b\d+\b")
+
+
+class MockLMClient:
+    """
+    Offline stand-in for a Portkey/OpenAI chat client, for exercising the
+    adapter, worker pool and benchmarks without network calls.
+
+    It answers chat.completions.create with a rule-based tool call: it cancels
+    when the buyer asks to cancel a request, submits once a quantity has been
+    mentioned after a product request, and replies to the buyer otherwise.
+    Without tools it returns a canned text completion. An optional latency
+    simulates the model round trip, and with noise > 0 each choice is replaced
+    by a reply to the buyer with that probability, simulating sampling noise.
+    """
+    def __init__(self, latency: float = 0.0, noise: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.noise = noise
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self,
+               messages: List[Dict[str, str]],
+               tools: Optional[List[Dict[str, Any]]] = None,
+               n: int = 1,
+               **kwargs) -> Any:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+        choices = []
+        for i in range(n):
+            if not tools:
+                message = SimpleNamespace(content="You are a sourcing concierge. Call exactly one tool.", tool_calls=None)
+            else:
+                name, arguments = self._choose_tool_call(messages)
+                if self.noise and self.rng.random() < self.noise:
+                    name, arguments = "reply_to_buyer", {"text": "Could you tell me more about what you need?"}
+                tool_call = SimpleNamespace(
+                    id=f"call_{self.calls}_{i}",
+                    type="function",
+                    function=SimpleNamespace(name=name, arguments=json.dumps(arguments))
+                )
+                message = SimpleNamespace(content="", tool_calls=[tool_call])
+            choices.append(SimpleNamespace(index=i, message=message, finish_reason="tool_calls"))
+
+        return SimpleNamespace(
+            choices=choices,
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=20 * n,
+                                  total_tokens=prompt_tokens + 20 * n)
+        )
+
+    def _choose_tool_call(self, messages: List[Dict[str, str]]) -> tuple:
+        user_messages = [m.get("content", "") for m in messages if m.get("role") == "user"]
+        last = user_messages[-1].lower() if user_messages else ""
+        conversation = " ".join(m.get("content", "") for m in messages if m.get("role") != "system")
+
+        if "cancel" in last:
+            request_ids = _REQUEST_ID.findall(conversation)
+            return "cancel_request", {
+                "content": "I have cancelled your request.",
+                "request_id": request_ids[-1] if request_ids else ""
+            }
+
+        if len(user_messages) >= 3 and _QUANTITY.search(" ".join(user_messages[1:])):
+            return "submit_request", {
+                "origin": "India",
+                "documents": [],
+                "b2b_or_b2c": "b2c",
+                "delivery_terms": "",
+                "specifications": {},
+                "delivery_location": "",
+                "quantity_or_scope": _QUANTITY.findall(" ".join(user_messages[1:]))[-1],
+                "product_or_service": user_messages[1][:80]
+            }
+
+        return "reply_to_buyer", {"text": "Hello, how can I help you today?"}
@@ -1,24 +1,39 @@
 import os
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Callable, List, Optional
 
-import gepa
-from .dataset import SourcingDatasetLoader
-from .adapter import SourcingConciergeGEPAAdapter
+from .dataset import SourcingDatasetLoader, GrowingDataset, report_dataset_problems
+from .tools import get_tool_components
+from .schema_compiler import schema_token_report
+from .tracing import ChromeTracer, get_tracer, set_tracer, usage_attributes
+from .progress import RunMetrics, ProgressDashboard
+from .surrogate import CandidateSurrogate
+from .candidate_registry import CandidateRegistry
+from .coreset import build_coreset, format_coreset_report
+from .turns import expand_turns as expand_per_turn
+from .run_archive import EvaluationLog, export_run_archive
+from .runtime import PUBLISHED_FILE, publish_candidate
 
 
-def create_callable_lm(portkey_client):
+def create_callable_lm(portkey_client, metrics: Optional[RunMetrics] = None):
     """Create a callable function wrapper for Portkey client that GEPA expects."""
     def lm_function(prompt: str) -> str:
-        try:
-            response = portkey_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=5000,
-                temperature=0.7
-            )
-            return response.choices[0].message.content or ""
-        except Exception as e:
-            print(f"Error in LM call: {e}")
-            return f"Error: {str(e)}"
+        with get_tracer().span("reflection_call", prompt_chars=len(prompt)) as span:
+            try:
+                response = portkey_client.chat.completions.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=5000,
+                    temperature=0.7
+                )
+                span.set_attributes(**usage_attributes(response))
+                if metrics is not None:
+                    metrics.record_reflection()
+                return response.choices[0].message.content or ""
+            except Exception as e:
+                if metrics is not None:
+                    metrics.record_reflection(error=True)
+                print(f"Error in LM call: {e}")
+                return f"Error: {str(e)}"
     
     return lm_function
 
@@ -30,7 +45,27 @@ def optimize_sourcing_prompt(
     initial_prompt: str,
     num_iterations: int = 10,
     batch_size: int = 3,
-    output_dir: str = "results"
+    output_dir: str = "results",
+    components_to_update: Optional[List[str]] = None,
+    watch_train_data: bool = False,
+    num_eval_workers: int = 0,
+    light_client_factory: Optional[Callable[[], Any]] = None,
+    trace_file: Optional[str] = None,
+    show_progress: bool = True,
+    eval_concurrency: int = 1,
+    pool_metrics: Optional[Any] = None,
+    num_samples: int = 1,
+    schema_mode: str = "original",
+    use_surrogate: bool = False,
+    surrogate_audit_rate: float = 0.2,
+    near_duplicate_threshold: Optional[float] = None,
+    valset_coreset_size: Optional[int] = None,
+    history_policy: Optional[Any] = None,
+    expand_turns: bool = False,
+    expand_eval_turns: bool = False,
+    archive_run: bool = True,
+    significance_resamples: int = 1_000_000,
+    publish_path: Optional[str] = None
 ):
     """
     Optimize the sourcing concierge prompt using GEPA.
@@ -43,45 +78,303 @@ def optimize_sourcing_prompt(
         num_iterations: Number of GEPA optimization iterations
         batch_size: Size of mini-batches for evaluation
         output_dir: Directory to save optimization results
+        components_to_update: Candidate components to optimize, "system_prompt" and/or
+            tool description components such as "tool:submit_request.b2b_or_b2c"
+        watch_train_data: Pick up training examples appended to data_dir/train while the run is in progress
+        num_eval_workers: Number of worker processes to shard evaluations across (0 evaluates in-process)
+        light_client_factory: Picklable callable creating a light client, required for evaluation workers
+        trace_file: Write a Chrome trace (chrome://tracing, Perfetto) of the run's hot-path spans to this file
+        show_progress: Show a live progress line on stderr; output_dir/metrics.json is updated either way
+        eval_concurrency: Number of task-model calls to run concurrently when evaluating in-process
+        pool_metrics: Connection pool counters of the clients (see http_client.PoolMetrics) to include in the metrics
+        num_samples: Completions to draw per instance (in one request, with n=num_samples); scores are their mean
+        schema_mode: Serialization of tool schemas and the system prompt in task requests, see schema_compiler.SCHEMA_MODES
+        use_surrogate: Skip evaluating child candidates that a local surrogate model predicts GEPA would reject
+        surrogate_audit_rate: Fraction of the surrogate's skips to evaluate anyway, to measure its hit rate
+        near_duplicate_threshold: Reuse the scores of candidates whose system prompt is at least this similar
+            (word 3-gram Jaccard) in evaluations without traces; None evaluates every candidate
+        valset_coreset_size: Score candidates during the run on a stratified, weighted subset of this many
+            validation examples; the seed and the best candidate are still scored on the full valset
+        history_policy: Windowing and summarization of conversation histories in task requests (history.HistoryPolicy)
+        expand_turns: Also use every intermediate assistant reply in the training conversations as an example
+            (see turns.expand_turns)
+        expand_eval_turns: Expand the evaluation conversations as well. This changes what the valset, and so
+            the significance gate, measures, so it is off by default
+        archive_run: Log every evaluation to output_dir/evaluations.jsonl and export the run to a Parquet archive
+            in output_dir/archive/<run id> (needs pyarrow) for query_runs.py
+        significance_resamples: Bootstrap and permutation resamples of the final gate comparing the best
+            candidate with the seed, written to output_dir/significance.json; 0 skips the gate
+        publish_path: Also publish the best candidate to this file for a production runtime.PromptRuntime,
+            if it passes the significance gate (or the gate is skipped). It is always written to
+            output_dir/best_candidate.json
     """
+    if trace_file:
+        set_tracer(ChromeTracer())
+    try:
+        with get_tracer().span("optimize_sourcing_prompt", num_iterations=num_iterations):
+            return _optimize_sourcing_prompt(
+                data_dir, light_client, heavy_client, initial_prompt, num_iterations, batch_size, output_dir,
+                components_to_update, watch_train_data, num_eval_workers, light_client_factory, show_progress,
+                eval_concurrency, pool_metrics, num_samples, schema_mode, use_surrogate, surrogate_audit_rate,
+                near_duplicate_threshold, valset_coreset_size, history_policy,
+                expand_turns, expand_eval_turns, archive_run, significance_resamples, publish_path
+            )
+    finally:
+        if trace_file:
+            get_tracer().export(trace_file)
+            set_tracer(None)
+            print(f"Trace written to {trace_file}")
+
+
+def _optimize_sourcing_prompt(
+    data_dir: str,
+    light_client: Any,
+    heavy_client: Any,
+    initial_prompt: str,
+    num_iterations: int,
+    batch_size: int,
+    output_dir: str,
+    components_to_update: Optional[List[str]],
+    watch_train_data: bool,
+    num_eval_workers: int,
+    light_client_factory: Optional[Callable[[], Any]],
+    show_progress: bool,
+    eval_concurrency: int,
+    pool_metrics: Optional[Any],
+    num_samples: int,
+    schema_mode: str,
+    use_surrogate: bool,
+    surrogate_audit_rate: float,
+    near_duplicate_threshold: Optional[float],
+    valset_coreset_size: Optional[int],
+    history_policy: Optional[Any],
+    expand_turns: bool,
+    expand_eval_turns: bool,
+    archive_run: bool,
+    significance_resamples: int,
+    publish_path: Optional[str]
+):
     
     # Load datasets
-    data_loader = SourcingDatasetLoader(data_dir)
-    train_data = data_loader.load_dataset("train")
-    eval_data = data_loader.load_dataset("eval")
+    with get_tracer().span("load_datasets"):
+        data_loader = SourcingDatasetLoader(data_dir)
+        if watch_train_data:
+            train_data = GrowingDataset(data_loader, "train")
+        else:
+            train_data = data_loader.load_dataset("train")
+        eval_data = data_loader.load_dataset("eval")
     
     print(f"Loaded {len(train_data)} training examples and {len(eval_data)} evaluation examples")
     
+    if expand_turns:
+        if watch_train_data:
+            print("Warning: expand_turns is ignored while watching the training data for new examples")
+        else:
+            train_data, added_train = expand_per_turn(train_data)
+            print(f"Added {added_train} training examples from intermediate turns")
+    if expand_eval_turns:
+        eval_data, added_eval = expand_per_turn(eval_data)
+        print(f"Added {added_eval} evaluation examples from intermediate turns")
+    
+    report_dataset_problems(train_data, eval_data, data_loader.get_tool_definitions())
+    
+    if schema_mode != "original":
+        report = schema_token_report(data_loader.get_tool_definitions())
+        print(f"Tool schemas: {report[schema_mode]['all tools']} tokens per request in {schema_mode} mode "
+              f"({report['original']['all tools']} as written)")
+    
+    surrogate = CandidateSurrogate(audit_rate=surrogate_audit_rate) if use_surrogate else None
+    candidate_registry = CandidateRegistry(near_duplicate_threshold) if near_duplicate_threshold else None
+    coreset = None
+    if valset_coreset_size and valset_coreset_size < len(eval_data):
+        coreset = build_coreset(eval_data, valset_coreset_size)
+    valset = coreset.instances if coreset is not None else eval_data
+    metrics = RunMetrics(num_iterations=num_iterations, pool_metrics=pool_metrics, surrogate=surrogate)
+    
+    evaluation_log = None
+    if archive_run:
+        run_started = time.time()
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(run_started))}-{os.path.basename(os.path.abspath(output_dir))}"
+        evaluation_log = EvaluationLog(os.path.join(output_dir, "evaluations.jsonl"), run_id, run_started,
+                                       [instance.id for instance in eval_data])
+    
+    # gepa is only imported once there is a run to do
+    import gepa
+    from .adapter import SourcingConciergeGEPAAdapter
+    
     # Create GEPA adapter
-    adapter = SourcingConciergeGEPAAdapter(light_client, heavy_client, data_loader)
+    adapter = SourcingConciergeGEPAAdapter(
+        light_client,
+        heavy_client,
+        data_loader,
+        trace_dir=output_dir,
+        num_workers=num_eval_workers,
+        light_client_factory=light_client_factory,
+        metrics=metrics,
+        max_concurrency=eval_concurrency,
+        num_samples=num_samples,
+        schema_mode=schema_mode,
+        surrogate=surrogate,
+        candidate_registry=candidate_registry,
+        history_policy=history_policy,
+        evaluation_log=evaluation_log
+    )
+    if watch_train_data:
+        # Appended training examples are checked for leakage into the evaluation data
+        train_data.eval_data = eval_data
+        adapter.watch_dataset(train_data)
     
-    # Initial candidate with the seed prompt
+    # Initial candidate with the seed prompt and the current text of any tool
+    # description components that should be optimized alongside it
+    tool_components = get_tool_components(adapter.tool_definitions)
     initial_candidate = {
         "system_prompt": initial_prompt
     }
+    for component in components_to_update or ["system_prompt"]:
+        if component == "system_prompt":
+            continue
+        if component not in tool_components:
+            raise ValueError(f"Unknown component to update: {component}")
+        initial_candidate[component] = tool_components[component]
+    
+    # The seed's full valset scores give the coreset's error bound and the baseline to confirm against
+    if coreset is not None:
+        seed_scores = adapter.evaluate(eval_data, initial_candidate).scores
+        print(format_coreset_report(coreset, eval_data, seed_scores))
+        adapter.set_valset_coreset(coreset)
+    adapter.set_valset(valset)
     
     # Create callable LM wrapper for GEPA
-    reflection_lm_callable = create_callable_lm(heavy_client)
+    reflection_lm_callable = create_callable_lm(heavy_client, metrics)
     
-    # Run GEPA optimization
-    result = gepa.optimize(
-        adapter=adapter,
-        trainset=train_data,
-        valset=eval_data,
-        seed_candidate=initial_candidate,
-        # components_to_update=["system_prompt"] # dont know exactly
-        num_iters=num_iterations,
-        # reflection_minibatch_size=batch_size
-        run_dir=output_dir,
-        # task_lm=light_client,
-        reflection_lm=reflection_lm_callable,
-        track_best_outputs= True,
-        
+    dashboard = ProgressDashboard(
+        metrics,
+        metrics_path=os.path.join(output_dir, "metrics.json"),
+        show=show_progress
     )
     
+    # Run GEPA optimization
+    dashboard.start()
+    try:
+        result = gepa.optimize(
+            adapter=adapter,
+            trainset=train_data,
+            valset=valset,
+            seed_candidate=initial_candidate,
+            # components_to_update=["system_prompt"] # dont know exactly
+            num_iters=num_iterations,
+            # reflection_minibatch_size=batch_size
+            run_dir=output_dir,
+            # task_lm=light_client,
+            reflection_lm=reflection_lm_callable,
+            track_best_outputs= True,
+            
+        )
+        if coreset is not None:
+            best_scores = _confirm_on_full_valset(adapter, result, eval_data, seed_scores)
+        else:
+            # GEPA's seed subscores are its Pareto front, which it raises in place during
+            # the run, so both sides are taken from the evaluation cache instead
+            seed_scores = _valset_scores(adapter, eval_data, initial_candidate)
+            best_scores = _valset_scores(adapter, eval_data, result.best_candidate)
+        significant = None
+        if significance_resamples:
+            significant = _significance_gate(best_scores, seed_scores, eval_data, significance_resamples, output_dir)
+        _publish_best_candidate(result.best_candidate, best_scores, seed_scores, significant, schema_mode,
+                                history_policy, output_dir, publish_path)
+        if evaluation_log is not None:
+            archive_dir = export_run_archive(output_dir, result, evaluation_log)
+            if archive_dir:
+                print(f"Run archive written to {archive_dir}")
+    finally:
+        dashboard.stop()
+        adapter.close()
+        if evaluation_log is not None:
+            evaluation_log.close()
+    
+    if surrogate is not None:
+        print(surrogate.summary())
+    if candidate_registry is not None:
+        print(candidate_registry.summary())
+    
     return result
 
 
+def _valset_scores(adapter: Any, eval_data: List[Any], candidate: Dict[str, str]) -> List[float]:
+    """
+    A candidate's own per-instance valset scores, served from the evaluation
+    cache where possible but never copied from a near-duplicate candidate.
+    """
+    return [score for _, score, _, _ in adapter.evaluate_instances(eval_data, candidate)]
+
+
+def _confirm_on_full_valset(adapter: Any, result: Any, eval_data: List[Any], seed_scores: List[float]) -> List[float]:
+    """
+    Score the best candidate on the full valset and compare it with the seed
+    and its coreset estimate. Returns the best candidate's full valset scores.
+    """
+    adapter.set_valset_coreset(None)
+    best_scores = _valset_scores(adapter, eval_data, result.best_candidate)
+    best_mean = sum(best_scores) / len(best_scores)
+    seed_mean = sum(seed_scores) / len(seed_scores)
+    print(f"Full valset: best candidate {best_mean:.3f} (coreset estimate "
+          f"{result.val_aggregate_scores[result.best_idx]:.3f}), seed {seed_mean:.3f}")
+    if result.best_idx != 0 and best_mean <= seed_mean:
+        print("Warning: the best candidate does not beat the seed on the full valset")
+    return best_scores
+
+
+def _significance_gate(best_scores: List[float],
+                       seed_scores: List[float],
+                       eval_data: List[Any],
+                       resamples: int,
+                       output_dir: str) -> bool:
+    """Test whether the best candidate beats the seed beyond noise, overall and per tool; returns whether it passed."""
+    import json
+    
+    # numpy is only needed once a run has finished
+    from .significance import significance_report, format_significance
+    
+    report = significance_report(best_scores, seed_scores, eval_data, resamples)
+    path = os.path.join(output_dir, "significance.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(format_significance(report))
+    if not report["passed"]:
+        print("The improvement is not significant; consider keeping the current prompt")
+    print(f"Significance report written to {path}")
+    return report["passed"]
+
+
+def _publish_best_candidate(best_candidate: Dict[str, str],
+                            best_scores: List[float],
+                            seed_scores: List[float],
+                            significant: Optional[bool],
+                            schema_mode: str,
+                            history_policy: Optional[Any],
+                            output_dir: str,
+                            publish_path: Optional[str]):
+    """
+    Write the best candidate for runtime.PromptRuntime with its and the seed's
+    full valset scores, and publish it to production if it is significant.
+    """
+    metadata = {
+        "valset_score": sum(best_scores) / len(best_scores) if best_scores else 0.0,
+        "seed_valset_score": sum(seed_scores) / len(seed_scores) if seed_scores else 0.0,
+        "significant": significant,
+    }
+    path = publish_candidate(os.path.join(output_dir, PUBLISHED_FILE), best_candidate, schema_mode, history_policy,
+                             **metadata)
+    print(f"Best candidate written to {path}")
+    if not publish_path:
+        return
+    if significant is False:
+        print(f"Not publishing to {publish_path}: the best candidate did not pass the significance gate")
+        return
+    publish_candidate(publish_path, best_candidate, schema_mode, history_policy, **metadata)
+    print(f"Best candidate published to {publish_path}")
+
+
 def main():
     """
     Example usage of the optimization script.
@@ -0,0 +1,64 @@
+import json
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+
+# Adapter owned by each worker process, created by _init_worker
+_worker_adapter = None
+
+
+def _init_worker(client_factory: Callable[[], Any], data_loader, adapter_options: Dict[str, Any]):
+    from .adapter import SourcingConciergeGEPAAdapter
+
+    global _worker_adapter
+    _worker_adapter = SourcingConciergeGEPAAdapter(client_factory(), None, data_loader, **adapter_options)
+
+
+def _evaluate_shard(shard: List[Any], candidate: Dict[str, str]) -> str:
+    """Evaluate a shard in a worker and return its results as one compact JSON string."""
+    results = _worker_adapter.evaluate_instances(shard, candidate)
+    return json.dumps([
+        [asdict(output), score, error_message]
+        for output, score, error_message, _ in results
+    ], separators=(",", ":"))
+
+
+class ShardedEvaluator:
+    """
+    Evaluates batches across a pool of worker processes.
+
+    Each worker builds its own adapter, with its own task-model client (from
+    client_factory, which must be picklable), evaluation cache and the given
+    adapter_options (such as num_samples). A batch is
+    split into one contiguous shard per worker and the per-shard results are
+    merged back in batch order.
+    """
+    def __init__(self,
+                 client_factory: Callable[[], Any],
+                 data_loader,
+                 num_workers: int,
+                 adapter_options: Optional[Dict[str, Any]] = None):
+        self.num_workers = num_workers
+        self.pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(client_factory, data_loader, adapter_options or {})
+        )
+
+    def evaluate(self, data_batch: List[Any], candidate: Dict[str, str]) -> List[tuple]:
+        from .adapter import ToolCallOutput
+
+        shard_size = -(-len(data_batch) // self.num_workers)
+        futures = [
+            self.pool.submit(_evaluate_shard, data_batch[start:start + shard_size], candidate)
+            for start in range(0, len(data_batch), shard_size)
+        ]
+
+        results = []
+        for future in futures:
+            for output, score, error_message in json.loads(future.result()):
+                results.append((ToolCallOutput(**output), score, error_message))
+        return results
+
+    def close(self):
+        self.pool.shutdown()
@@ -0,0 +1,265 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, TextIO
+
+# Seconds of recent evaluations the live throughput figures are computed over
+RATE_WINDOW_SECONDS = 30.0
+
+
+class RunMetrics:
+    """
+    Thread-safe counters for an optimization run, fed by the adapter and the
+    reflection LM wrapper and read by ProgressDashboard.
+
+    GEPA starts every iteration by evaluating a reflective minibatch with
+    capture_traces=True, so those evaluations mark iteration boundaries. The
+    adapter reports full validation passes (see set_valset) with
+    record_valset_pass; they feed the best score and, since GEPA's num_iters
+    budget counts full validation passes (the seed's included), the ETA.
+    The retry rate is the share of HTTP requests answered with a retryable
+    status (429 or 5xx), which the model clients retry.
+
+    Throughput is reported over the last RATE_WINDOW_SECONDS: evaluations per
+    second counts every instance result, cached ones included, and task calls
+    per second only the results that needed a task-model call.
+    """
+    def __init__(self,
+                 num_iterations: Optional[int] = None,
+                 pool_metrics: Optional[Any] = None,
+                 surrogate: Optional[Any] = None):
+        self.num_iterations = num_iterations
+        # Connection pool counters (http_client.PoolMetrics) of the model clients, if metered
+        self.pool_metrics = pool_metrics
+        # Candidate pre-screening (surrogate.CandidateSurrogate), if enabled
+        self.surrogate = surrogate
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.iteration = 0
+        self.valset_evaluations = 0
+        self.evaluations = 0
+        self.task_errors = 0
+        self.in_flight = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.reflection_calls = 0
+        self.reflection_errors = 0
+        self.best_score: Optional[float] = None
+        # [second, evaluations, task calls] per second of the rate window
+        self._recent: deque = deque()
+
+    def start_iteration(self):
+        with self._lock:
+            self.iteration += 1
+
+    def record_cache(self, hits: int, misses: int):
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+            # Cached results count as evaluations without ever being in flight
+            self.evaluations += hits
+            if hits:
+                self._record_recent(hits, 0)
+
+    def task_calls_started(self, count: int = 1):
+        with self._lock:
+            self.in_flight += count
+
+    def task_call_finished(self, error: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            self.evaluations += 1
+            self._record_recent(1, 1)
+            if error:
+                self.task_errors += 1
+
+    def _record_recent(self, evaluations: int, task_calls: int):
+        second = int(time.monotonic())
+        if self._recent and self._recent[-1][0] == second:
+            self._recent[-1][1] += evaluations
+            self._recent[-1][2] += task_calls
+        else:
+            self._recent.append([second, evaluations, task_calls])
+
+    def _recent_rates(self, elapsed: float) -> tuple:
+        """Evaluations and task calls per second over the rate window (or the run so far, if shorter)."""
+        cutoff = time.monotonic() - RATE_WINDOW_SECONDS
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+        window = min(RATE_WINDOW_SECONDS, elapsed)
+        if window <= 0:
+            return 0.0, 0.0
+        return (sum(bucket[1] for bucket in self._recent) / window,
+                sum(bucket[2] for bucket in self._recent) / window)
+
+    def record_valset_pass(self, scores: List[float]):
+        if not scores:
+            return
+        mean_score = sum(scores) / len(scores)
+        with self._lock:
+            self.valset_evaluations += 1
+            if self.best_score is None or mean_score > self.best_score:
+                self.best_score = mean_score
+
+    def record_reflection(self, error: bool = False):
+        with self._lock:
+            self.reflection_calls += 1
+            if error:
+                self.reflection_errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            elapsed = now - self.started_at
+            live_evaluations = self.evaluations - self.cache_hits
+            lookups = self.cache_hits + self.cache_misses
+            evaluations_per_second, task_calls_per_second = self._recent_rates(elapsed)
+            eta = None
+            if self.num_iterations and self.valset_evaluations:
+                remaining = max(self.num_iterations - self.valset_evaluations, 0)
+                eta = elapsed / self.valset_evaluations * remaining
+
+            snapshot = {
+                "timestamp": now,
+                "elapsed_seconds": elapsed,
+                "iteration": self.iteration,
+                "valset_evaluations": self.valset_evaluations,
+                "num_iterations": self.num_iterations,
+                "evaluations": self.evaluations,
+                "evaluations_per_second": evaluations_per_second,
+                "task_calls_per_second": task_calls_per_second,
+                "in_flight": self.in_flight,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+                "task_errors": self.task_errors,
+                "task_error_rate": self.task_errors / live_evaluations if live_evaluations else 0.0,
+                "reflection_calls": self.reflection_calls,
+                "reflection_errors": self.reflection_errors,
+                "reflection_error_rate": self.reflection_errors / self.reflection_calls if self.reflection_calls else 0.0,
+                "best_score": self.best_score,
+                "eta_seconds": eta,
+            }
+        if self.pool_metrics is not None:
+            pool = self.pool_metrics.snapshot()
+            snapshot["http_pool"] = pool
+            snapshot["retry_rate"] = pool["retryable_responses"] / pool["requests"] if pool["requests"] else 0.0
+        if self.surrogate is not None:
+            snapshot["surrogate"] = self.surrogate.snapshot()
+        return snapshot
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_status(snapshot: Dict[str, Any]) -> str:
+    iterations = snapshot["num_iterations"] or "?"
+    best = "--" if snapshot["best_score"] is None else f"{snapshot['best_score']:.3f}"
+    parts = [
+        f"iter {snapshot['iteration']}",
+        f"valset evals {snapshot['valset_evaluations']}/{iterations}",
+        f"{snapshot['evaluations_per_second']:.1f} evals/s ({snapshot['task_calls_per_second']:.1f} task calls/s)",
+        f"in flight {snapshot['in_flight']}",
+        f"cache {snapshot['cache_hit_rate']:.0%}",
+        f"errors {snapshot['task_error_rate']:.1%} task, {snapshot['reflection_error_rate']:.1%} reflection",
+    ]
+    if "retry_rate" in snapshot:
+        parts.append(f"retries {snapshot['retry_rate']:.1%}")
+    pool = snapshot.get("http_pool")
+    if pool:
+        parts.append(f"conns {pool['connections_opened']} ({pool['reuse_rate']:.0%} reuse)")
+    surrogate = snapshot.get("surrogate")
+    if surrogate and surrogate["screened"]:
+        hit_rate = "--" if surrogate["hit_rate"] is None else f"{surrogate['hit_rate']:.0%}"
+        parts.append(f"skipped {surrogate['skipped']}/{surrogate['screened']} (hit rate {hit_rate})")
+    parts += [
+        f"best {best}",
+        f"elapsed {_format_duration(snapshot['elapsed_seconds'])}",
+        f"ETA {_format_duration(snapshot['eta_seconds'])}",
+    ]
+    return " | ".join(parts)
+
+
+class ProgressDashboard:
+    """
+    Background thread that redraws a one-line status of a RunMetrics every
+    refresh_interval seconds and rewrites metrics_path (atomically) every
+    write_interval seconds. When the stream is not a terminal the status is
+    printed as a new line at write_interval instead of being redrawn, and with
+    show=False only the metrics file is written.
+    """
+    def __init__(self,
+                 metrics: RunMetrics,
+                 metrics_path: Optional[str] = None,
+                 refresh_interval: float = 1.0,
+                 write_interval: float = 5.0,
+                 stream: Optional[TextIO] = None,
+                 show: bool = True):
+        self.metrics = metrics
+        self.metrics_path = metrics_path
+        self.refresh_interval = refresh_interval
+        self.write_interval = write_interval
+        self.stream = stream or sys.stderr
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.show = show
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="progress-dashboard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        snapshot = self.metrics.snapshot()
+        self._write_metrics(snapshot)
+        if self.show:
+            self._render(snapshot, final=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _run(self):
+        last_write = 0.0
+        while not self._stop.wait(self.refresh_interval):
+            snapshot = self.metrics.snapshot()
+            due = time.monotonic() - last_write >= self.write_interval
+            if due:
+                self._write_metrics(snapshot)
+                last_write = time.monotonic()
+            if self.show and (self.interactive or due):
+                self._render(snapshot)
+
+    def _render(self, snapshot: Dict[str, Any], final: bool = False):
+        status = format_status(snapshot)
+        if self.interactive:
+            self.stream.write("\r\033[K" + status + ("\n" if final else ""))
+        else:
+            self.stream.write(status + "\n")
+        self.stream.flush()
+
+    def _write_metrics(self, snapshot: Dict[str, Any]):
+        if not self.metrics_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.metrics_path)), exist_ok=True)
+        tmp_path = self.metrics_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, self.metrics_path)
@@ -0,0 +1,262 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Any, Iterable, Optional
+
+from .eval_cache import candidate_hash
+
+# Files of an exported run archive, in output_dir/archive
+CANDIDATES_FILE = "candidates.parquet"
+EVALUATIONS_FILE = "evaluations.parquet"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class EvaluationLog:
+    """
+    Append-only JSONL log of every instance evaluation in a run, written as
+    the run goes so that it survives an interrupted run. Evaluations of
+    instances in eval_ids are logged with split "eval", all others "train".
+    Results the adapter served from its cache are logged as cached and results
+    copied from a near-duplicate candidate (see CandidateRegistry) as reused,
+    both with no tokens or request time; reused scores are not the
+    candidate's own and comparisons of candidates leave them out.
+    """
+    def __init__(self, path: str, run_id: str, run_started: float, eval_ids: Iterable[str]):
+        self.path = path
+        self.run_id = run_id
+        self.run_started = run_started
+        self.eval_ids = set(eval_ids)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a")
+
+    def append(self,
+               candidate: Dict[str, str],
+               instances: List[Any],
+               outputs: List[Any],
+               scores: List[float],
+               sources: List[Optional[str]],
+               traced: bool):
+        """Log a batch; sources are the adapter's result sources ("cached", "reused" or None for fresh results)."""
+        now = time.time()
+        digest = candidate_hash(candidate)
+        lines = []
+        for instance, output, score, source in zip(instances, outputs, scores, sources):
+            predicted = output.predicted_tool_call or {}
+            lines.append(json.dumps({
+                "run_id": self.run_id,
+                "run_started": self.run_started,
+                "candidate_hash": digest,
+                "split": "eval" if instance.id in self.eval_ids else "train",
+                "traced": traced,
+                "instance_id": instance.id,
+                "expected_tool": instance.expected_tool_call["name"],
+                "predicted_tool": predicted.get("name"),
+                "predicted_arguments": json.dumps(predicted.get("arguments"), sort_keys=True) if predicted else None,
+                "category": output.category,
+                "score": score,
+                "cached": source == "cached",
+                "reused": source == "reused",
+                "prompt_tokens": 0 if source else output.prompt_tokens,
+                "completion_tokens": 0 if source else output.completion_tokens,
+                "latency_seconds": 0.0 if source else output.latency_seconds,
+                "evaluated_at": now,
+            }))
+        with self._lock:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def export_run_archive(output_dir: str, result: Any, log: EvaluationLog) -> Optional[str]:
+    """
+    Write the run's candidates (from the GEPA result) and its evaluation log
+    as Parquet files to output_dir/archive/<run id>, so runs that share an
+    output directory keep their own archives. Evaluations are sorted by split,
+    expected tool and candidate so that row group statistics let queries
+    skip most of a file. Needs pyarrow; without it only the JSONL log is kept.
+    """
+    pa = _pyarrow()
+    if pa is None:
+        print(f"pyarrow is not installed, keeping the evaluation log {log.path} without a Parquet archive")
+        return None
+
+    archive_dir = os.path.join(output_dir, "archive", log.run_id)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    candidates = [{
+        "run_id": log.run_id,
+        "run_started": log.run_started,
+        "candidate_idx": idx,
+        "candidate_hash": candidate_hash(candidate),
+        "parent_idx": next((p for p in (result.parents[idx] or []) if p is not None), None),
+        "valset_score": result.val_aggregate_scores[idx],
+        "is_seed": idx == 0,
+        "is_best": idx == result.best_idx,
+        "system_prompt": candidate.get("system_prompt", ""),
+        "components": json.dumps(candidate, sort_keys=True),
+    } for idx, candidate in enumerate(result.candidates)]
+    pa.parquet.write_table(pa.Table.from_pylist(candidates), os.path.join(archive_dir, CANDIDATES_FILE))
+
+    # The log is appended to by every run in output_dir
+    rows = [row for row in _read_jsonl(log.path) if row["run_id"] == log.run_id]
+    rows.sort(key=lambda r: (r["split"], r["expected_tool"], r["candidate_hash"]))
+    schema = pa.schema([
+        ("run_id", pa.string()), ("run_started", pa.float64()), ("candidate_hash", pa.string()),
+        ("split", pa.string()), ("traced", pa.bool_()), ("instance_id", pa.string()),
+        ("expected_tool", pa.string()), ("predicted_tool", pa.string()), ("predicted_arguments", pa.string()),
+        ("category", pa.string()),
+        ("score", pa.float64()), ("cached", pa.bool_()), ("reused", pa.bool_()),
+        ("prompt_tokens", pa.int64()), ("completion_tokens", pa.int64()),
+        ("latency_seconds", pa.float64()), ("evaluated_at", pa.float64()),
+    ])
+    pa.parquet.write_table(pa.Table.from_pylist(rows, schema=schema), os.path.join(archive_dir, EVALUATIONS_FILE),
+                           row_group_size=10000)
+    return archive_dir
+
+
+def find_archives(paths: List[str]) -> List[str]:
+    """Archive directories under paths (run output directories, archive directories or parents of either)."""
+    found = []
+    for path in paths:
+        for root, _, files in os.walk(path):
+            if CANDIDATES_FILE in files and EVALUATIONS_FILE in files:
+                found.append(root)
+    return sorted(found)
+
+
+def _dataset(archives: List[str], name: str):
+    pa = _pyarrow()
+    if pa is None:
+        raise RuntimeError("Querying run archives needs pyarrow (pip install pyarrow)")
+    return pa.dataset.dataset([os.path.join(a, name) for a in archives], format="parquet")
+
+
+def _and(*conditions):
+    combined = None
+    for condition in conditions:
+        if condition is not None:
+            combined = condition if combined is None else combined & condition
+    return combined
+
+
+def _run_filter(since: Optional[float], until: Optional[float]):
+    import pyarrow.dataset as ds
+
+    return _and(ds.field("run_started") >= since if since is not None else None,
+                ds.field("run_started") < until if until is not None else None)
+
+
+def candidates_beating_seed(archives: List[str],
+                            tool: Optional[str] = None,
+                            since: Optional[float] = None,
+                            until: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Candidates whose mean score on eval examples (expecting tool, if given)
+    beats their run's seed on the same examples. Scores reused from
+    near-duplicate candidates are left out. Only the filtered columns and row
+    groups are read from the archives.
+    """
+    import pyarrow.dataset as ds
+
+    run_filter = _run_filter(since, until)
+    seeds = _dataset(archives, CANDIDATES_FILE).to_table(
+        columns=["run_id", "candidate_hash"], filter=_and(ds.field("is_seed"), run_filter)
+    ).to_pylist()
+    seed_hashes = {row["run_id"]: row["candidate_hash"] for row in seeds}
+
+    evaluation_filter = _and(ds.field("split") == "eval", ~ds.field("traced"), ~ds.field("reused"), run_filter,
+                             ds.field("expected_tool") == tool if tool else None)
+    rows = _dataset(archives, EVALUATIONS_FILE).to_table(
+        columns=["run_id", "candidate_hash", "instance_id", "score"], filter=evaluation_filter
+    ).to_pylist()
+
+    # run -> candidate -> instance -> latest score
+    scores: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for row in rows:
+        scores.setdefault(row["run_id"], {}).setdefault(row["candidate_hash"], {})[row["instance_id"]] = row["score"]
+
+    prompts = {
+        (row["run_id"], row["candidate_hash"]): row
+        for row in _dataset(archives, CANDIDATES_FILE).to_table(
+            columns=["run_id", "candidate_hash", "candidate_idx", "system_prompt"], filter=run_filter
+        ).to_pylist()
+    }
+
+    winners = []
+    for run_id, by_candidate in scores.items():
+        seed = by_candidate.get(seed_hashes.get(run_id))
+        if not seed:
+            continue
+        for digest, instance_scores in by_candidate.items():
+            if digest == seed_hashes[run_id]:
+                continue
+            shared = [i for i in instance_scores if i in seed]
+            if not shared:
+                continue
+            mean = sum(instance_scores[i] for i in shared) / len(shared)
+            seed_mean = sum(seed[i] for i in shared) / len(shared)
+            if mean > seed_mean:
+                candidate = prompts.get((run_id, digest), {})
+                winners.append({
+                    "run_id": run_id,
+                    "candidate_idx": candidate.get("candidate_idx"),
+                    "candidate_hash": digest,
+                    "examples": len(shared),
+                    "score": mean,
+                    "seed_score": seed_mean,
+                    "system_prompt": candidate.get("system_prompt", ""),
+                })
+    return sorted(winners, key=lambda w: w["score"] - w["seed_score"], reverse=True)
+
+
+def compare_runs(archives: List[str],
+                 since: Optional[float] = None,
+                 until: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Per run: candidates, seed and best valset score, task-model tokens and request time."""
+    import pyarrow.dataset as ds
+
+    run_filter = _run_filter(since, until)
+    runs: Dict[str, Dict[str, Any]] = {}
+    for row in _dataset(archives, CANDIDATES_FILE).to_table(
+            columns=["run_id", "run_started", "valset_score", "is_seed", "is_best"], filter=run_filter).to_pylist():
+        run = runs.setdefault(row["run_id"], {"run_id": row["run_id"], "run_started": row["run_started"], "candidates": 0,
+                                              "seed_score": None, "best_score": None, "prompt_tokens": 0,
+                                              "completion_tokens": 0, "request_seconds": 0.0, "evaluations": 0})
+        run["candidates"] += 1
+        if row["is_seed"]:
+            run["seed_score"] = row["valset_score"]
+        if row["is_best"]:
+            run["best_score"] = row["valset_score"]
+
+    totals = _dataset(archives, EVALUATIONS_FILE).to_table(
+        columns=["run_id", "prompt_tokens", "completion_tokens", "latency_seconds"], filter=run_filter
+    ).group_by("run_id").aggregate([
+        ("run_id", "count"), ("prompt_tokens", "sum"), ("completion_tokens", "sum"), ("latency_seconds", "sum")
+    ])
+    for row in totals.to_pylist():
+        run = runs.get(row["run_id"])
+        if run is None:
+            continue
+        run["evaluations"] = row["run_id_count"]
+        run["prompt_tokens"] = row["prompt_tokens_sum"]
+        run["completion_tokens"] = row["completion_tokens_sum"]
+        run["request_seconds"] = row["latency_seconds_sum"]
+    return sorted(runs.values(), key=lambda r: r["run_started"])
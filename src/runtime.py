@@ -0,0 +1,245 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, List, Any, Callable, Optional, Sequence
+
+from .history import HistoryPolicy, HistoryShaper
+from .schema_compiler import compact_prompt, compile_tools
+from .tool_validator import get_validator
+from .tools import get_available_tools, apply_tool_components
+
+# File an optimization run publishes its best candidate to, in output_dir
+PUBLISHED_FILE = "best_candidate.json"
+
+# Compact JSON, as the static request prefix is serialized
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# Conversation summaries a runtime keeps per loaded candidate (see history.HistoryShaper)
+MAX_CACHED_SUMMARIES = 1024
+
+_logger = logging.getLogger(__name__)
+
+
+def publish_candidate(path: str,
+                      candidate: Dict[str, str],
+                      schema_mode: str = "original",
+                      history_policy: Optional[HistoryPolicy] = None,
+                      **metadata) -> str:
+    """
+    Write a candidate for PromptRuntime to load, with the schema mode and
+    history policy it was optimized with and any metadata (scores,
+    significance). The file is replaced atomically from a uniquely named
+    temporary file, so runtimes watching it never read a partial write and
+    concurrent publishers do not clobber each other's writes.
+    """
+    payload = {
+        "candidate": candidate,
+        "schema_mode": schema_mode,
+        "history_policy": asdict(history_policy) if history_policy is not None else None,
+        "published_at": time.time(),
+        **metadata
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=directory, prefix=os.path.basename(path) + ".",
+                                     suffix=".tmp", delete=False) as f:
+        try:
+            json.dump(payload, f, indent=2)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+    return path
+
+
+class ToolCallError(ValueError):
+    """A model response without a valid tool call; errors lists the schema violations, if any."""
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class _Snapshot:
+    """Everything derived from one published candidate, replaced as a whole on reload."""
+    __slots__ = ("mtime", "metadata", "system_prompt", "system_message", "tools", "validator", "history_shaper",
+                 "prefix", "suffix")
+
+    def __init__(self,
+                 payload: Dict[str, Any],
+                 mtime: int,
+                 base_tools: List[Dict[str, Any]],
+                 model: Optional[str],
+                 summarizer: Optional[Callable[[List[Dict[str, str]]], str]],
+                 logger: logging.Logger):
+        # A bare candidate dict (e.g. copied from a GEPA result) is accepted as well
+        candidate = payload["candidate"] if "candidate" in payload else payload
+        schema_mode = payload.get("schema_mode", "original")
+        policy = payload.get("history_policy") if "candidate" in payload else None
+        self.history_shaper = None
+        if policy and policy.get("max_turns") is not None:
+            policy = HistoryPolicy(**policy)
+            if policy.summarize and policy.summarizer == "model" and summarizer is None:
+                logger.warning("%s was optimized with model summaries of long histories, but the runtime "
+                               "has no summarizer; using extractive summaries", policy.describe())
+            self.history_shaper = HistoryShaper(policy, base_tools, summarizer if policy.summarizer == "model" else None,
+                                                max_summaries=MAX_CACHED_SUMMARIES)
+        system_prompt = candidate["system_prompt"]
+        tools = apply_tool_components(candidate, base_tools)
+        if schema_mode != "original":
+            system_prompt = compact_prompt(system_prompt)
+            tools = compile_tools(tools, schema_mode, preserve=candidate)
+
+        self.mtime = mtime
+        self.metadata = {k: v for k, v in payload.items() if k != "candidate"} if "candidate" in payload else {}
+        self.system_prompt = system_prompt
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.tools = tools
+        self.validator = get_validator(tools)
+        # '{"model":...,"messages":[{system message}' and '],"tools":[...],"tool_choice":"required"}',
+        # between which only the conversation turns are serialized per request
+        head = _encode({"model": model} if model else {})[:-1]
+        self.prefix = (head + ("," if model else "") + '"messages":[' + _encode(self.system_message)).encode("utf-8")
+        self.suffix = ('],"tools":' + _encode(tools) + ',"tool_choice":"required"}').encode("utf-8")
+
+
+class PromptRuntime:
+    """
+    Builds production task requests from a published candidate (see
+    publish_candidate) the way the optimizer evaluated it: the candidate's
+    system prompt and tool descriptions, rendered in its schema mode, with
+    conversation histories windowed and summarized by its history policy.
+    A candidate optimized with model summaries (HISTORY_SUMMARIZER=model)
+    needs a summarizer, e.g. history.model_summarizer(client); without one
+    its histories are summarized extractively.
+
+    The tool schemas are loaded and the static part of a request (system
+    message and tools) is built and serialized once per published candidate,
+    so a request only adds the conversation. The published file is checked
+    for a newer version at most every check_interval seconds while requests
+    are built; a new candidate is swapped in as a whole, so concurrent
+    requests see either the old or the new one. A file that fails to load
+    keeps the current candidate in service, and the failure is logged to
+    logger (this module's logger by default).
+    """
+    def __init__(self,
+                 path: str,
+                 model: Optional[str] = None,
+                 check_interval: float = 1.0,
+                 summarizer: Optional[Callable[[List[Dict[str, str]]], str]] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.path = path
+        self.model = model
+        self.check_interval = check_interval
+        self.summarizer = summarizer
+        self.logger = logger or _logger
+        self.reloads = 0
+        self._base_tools = get_available_tools()
+        self._reload_lock = threading.Lock()
+        self._snapshot = self._load()
+        self._next_check = time.monotonic() + check_interval
+
+    def _load(self) -> _Snapshot:
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, "r") as f:
+            payload = json.load(f)
+        return _Snapshot(payload, mtime, self._base_tools, self.model, self.summarizer, self.logger)
+
+    def maybe_reload(self) -> bool:
+        """Load the published candidate if it changed since it was last loaded; returns whether it did."""
+        now = time.monotonic()
+        if now < self._next_check or not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = now + self.check_interval
+            try:
+                if os.stat(self.path).st_mtime_ns == self._snapshot.mtime:
+                    return False
+                self._snapshot = self._load()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.logger.warning("Could not reload %s, keeping the current prompt: %s", self.path, e)
+                return False
+            self.reloads += 1
+            return True
+        finally:
+            self._reload_lock.release()
+
+    @property
+    def system_prompt(self) -> str:
+        return self._snapshot.system_prompt
+
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        return self._snapshot.tools
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Schema mode, history policy, publish time and run metadata of the loaded candidate."""
+        return self._snapshot.metadata
+
+    @staticmethod
+    def _history(snapshot: _Snapshot, conversation: Sequence[Dict[str, str]]) -> List[Dict[str, str]]:
+        conversation = conversation if isinstance(conversation, list) else list(conversation)
+        return snapshot.history_shaper.shape(conversation) if snapshot.history_shaper is not None else conversation
+
+    def build_request(self, conversation: Sequence[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Keyword arguments of a chat completion request for the conversation,
+        shaped by the candidate's history policy. The system message and tools
+        are shared between requests and must not be modified.
+        """
+        self.maybe_reload()
+        snapshot = self._snapshot
+        history = self._history(snapshot, conversation)
+        request = {"messages": [snapshot.system_message, *history], "tools": snapshot.tools,
+                   "tool_choice": "required"}
+        if self.model:
+            request["model"] = self.model
+        return request
+
+    def build_request_body(self, conversation: Sequence[Dict[str, str]]) -> bytes:
+        """JSON body of a chat completion request for the conversation, for clients that post raw bytes."""
+        self.maybe_reload()
+        snapshot = self._snapshot
+        history = self._history(snapshot, conversation)
+        if not history:
+            return snapshot.prefix + snapshot.suffix
+        turns = _encode(history)
+        return b"".join((snapshot.prefix, b",", turns[1:-1].encode("utf-8"), snapshot.suffix))
+
+    def parse_tool_call(self, response: Any) -> Dict[str, Any]:
+        """
+        The first tool call of a chat completion response (a client response
+        object, its JSON body or the parsed dict) as {"name", "arguments"},
+        validated against the tool schemas. Raises ToolCallError if there is
+        no tool call or it is invalid.
+        """
+        if isinstance(response, (bytes, str)):
+            response = json.loads(response)
+        if isinstance(response, dict):
+            choices = response.get("choices") or []
+            tool_calls = (choices[0].get("message") or {}).get("tool_calls") if choices else None
+            if not tool_calls:
+                raise ToolCallError("response contains no tool call")
+            function = tool_calls[0].get("function") or {}
+            name, arguments = function.get("name"), function.get("arguments")
+        else:
+            tool_calls = response.choices[0].message.tool_calls if response.choices else None
+            if not tool_calls:
+                raise ToolCallError("response contains no tool call")
+            name, arguments = tool_calls[0].function.name, tool_calls[0].function.arguments
+
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments else {}
+            except json.JSONDecodeError as e:
+                raise ToolCallError(f"{name}: arguments are not valid JSON: {e}")
+        tool_call = {"name": name, "arguments": arguments}
+        errors = self._snapshot.validator.validate(tool_call)
+        if errors:
+            raise ToolCallError(f"invalid {name} call: " + "; ".join(errors), errors)
+        return tool_call
@@ -0,0 +1,177 @@
+import copy
+import json
+import re
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from .estimate import count_tokens
+from .tools import parse_tool_component, TOOL_COMPONENT_PREFIX
+
+# How tool schemas and the system prompt are serialized into task requests:
+# "original" sends them as written, "short" shortens the descriptions by rule
+# (see shorten_description) and strips trailing whitespace from the prompt.
+# Requests are sent as compact JSON either way, so whitespace and key order
+# in the schemas cost nothing
+SCHEMA_MODES = ("original", "short")
+
+_WHITESPACE = re.compile(r"\s+")
+_LEADING_ARTICLE = re.compile(r"^(?:the|a|an)\s+", re.IGNORECASE)
+# Markers that repeat what the schema's required list already says
+_REQUIRED_MARKER = re.compile(r"\s*[\[(](?:mandatory|required)[\])]", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"the", "a", "an", "of", "or", "and", "for", "to", "that", "this", "is", "be", "can", "in", "with"}
+
+
+def compact_text(text: str) -> str:
+    """Collapse whitespace runs to single spaces and strip the ends."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def compact_prompt(prompt: str) -> str:
+    """Strip trailing whitespace from every line and collapse runs of blank lines."""
+    lines = [line.rstrip() for line in prompt.strip().splitlines()]
+    compacted = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return "\n".join(compacted)
+
+
+def _words(text: str) -> Set[str]:
+    return set(_WORD.findall(text.lower())) - _STOPWORDS
+
+
+def _boilerplate_words(properties: Dict[str, Any]) -> Set[str]:
+    """Words that occur in most of the sibling property descriptions, such as "product" and "service"."""
+    descriptions = [schema.get("description", "") for schema in properties.values() if isinstance(schema, dict)]
+    if len(descriptions) < 3:
+        return set()
+    counts: Dict[str, int] = {}
+    for description in descriptions:
+        for word in _words(description):
+            counts[word] = counts.get(word, 0) + 1
+    return {word for word, count in counts.items() if count > len(descriptions) / 2}
+
+
+def _is_redundant(description: str, name: str, boilerplate: Set[str]) -> bool:
+    """
+    True if a property description only restates the property name, apart
+    from stopwords and boilerplate, e.g. "The delivery terms of the product or service".
+    """
+    words = _words(description) - boilerplate
+    return words <= set(name.lower().split("_"))
+
+
+def shorten_description(description: str, required: bool = False) -> str:
+    """
+    Shorten a description without dropping any of its guidance: collapse
+    whitespace, drop a leading article and a trailing period, and for a
+    required property drop "[mandatory]"-style markers.
+    """
+    text = compact_text(description)
+    if required:
+        text = _REQUIRED_MARKER.sub("", text)
+    text = _LEADING_ARTICLE.sub("", text).rstrip(".")
+    return text[:1].upper() + text[1:]
+
+
+def _shorten_tool(tool: Dict[str, Any], preserve: Set[Tuple[str, Optional[str]]]) -> Dict[str, Any]:
+    tool = copy.deepcopy(tool)
+    function = tool["function"]
+    name = function["name"]
+    if "description" in function and (name, None) not in preserve:
+        function["description"] = shorten_description(function["description"])
+
+    parameters = function.get("parameters", {})
+    properties = parameters.get("properties", {})
+    required = set(parameters.get("required", []))
+    boilerplate = _boilerplate_words(properties)
+    for prop, schema in properties.items():
+        if not isinstance(schema, dict) or "description" not in schema or (name, prop) in preserve:
+            continue
+        # A property description that restates the property name carries no information
+        if _is_redundant(schema["description"], prop, boilerplate):
+            del schema["description"]
+        else:
+            schema["description"] = shorten_description(schema["description"], prop in required)
+    return tool
+
+
+def compile_tools(tools: List[Dict[str, Any]],
+                  mode: str = "short",
+                  preserve: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Return tool definitions rendered for mode (see SCHEMA_MODES). Names,
+    types and required fields are unchanged. In "short" mode descriptions
+    are shortened by shorten_description, and property descriptions that
+    only restate the property name are dropped. Descriptions named by the
+    tool components in preserve (e.g. "tool:submit_request.origin", the
+    components being optimized) are kept as written.
+    """
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unknown schema mode: {mode} (expected one of {', '.join(SCHEMA_MODES)})")
+    if mode == "original":
+        return tools
+    kept = {parse_tool_component(component) for component in preserve if component.startswith(TOOL_COMPONENT_PREFIX)}
+    return [_shorten_tool(tool, kept) for tool in tools]
+
+
+def serialize_tools(tools: List[Dict[str, Any]]) -> str:
+    """Tool definitions as they go over the wire (the HTTP client sends compact JSON)."""
+    return json.dumps(tools, separators=(",", ":"), ensure_ascii=False)
+
+
+def schema_token_report(tools: List[Dict[str, Any]], system_prompt: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Tokens per request spent on each tool schema (and the system prompt) in every schema mode."""
+    report: Dict[str, Dict[str, int]] = {}
+    for mode in SCHEMA_MODES:
+        compiled = compile_tools(tools, mode)
+        counts = {tool["function"]["name"]: count_tokens(serialize_tools([tool])) for tool in compiled}
+        counts["all tools"] = count_tokens(serialize_tools(compiled))
+        if system_prompt is not None:
+            prompt = system_prompt if mode == "original" else compact_prompt(system_prompt)
+            counts["system prompt"] = count_tokens(prompt)
+        report[mode] = counts
+    return report
+
+
+def format_token_report(report: Dict[str, Dict[str, int]]) -> str:
+    rows = list(report["original"])
+    lines = [f"{'':<18}" + "".join(f"{mode:>10}" for mode in report)]
+    for row in rows:
+        lines.append(f"{row:<18}" + "".join(f"{report[mode][row]:>10,}" for mode in report))
+    return "\n".join(lines)
+
+
+def compare_schema_modes(light_client: Any,
+                         data_loader: Any,
+                         instances: List[Any],
+                         system_prompt: str,
+                         modes: List[str] = SCHEMA_MODES,
+                         max_concurrency: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    A/B check: evaluate system_prompt on the same instances once per schema
+    mode and report the mean score, per-request schema tokens and the
+    instances whose score differs from the first mode's.
+    """
+    from .adapter import SourcingConciergeGEPAAdapter
+
+    candidate = {"system_prompt": system_prompt}
+    results: Dict[str, Dict[str, Any]] = {}
+    baseline_scores = None
+    for mode in modes:
+        adapter = SourcingConciergeGEPAAdapter(light_client, None, data_loader,
+                                               max_concurrency=max_concurrency, schema_mode=mode)
+        try:
+            batch = adapter.evaluate(instances, candidate)
+        finally:
+            adapter.close()
+
+        scores = batch.scores
+        if baseline_scores is None:
+            baseline_scores = scores
+        results[mode] = {
+            "mean_score": sum(scores) / len(scores) if scores else 0.0,
+            "schema_tokens": count_tokens(serialize_tools(compile_tools(adapter.tool_definitions, mode))),
+            "changed": [instance.id for instance, score, base in zip(instances, scores, baseline_scores) if score != base],
+        }
+    return results
@@ -0,0 +1,123 @@
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+# Resamples drawn per vectorized chunk, bounding memory to chunk x distinct values
+_CHUNK = 100_000
+
+
+def _chunks(total: int):
+    while total > 0:
+        size = min(_CHUNK, total)
+        yield size
+        total -= size
+
+
+def paired_bootstrap(differences: np.ndarray,
+                     resamples: int,
+                     confidence: float = 0.95,
+                     rng: Optional[np.random.Generator] = None) -> Dict[str, float]:
+    """
+    Percentile bootstrap interval of the mean paired difference.
+
+    Resampling n differences with replacement only matters through how often
+    each distinct value is drawn, so every resample is one multinomial draw
+    over the distinct values (scores take few distinct values) instead of n
+    index draws.
+    """
+    rng = rng or np.random.default_rng(0)
+    n = len(differences)
+    values, counts = np.unique(differences, return_counts=True)
+    means = np.empty(resamples)
+    start = 0
+    for size in _chunks(resamples):
+        draws = rng.multinomial(n, counts / n, size=size)
+        means[start:start + size] = draws @ values / n
+        start += size
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return {"low": float(low), "high": float(high)}
+
+
+def sign_flip_test(differences: np.ndarray,
+                   resamples: int,
+                   rng: Optional[np.random.Generator] = None) -> float:
+    """
+    One-sided p-value of a paired permutation test that the mean difference
+    is above zero. Under the null hypothesis each difference is equally
+    likely to have either sign; the number of positive signs among the c
+    differences of magnitude v is Binomial(c, 1/2), drawn per distinct
+    magnitude.
+    """
+    rng = rng or np.random.default_rng(1)
+    observed = differences.mean()
+    magnitudes, counts = np.unique(np.abs(differences), return_counts=True)
+    at_least = 0
+    for size in _chunks(resamples):
+        positive = rng.binomial(counts, 0.5, size=(size, len(counts)))
+        means = (2 * positive - counts) @ magnitudes / len(differences)
+        at_least += int(np.count_nonzero(means >= observed - 1e-12))
+    return (at_least + 1) / (resamples + 1)
+
+
+def compare_scores(candidate_scores: List[float],
+                   baseline_scores: List[float],
+                   resamples: int = 1_000_000,
+                   confidence: float = 0.95,
+                   seed: int = 0) -> Dict[str, Any]:
+    """Mean improvement of paired per-instance scores, its bootstrap interval and permutation p-value."""
+    differences = np.asarray(candidate_scores, dtype=float) - np.asarray(baseline_scores, dtype=float)
+    result = {
+        "examples": len(differences),
+        "candidate_score": float(np.mean(candidate_scores)) if len(differences) else 0.0,
+        "baseline_score": float(np.mean(baseline_scores)) if len(differences) else 0.0,
+        "improvement": float(differences.mean()) if len(differences) else 0.0,
+    }
+    if len(differences) == 0 or not differences.any():
+        result.update(ci_low=0.0, ci_high=0.0, p_value=1.0)
+        return result
+
+    rng = np.random.default_rng(seed)
+    interval = paired_bootstrap(differences, resamples, confidence, rng)
+    result.update(ci_low=interval["low"], ci_high=interval["high"],
+                  p_value=sign_flip_test(differences, resamples, rng))
+    return result
+
+
+def significance_report(candidate_scores: List[float],
+                        baseline_scores: List[float],
+                        instances: List[Any],
+                        resamples: int = 1_000_000,
+                        confidence: float = 0.95,
+                        alpha: float = 0.05) -> Dict[str, Any]:
+    """
+    Paired comparison of a candidate with the baseline overall and per
+    expected tool. The candidate passes if the lower end of the overall
+    interval is above zero and the permutation p-value is below alpha.
+    """
+    overall = compare_scores(candidate_scores, baseline_scores, resamples, confidence)
+    by_tool: Dict[str, Dict[str, Any]] = {}
+    tools = sorted({instance.expected_tool_call["name"] for instance in instances})
+    for tool in tools:
+        indices = [i for i, instance in enumerate(instances) if instance.expected_tool_call["name"] == tool]
+        by_tool[tool] = compare_scores([candidate_scores[i] for i in indices],
+                                       [baseline_scores[i] for i in indices], resamples, confidence)
+    return {
+        "resamples": resamples,
+        "confidence": confidence,
+        "alpha": alpha,
+        "passed": overall["ci_low"] > 0 and overall["p_value"] < alpha,
+        "overall": overall,
+        "by_tool": by_tool,
+    }
+
+
+def format_significance(report: Dict[str, Any]) -> str:
+    level = f"{report['confidence']:.0%}"
+    lines = []
+    for label, stats in [("overall", report["overall"])] + list(report["by_tool"].items()):
+        lines.append(f"  {label:<16} {stats['candidate_score']:.3f} vs {stats['baseline_score']:.3f} "
+                     f"on {stats['examples']:>4} examples: {stats['improvement']:+.3f} "
+                     f"({level} CI {stats['ci_low']:+.3f} to {stats['ci_high']:+.3f}, p={stats['p_value']:.2g})")
+    verdict = "passes" if report["passed"] else "does not pass"
+    return f"Significance gate: best candidate {verdict} against the seed\n" + "\n".join(lines)
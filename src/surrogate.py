@@ -0,0 +1,203 @@
+import math
+import random
+import re
+from typing import Dict, List, Any, Optional, Sequence
+
+from .estimate import count_tokens
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+FEATURE_NAMES = [
+    "bias",
+    "parent_score",
+    "instance_mean_score",
+    "log_length_ratio",
+    "word_overlap",
+    "tool_mention_delta",
+    "arg_mention_delta",
+    "prompt_kilotokens",
+]
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+
+def _mention_share(words: set, names: Sequence[str]) -> float:
+    """Share of names (tool or argument names) that the prompt mentions, in full or by their parts."""
+    if not names:
+        return 0.0
+    mentioned = sum(1 for name in names if name.lower() in words or set(name.lower().split("_")) <= words)
+    return mentioned / len(names)
+
+
+class RidgeRegressor:
+    """
+    Online ridge regression on a handful of features. Observations only
+    update the normal equations (X'X + ridge * I) w = X'y; the weights are
+    solved again on the next prediction.
+    """
+    def __init__(self, num_features: int, ridge: float = 1.0):
+        self.num_features = num_features
+        self.xtx = [[ridge if i == j else 0.0 for j in range(num_features)] for i in range(num_features)]
+        self.xty = [0.0] * num_features
+        self.count = 0
+        self.squared_error = 0.0
+        self._weights: Optional[List[float]] = None
+
+    def update(self, x: List[float], y: float):
+        # Prequential error: every observation is predicted before it is learnt
+        self.squared_error += (self.predict(x) - y) ** 2
+        for i in range(self.num_features):
+            self.xty[i] += x[i] * y
+            for j in range(self.num_features):
+                self.xtx[i][j] += x[i] * x[j]
+        self.count += 1
+        self._weights = None
+
+    def predict(self, x: List[float]) -> float:
+        if self._weights is None:
+            self._weights = _solve(self.xtx, self.xty)
+        return sum(w * v for w, v in zip(self._weights, x))
+
+    @property
+    def residual_std(self) -> float:
+        return math.sqrt(self.squared_error / self.count) if self.count else 1.0
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Solve a small positive definite system by Gaussian elimination with partial pivoting."""
+    n = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, n + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * n
+    for r in reversed(range(n)):
+        solution[r] = (rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))) / rows[r][r]
+    return solution
+
+
+class CandidateSurrogate:
+    """
+    Cheap local predictor of a child candidate's minibatch scores.
+
+    Every GEPA iteration scores the parent on a minibatch with traces, asks
+    the reflection LM for a child and scores the child on the same minibatch,
+    keeping it only if its score sum beats the parent's. The surrogate
+    predicts the child's per-instance scores from the parent's scores, how
+    each instance has fared so far in the run and how the child's prompt
+    differs from the parent's (length, word overlap, mentions of the expected
+    tool and its arguments). Children predicted to lose clearly are skipped,
+    since GEPA would reject them anyway.
+
+    Skipping starts after min_observations instance scores have been
+    learnt. A fraction audit_rate of the would-be skips is evaluated anyway;
+    the audits give the hit rate (the share of skips that the real scores
+    confirm). While the hit rate is below min_hit_rate every would-be skip
+    is audited, so skipping resumes only once the surrogate earns it back.
+    """
+    def __init__(self,
+                 min_observations: int = 30,
+                 audit_rate: float = 0.2,
+                 min_hit_rate: float = 0.8,
+                 confidence: float = 1.0,
+                 ridge: float = 1.0,
+                 seed: int = 0):
+        self.min_observations = min_observations
+        self.audit_rate = audit_rate
+        self.min_hit_rate = min_hit_rate
+        # Skip only if the predicted sum is this many residual standard deviations below the parent's
+        self.confidence = confidence
+        self.model = RidgeRegressor(len(FEATURE_NAMES), ridge)
+        self._random = random.Random(seed)
+        self._instance_scores: Dict[str, List[float]] = {}
+        self.screened = 0
+        self.skipped = 0
+        self.audits = 0
+        self.audit_hits = 0
+
+    def features(self,
+                 prompt: str,
+                 parent_prompt: str,
+                 instance: Any,
+                 parent_score: float,
+                 tool_arguments: Dict[str, List[str]]) -> List[float]:
+        words, parent_words = _words(prompt), _words(parent_prompt)
+        expected = instance.expected_tool_call
+        arg_names = list(expected.get("arguments", {})) or tool_arguments.get(expected["name"], [])
+        history = self._instance_scores.get(instance.id)
+        tokens, parent_tokens = count_tokens(prompt), count_tokens(parent_prompt)
+        return [
+            1.0,
+            parent_score,
+            sum(history) / len(history) if history else parent_score,
+            math.log((tokens + 1) / (parent_tokens + 1)),
+            len(words & parent_words) / len(words | parent_words) if words or parent_words else 1.0,
+            _mention_share(words, [expected["name"]]) - _mention_share(parent_words, [expected["name"]]),
+            _mention_share(words, arg_names) - _mention_share(parent_words, arg_names),
+            tokens / 1000,
+        ]
+
+    def record_scores(self, instances: List[Any], scores: List[float]):
+        """Remember instance scores of any evaluation, for the per-instance history feature."""
+        for instance, score in zip(instances, scores):
+            self._instance_scores.setdefault(instance.id, []).append(score)
+
+    def predict(self, feature_rows: List[List[float]]) -> List[float]:
+        return [min(max(self.model.predict(x), 0.0), 1.0) for x in feature_rows]
+
+    def learn(self, feature_rows: List[List[float]], scores: List[float]):
+        for x, y in zip(feature_rows, scores):
+            self.model.update(x, y)
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        return self.audit_hits / self.audits if self.audits else None
+
+    @property
+    def trusted(self) -> bool:
+        # Too few audits to judge the surrogate yet
+        if self.audits < 5:
+            return True
+        return self.hit_rate >= self.min_hit_rate
+
+    def should_skip(self, predicted: List[float], parent_scores: List[float]) -> bool:
+        """True if the child is predicted to lose to the parent by a clear margin."""
+        self.screened += 1
+        if self.model.count < self.min_observations:
+            return False
+        margin = self.confidence * self.model.residual_std * math.sqrt(len(predicted))
+        return sum(predicted) + margin <= sum(parent_scores)
+
+    def audit(self) -> bool:
+        """Whether to evaluate a would-be skip anyway, to measure the hit rate."""
+        return not self.trusted or self._random.random() < self.audit_rate
+
+    def record_audit(self, scores: List[float], parent_scores: List[float]):
+        self.audits += 1
+        if sum(scores) <= sum(parent_scores):
+            self.audit_hits += 1
+
+    def record_skip(self):
+        self.skipped += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "screened": self.screened,
+            "skipped": self.skipped,
+            "audits": self.audits,
+            "hit_rate": self.hit_rate,
+            "trusted": self.trusted,
+            "observations": self.model.count,
+        }
+
+    def summary(self) -> str:
+        hit_rate = "n/a" if self.hit_rate is None else f"{self.hit_rate:.0%}"
+        return (f"Surrogate: screened {self.screened} child candidates, skipped {self.skipped}, "
+                f"audited {self.audits} would-be skips (hit rate {hit_rate}), "
+                f"prediction RMSE {self.model.residual_std:.3f} over {self.model.count} instance scores")
@@ -0,0 +1,226 @@
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from .dedup import instance_fingerprint
+from .tool_validator import get_validator
+
+# Vocabularies the conversation templates are expanded from
+PRODUCTS = [
+    {"name": "printed T-shirts", "unit": "T-shirts", "specs": {"material": ["cotton", "polyester", "cotton blend"], "print_type": ["screen print", "embroidery", "DTF"]}},
+    {"name": "office laptops", "unit": "laptops", "specs": {"ram": ["8GB", "16GB", "32GB"], "os": ["Windows", "Linux", "macOS"]}},
+    {"name": "steel pipes", "unit": "metric tons", "specs": {"grade": ["SS304", "SS316", "MS"], "diameter": ["2 inch", "4 inch", "6 inch"]}},
+    {"name": "corrugated boxes", "unit": "boxes", "specs": {"ply": ["3 ply", "5 ply", "7 ply"], "size": ["small", "medium", "large"]}},
+    {"name": "basmati rice", "unit": "kg", "specs": {"grain": ["long grain", "extra long grain"], "packaging": ["25kg bags", "50kg bags"]}},
+    {"name": "LED bulbs", "unit": "bulbs", "specs": {"wattage": ["9W", "12W", "18W"], "colour": ["warm white", "cool daylight"]}},
+    {"name": "event catering", "unit": "guests", "specs": {"cuisine": ["North Indian", "Continental", "Chinese"], "service": ["buffet", "plated"]}},
+    {"name": "office chairs", "unit": "chairs", "specs": {"type": ["ergonomic mesh", "executive leather"], "armrest": ["fixed", "adjustable"]}},
+]
+
+LOCATIONS = [
+    ("HSR Layout, Bengaluru", "India"),
+    ("Andheri East, Mumbai", "India"),
+    ("Gurugram, Haryana", "India"),
+    ("Dubai Marina, Dubai", "UAE"),
+    ("Jurong, Singapore", "Singapore"),
+    ("Manchester", "United Kingdom"),
+    ("Austin, Texas", "USA"),
+]
+
+QUANTITY_RANGE = (1, 5000)
+
+DELIVERY_TERMS = ["within 2 weeks", "by next month", "in 10 days", "as soon as possible", "before the end of the quarter"]
+
+GREETINGS = ["Hi", "Hello", "Hey", "hi there", "Good morning", "yo", "Good afternoon", "Namaste", "Hi team"]
+GREETING_ENDINGS = ["", "!", ".", ", anyone there?", ", I need some help", ", can you help me source something?",
+                    ", is this the sourcing desk?"]
+
+# Ways a buyer opens a request; {product} may include a specification
+REQUEST_PHRASES = [
+    "I want to buy {product}",
+    "I need {product}",
+    "Looking for {product}",
+    "Can you source {product} for us?",
+    "We are planning to order {product}",
+    "please help me find suppliers for {product}",
+]
+
+REPLY_GREETING = "Hello, how can I help you today?"
+
+
+@dataclass
+class ConversationTemplate:
+    name: str
+    weight: float
+    build: Callable[[random.Random], Tuple[List[Dict[str, str]], Dict[str, Any]]]
+
+
+def _pick_order(rng: random.Random) -> Dict[str, Any]:
+    product = rng.choice(PRODUCTS)
+    location, country = rng.choice(LOCATIONS)
+    quantity = rng.randint(*QUANTITY_RANGE)
+    return {
+        "product": product,
+        "location": location,
+        "country": country,
+        "quantity": quantity,
+        "delivery_terms": rng.choice(DELIVERY_TERMS),
+        "specs": {key: rng.choice(values) for key, values in product["specs"].items()},
+        "b2b_or_b2c": "b2b" if quantity >= 100 else "b2c",
+    }
+
+
+def _order_conversation(rng: random.Random, order: Dict[str, Any]) -> List[Dict[str, str]]:
+    product = order["product"]
+    spec_text = ", ".join(order["specs"].values())
+    return [
+        {"role": "user", "content": rng.choice(GREETINGS)},
+        {"role": "assistant", "content": REPLY_GREETING},
+        {"role": "user", "content": f"I want to buy {product['name']}"},
+        {"role": "assistant", "content": f"Noted, to help you find the best sellers, can you please tell me 1) where should we deliver your order 2) when do you need it by? 3) how many {product['unit']} do you need?"},
+        {"role": "user", "content": f"{order['location']}, {order['delivery_terms']}, {order['quantity']} {product['unit']}"},
+        {"role": "assistant", "content": f"Got it. Do you have any preferences for {' and '.join(k.replace('_', ' ') for k in order['specs'])}?"},
+        {"role": "user", "content": spec_text},
+    ]
+
+
+def _submit_request_call(order: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": "submit_request",
+        "arguments": {
+            "origin": order["country"],
+            "documents": [],
+            "b2b_or_b2c": order["b2b_or_b2c"],
+            "delivery_terms": order["delivery_terms"],
+            "specifications": order["specs"],
+            "delivery_location": f"{order['location']}, {order['country']}",
+            "quantity_or_scope": f"{order['quantity']} {order['product']['unit']}",
+            "product_or_service": order["product"]["name"],
+        }
+    }
+
+
+def _greeting(rng: random.Random):
+    history = [{"role": "user", "content": rng.choice(GREETINGS) + rng.choice(GREETING_ENDINGS)}]
+    return history, {"name": "reply_to_buyer", "arguments": {"text": REPLY_GREETING}}
+
+
+def _clarification(rng: random.Random):
+    """A first request that leaves some of location, timing and quantity open; the reply asks for those."""
+    order = _pick_order(rng)
+    product = order["product"]
+    product_text = product["name"]
+    if rng.random() < 0.5:
+        product_text = f"{rng.choice(list(order['specs'].values()))} {product_text}"
+    details = {
+        "location": (f"delivered to {order['location']}", "where should we deliver your order"),
+        "timing": (order["delivery_terms"], "when do you need it by?"),
+        "quantity": (f"{order['quantity']} {product['unit']}", f"how many {product['unit']} do you need?"),
+    }
+    given = rng.sample(list(details), rng.randint(0, 2))
+    request = rng.choice(REQUEST_PHRASES).format(product=product_text)
+    if given:
+        request += ", " + ", ".join(details[key][0] for key in given)
+
+    history = [{"role": "user", "content": request}]
+    if rng.random() < 0.5:
+        history = [
+            {"role": "user", "content": rng.choice(GREETINGS)},
+            {"role": "assistant", "content": REPLY_GREETING},
+        ] + history
+    questions = [details[key][1] for key in details if key not in given]
+    text = "Noted, to help you find the best sellers, can you please tell me " + " ".join(
+        f"{i}) {question}" for i, question in enumerate(questions, 1))
+    return history, {"name": "reply_to_buyer", "arguments": {"text": text}}
+
+
+def _submit(rng: random.Random):
+    order = _pick_order(rng)
+    return _order_conversation(rng, order), _submit_request_call(order)
+
+
+def _cancel(rng: random.Random):
+    order = _pick_order(rng)
+    request_id = f"REQ_{rng.randrange(10**8, 10**9)}_{rng.randrange(1, 100)}"
+    history = _order_conversation(rng, order) + [
+        {"role": "assistant", "content": f"I have submitted your request for {order['product']['name']}. Your request id is: {request_id}"},
+        {"role": "user", "content": rng.choice(["please cancel the request", "I changed my mind, cancel it", "cancel my order"])},
+    ]
+    return history, {
+        "name": "cancel_request",
+        "arguments": {
+            "content": f"I have cancelled your request for {order['product']['name']}.",
+            "request_id": request_id,
+        }
+    }
+
+
+TEMPLATES = [
+    # Greetings have few distinct rows, so they are kept rare
+    ConversationTemplate("greeting", 0.05, _greeting),
+    ConversationTemplate("clarification", 0.3, _clarification),
+    ConversationTemplate("submit_request", 0.45, _submit),
+    ConversationTemplate("cancel_request", 0.2, _cancel),
+]
+
+
+def generate_shard(shard_index: int, num_rows: int, output_dir: str, seed: int = 0) -> Tuple[int, bytes]:
+    """
+    Generate one shard of synthetic rows into output_dir. Returns the number of
+    rows written and their instance fingerprints (see dedup.instance_fingerprint),
+    packed as 16 bytes each. Raises ValueError if a template produces an
+    expected tool call that fails schema validation.
+    """
+    rng = random.Random(seed * 1_000_003 + shard_index)
+    validator = get_validator()
+    weights = [t.weight for t in TEMPLATES]
+    path = os.path.join(output_dir, f"synthetic-{shard_index:05d}.jsonl")
+
+    written = 0
+    fingerprints = bytearray()
+    with open(path, "w", buffering=1 << 20) as f:
+        for i in range(num_rows):
+            template = rng.choices(TEMPLATES, weights)[0]
+            history, expected_tool_call = template.build(rng)
+            errors = validator.validate(expected_tool_call)
+            if errors:
+                # Every template is meant to produce valid labels, so this is a template bug
+                raise ValueError(f"template {template.name!r} produced an invalid tool call: " + "; ".join(errors))
+            f.write(json.dumps({
+                "id": f"synth_{seed}_{shard_index}_{i}",
+                "history": history,
+                "expected_tool_call": expected_tool_call
+            }) + "\n")
+            written += 1
+            fingerprints += bytes.fromhex(instance_fingerprint(history, expected_tool_call))
+    return written, bytes(fingerprints)
+
+
+def generate_synthetic_dataset(output_dir: str,
+                               num_rows: int,
+                               num_shards: int = 8,
+                               num_workers: Optional[int] = None,
+                               seed: int = 0) -> Tuple[int, int]:
+    """
+    Expand the conversation templates into num_rows labelled rows, streamed to
+    num_shards JSONL files in output_dir by a pool of worker processes.
+    Output is deterministic for a given seed and shard count. Returns the
+    number of rows written and how many of them are unique; the loader drops
+    the duplicates (see dataset.SourcingDatasetLoader).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    num_shards = max(1, min(num_shards, num_rows))
+    rows_per_shard = [num_rows // num_shards + (1 if i < num_rows % num_shards else 0) for i in range(num_shards)]
+
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        futures = [pool.submit(generate_shard, i, rows, output_dir, seed) for i, rows in enumerate(rows_per_shard)]
+        written = 0
+        unique = set()
+        for future in futures:
+            rows, fingerprints = future.result()
+            written += rows
+            unique.update(fingerprints[i:i + 16] for i in range(0, len(fingerprints), 16))
+    return written, len(unique)
@@ -0,0 +1,132 @@
+import hashlib
+import json
+from typing import Dict, List, Any, Callable, Optional
+
+from .tools import get_available_tools
+
+# A compiled check appends error messages for the value at the given path
+Check = Callable[[Any, str, List[str]], None]
+
+_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+def _compile(schema: Dict[str, Any]) -> Check:
+    """Compile a JSON schema (the subset used by tool definitions) into a check function."""
+    checks: List[Check] = []
+
+    expected_type = schema.get("type")
+    if expected_type is not None:
+        types = expected_type if isinstance(expected_type, list) else [expected_type]
+        python_types = tuple(t for name in types for t in _TYPES.get(name, (object,)))
+        # bool is a subclass of int but is not a valid integer or number
+        reject_bool = "boolean" not in types
+
+        def check_type(value, path, errors):
+            if not isinstance(value, python_types) or (reject_bool and isinstance(value, bool)):
+                errors.append(f"{path}: expected {'/'.join(types)}, got {type(value).__name__}")
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {allowed}")
+        checks.append(check_enum)
+
+    if "properties" in schema or "required" in schema:
+        properties = {name: _compile(sub) for name, sub in schema.get("properties", {}).items()}
+        required = list(schema.get("required", []))
+        allow_unknown = schema.get("additionalProperties", False) is not False
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required field '{name}'")
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    check(item, f"{path}.{name}", errors)
+                elif not allow_unknown:
+                    errors.append(f"{path}: unknown field '{name}'")
+        checks.append(check_object)
+
+    if "items" in schema:
+        check_item = _compile(schema["items"])
+
+        def check_array(value, path, errors):
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    check_item(item, f"{path}[{i}]", errors)
+        checks.append(check_array)
+
+    def check(value, path, errors):
+        for c in checks:
+            c(value, path, errors)
+    return check
+
+
+def _strip_descriptions(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_descriptions(v) for k, v in value.items() if k != "description"}
+    if isinstance(value, list):
+        return [_strip_descriptions(v) for v in value]
+    return value
+
+
+def schema_hash(tools: List[Dict[str, Any]]) -> str:
+    """
+    Hash of the structural part of the tool schemas. Descriptions are left out,
+    so candidates that only rewrite tool descriptions share a validator.
+    """
+    payload = json.dumps(_strip_descriptions(tools), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ToolCallValidator:
+    """Validates tool calls against the JSON schemas of the tool definitions."""
+    def __init__(self, tools: List[Dict[str, Any]]):
+        self._checks: Dict[str, Check] = {
+            tool["function"]["name"]: _compile(tool["function"].get("parameters", {"type": "object"}))
+            for tool in tools
+        }
+
+    def validate(self, tool_call: Dict[str, Any]) -> List[str]:
+        """Return the schema violations of a {"name", "arguments"} tool call (empty if valid)."""
+        name = tool_call.get("name")
+        check = self._checks.get(name)
+        if check is None:
+            return [f"unknown tool '{name}'"]
+
+        arguments = tool_call.get("arguments", {})
+        if not isinstance(arguments, dict):
+            return [f"{name}: arguments must be an object, got {type(arguments).__name__}"]
+
+        errors: List[str] = []
+        check(arguments, name, errors)
+        return errors
+
+
+_validators: Dict[str, ToolCallValidator] = {}
+
+
+def get_validator(tools: Optional[List[Dict[str, Any]]] = None) -> ToolCallValidator:
+    """Return the compiled validator for the given tool definitions, compiling it once per schema hash."""
+    if tools is None:
+        tools = get_available_tools()
+    key = schema_hash(tools)
+    validator = _validators.get(key)
+    if validator is None:
+        validator = ToolCallValidator(tools)
+        _validators[key] = validator
+    return validator
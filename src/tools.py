@@ -1,4 +1,8 @@
-from typing import Dict, Any, List
+import copy
+from typing import Dict, Any, List, Optional, Tuple
+
+
+TOOL_COMPONENT_PREFIX = "tool:"
 
 
 def get_available_tools() -> List[Dict[str, Any]]:
@@ -111,4 +115,53 @@ def get_tool_names() -> List[str]:
     """
     Returns just the names of available tools.
     """
-    return [tool["function"]["name"] for tool in get_available_tools()]
\ No newline at end of file
+    return [tool["function"]["name"] for tool in get_available_tools()]
+
+def get_tool_components(tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, str]:
+    """
+    Returns the optimizable description texts of the tools keyed by component name.
+    
+    Tool descriptions are named "tool:<tool_name>" and parameter descriptions
+    "tool:<tool_name>.<parameter>".
+    """
+    components = {}
+    for tool in tools if tools is not None else get_available_tools():
+        function = tool["function"]
+        components[f"{TOOL_COMPONENT_PREFIX}{function['name']}"] = function.get("description", "")
+        for param_name, param_info in function["parameters"].get("properties", {}).items():
+            if "description" in param_info:
+                components[f"{TOOL_COMPONENT_PREFIX}{function['name']}.{param_name}"] = param_info["description"]
+    return components
+
+
+def parse_tool_component(component: str) -> Tuple[str, Optional[str]]:
+    """
+    Splits a tool component name into (tool_name, parameter), parameter being
+    None for the tool description itself.
+    """
+    tool_name, _, param_name = component[len(TOOL_COMPONENT_PREFIX):].partition(".")
+    return tool_name, param_name or None
+
+
+def apply_tool_components(candidate: Dict[str, str],
+                          tools: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Returns a copy of the tool definitions with the descriptions replaced by the
+    tool components present in the candidate.
+    """
+    tools = copy.deepcopy(tools if tools is not None else get_available_tools())
+    functions = {tool["function"]["name"]: tool["function"] for tool in tools}
+    
+    for component, text in candidate.items():
+        if not component.startswith(TOOL_COMPONENT_PREFIX):
+            continue
+        tool_name, param_name = parse_tool_component(component)
+        function = functions.get(tool_name)
+        if function is None:
+            continue
+        if param_name is None:
+            function["description"] = text
+        elif param_name in function["parameters"].get("properties", {}):
+            function["parameters"]["properties"][param_name]["description"] = text
+    
+    return tools
@@ -0,0 +1,71 @@
+import json
+import os
+import struct
+import zlib
+from typing import Dict, Any, Optional
+
+_LENGTH = struct.Struct(">I")
+
+
+class TraceStore:
+    """
+    Append-only store of compressed evaluation traces.
+
+    Each trace is written as a length-prefixed zlib-compressed JSON record and
+    identified by its byte offset, so no per-trace index has to be kept in
+    memory. Without a path the compressed records are kept in an in-memory
+    buffer instead of a file.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._buffer = bytearray()
+        self._writer = None
+        self._reader = None
+        self._dirty = False
+
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._writer = open(path, "ab")
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Append a trace record and return its id."""
+        data = zlib.compress(json.dumps(record).encode("utf-8"))
+
+        if self.path is None:
+            trace_id = len(self._buffer)
+            self._buffer += _LENGTH.pack(len(data)) + data
+        else:
+            trace_id = self._writer.tell()
+            self._writer.write(_LENGTH.pack(len(data)) + data)
+            self._dirty = True
+
+        return trace_id
+
+    def get(self, trace_id: int) -> Dict[str, Any]:
+        """Read back the trace record with the given id."""
+        if self.path is None:
+            (length,) = _LENGTH.unpack_from(self._buffer, trace_id)
+            start = trace_id + _LENGTH.size
+            data = bytes(self._buffer[start:start + length])
+        else:
+            self.flush()
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+            self._reader.seek(trace_id)
+            (length,) = _LENGTH.unpack(self._reader.read(_LENGTH.size))
+            data = self._reader.read(length)
+
+        return json.loads(zlib.decompress(data))
+
+    def flush(self):
+        if self._dirty:
+            self._writer.flush()
+            self._dirty = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
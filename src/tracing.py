@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopTracer:
+    """Default tracer: every span is the same shared object that records nothing."""
+    enabled = False
+
+    def span(self, name: str, **attributes) -> _NoopSpan:
+        return _NOOP_SPAN
+
+
+class Span:
+    def __init__(self, tracer: "ChromeTracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._record(self, time.perf_counter_ns())
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class ChromeTracer:
+    """
+    Records spans in memory and exports them in the Chrome trace event format,
+    which chrome://tracing, Perfetto and speedscope open as a flame graph.
+    Span attributes end up in each event's "args".
+    """
+    enabled = True
+
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def span(self, name: str, **attributes) -> Span:
+        return Span(self, name, attributes)
+
+    def _record(self, span: Span, end_ns: int):
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": (span.start_ns - self._origin_ns) / 1000,
+            "dur": (end_ns - span.start_ns) / 1000,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+            "args": span.attributes,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def export(self, path: str):
+        with self._lock:
+            events = list(self._events)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+
+_tracer = NoopTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Any]):
+    """Install a tracer for the process; None restores the no-op tracer."""
+    global _tracer
+    _tracer = tracer if tracer is not None else NoopTracer()
+
+
+def usage_attributes(response: Any) -> Dict[str, Any]:
+    """Token counts from a chat completion response, if the provider reported them."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import re
+from collections.abc import Sequence
+from dataclasses import replace
+from typing import Dict, List, Any, Tuple
+
+from .dataset import ChatDataInstance
+from .dedup import instance_fingerprint
+
+# Assistant turns that narrate a tool action ("let me cancel your request",
+# "your request id is ...") rather than reply; the labelled call there is the action
+_ACTION_NARRATION = re.compile(
+    r"\b(?:let me|i will|i'll|i am|i'm|i have|i've)\s+(?:now\s+)?(?:submit|cancel)\w*"
+    r"|\b(?:submitting|cancell?ing)\s+your\s+request|\brequest id is\b",
+    re.IGNORECASE
+)
+
+
+class HistoryView(Sequence):
+    """
+    The first end turns of a shared conversation buffer. Instances cut from
+    the same conversation reference one buffer instead of copying its turns.
+    """
+    __slots__ = ("buffer", "end")
+
+    def __init__(self, buffer: List[Dict[str, str]], end: int):
+        self.buffer = buffer
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.buffer[i] for i in range(*index.indices(self.end))]
+        if index < 0:
+            index += self.end
+        if not 0 <= index < self.end:
+            raise IndexError("history index out of range")
+        return self.buffer[index]
+
+    def __iter__(self):
+        for i in range(self.end):
+            yield self.buffer[i]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Sequence) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"HistoryView({self.end} of {len(self.buffer)} turns)"
+
+
+def _prefix_digests(history: List[Dict[str, str]]) -> List[str]:
+    """Digest of every prefix of history, element k covering its first k + 1 turns."""
+    digest = hashlib.sha256()
+    digests = []
+    for turn in history:
+        digest.update(json.dumps([turn.get("role"), turn.get("content")]).encode("utf-8"))
+        digests.append(digest.copy().hexdigest()[:16])
+    return digests
+
+
+def expand_turns(instances: List[ChatDataInstance]) -> Tuple[List[ChatDataInstance], int]:
+    """
+    Per-turn view of a dataset. Histories that are prefixes of a longer
+    conversation in the dataset become views into that conversation's
+    buffer, and every assistant reply inside a conversation (an assistant
+    turn that answers a buyer turn) becomes an instance of its own, expecting
+    reply_to_buyer with that reply, unless a labelled row already covers
+    that history. Assistant turns that narrate a tool action, such as
+    "let me cancel your request", are skipped: the call at that point was
+    the action, not a reply.
+
+    Returns the instances (the labelled ones first, in their order) and the
+    number of instances added from intermediate turns.
+    """
+    buffers: Dict[str, Tuple[List[Dict[str, str]], str]] = {}
+    views = {}
+    for instance in sorted(instances, key=lambda i: -len(i.history)):
+        if not instance.history:
+            continue
+        digests = _prefix_digests(instance.history)
+        owner = buffers.get(digests[-1])
+        if owner is None:
+            owner = (list(instance.history), instance.id)
+            for digest in digests:
+                buffers.setdefault(digest, owner)
+        views[instance.id] = HistoryView(owner[0], len(instance.history))
+
+    expanded = [replace(instance, history=views.get(instance.id, instance.history)) for instance in instances]
+    labelled = {_prefix_digests(instance.history)[-1] for instance in instances if instance.history}
+
+    added = 0
+    seen_buffers = set()
+    for buffer, root_id in buffers.values():
+        if id(buffer) in seen_buffers:
+            continue
+        seen_buffers.add(id(buffer))
+        digests = _prefix_digests(buffer)
+        for end in range(1, len(buffer)):
+            turn = buffer[end]
+            if turn.get("role") != "assistant" or buffer[end - 1].get("role") != "user":
+                continue
+            if digests[end - 1] in labelled or _ACTION_NARRATION.search(turn.get("content", "")):
+                continue
+            history = HistoryView(buffer, end)
+            expected = {"name": "reply_to_buyer", "arguments": {"text": turn.get("content", "")}}
+            expanded.append(ChatDataInstance(
+                id=f"{root_id}#turn{end}",
+                history=history,
+                expected_tool_call=expected,
+                fingerprint=instance_fingerprint(list(history), expected)
+            ))
+            labelled.add(digests[end - 1])
+            added += 1
+    return expanded, added
+
+
+def prefix_order_key(instance: Any) -> Tuple:
+    """
+    Sort key that puts instances sharing a conversation prefix next to each
+    other, shorter prefixes first, so consecutive requests can be served from
+    the provider's prompt cache.
+    """
+    return tuple((turn.get("role"), turn.get("content")) for turn in instance.history)
@@ -0,0 +1,63 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.adapter import SourcingConciergeGEPAAdapter
+from src.dataset import SourcingDatasetLoader
+from src.mock_client import MockLMClient
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+CANDIDATE = {"system_prompt": "You are a sourcing concierge. Call exactly one tool."}
+
+
+class CancelFailingClient(MockLMClient):
+    """Mock client whose requests fail whenever the buyer asks to cancel."""
+    def create(self, messages, tools=None, n=1, **kwargs):
+        if "cancel" in messages[-1].get("content", "").lower():
+            raise RuntimeError("provider unavailable")
+        return super().create(messages, tools=tools, n=n, **kwargs)
+
+
+@pytest.fixture
+def data_loader(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path / "data")
+    return SourcingDatasetLoader(str(tmp_path / "data"), persist_fingerprints=False)
+
+
+def evaluate(data_loader, batch, client_factory, num_workers):
+    adapter = SourcingConciergeGEPAAdapter(client_factory(), None, data_loader, num_workers=num_workers,
+                                           light_client_factory=client_factory if num_workers else None)
+    try:
+        return [
+            (output.predicted_tool_call, output.category, score, error_message, source)
+            for output, score, error_message, source in adapter.evaluate_instances(batch, CANDIDATE)
+        ]
+    finally:
+        adapter.close()
+
+
+@pytest.mark.parametrize("client_factory", [MockLMClient, CancelFailingClient])
+def test_sharded_scores_match_in_process(data_loader, client_factory):
+    batch = data_loader.load_dataset("eval")
+
+    in_process = evaluate(data_loader, batch, client_factory, num_workers=0)
+    sharded = evaluate(data_loader, batch, client_factory, num_workers=3)
+
+    assert sharded == in_process
+    assert len(sharded) == len(batch)
+
+
+def test_worker_errors_are_reported_per_instance(data_loader):
+    batch = data_loader.load_dataset("eval")
+    cancels = [i for i, instance in enumerate(batch) if "cancel" in instance.history[-1]["content"].lower()]
+    assert cancels
+
+    results = evaluate(data_loader, batch, CancelFailingClient, num_workers=2)
+
+    for i, (predicted, category, score, error_message, _) in enumerate(results):
+        if i in cancels:
+            assert (predicted, category, score, error_message) == (None, "error", 0.0, "Model call failed: provider unavailable")
+        else:
+            assert error_message is None
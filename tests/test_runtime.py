@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+
+import pytest
+
+from src.history import HistoryPolicy, SUMMARY_PREFIX
+from src.runtime import PromptRuntime, ToolCallError, publish_candidate
+
+CONVERSATION = [
+    {"role": "user", "content": "Hi"},
+    {"role": "assistant", "content": "Hello, how can I help you today?"},
+    {"role": "user", "content": "I want to buy office chairs"},
+    {"role": "assistant", "content": "Where should we deliver them, and how many do you need?"},
+    {"role": "user", "content": "Berlin, 250 chairs"},
+    {"role": "assistant", "content": "Noted. Any preference for the type of chair?"},
+    {"role": "user", "content": "Ergonomic mesh please, nothing too fancy at all."},
+]
+
+
+def tool_call_response(name, arguments):
+    return {"choices": [{"message": {"role": "assistant", "content": None, "tool_calls": [
+        {"id": "call_0", "type": "function", "function": {"name": name, "arguments": arguments}}
+    ]}}]}
+
+
+@pytest.fixture
+def published(tmp_path):
+    return publish_candidate(str(tmp_path / "best_candidate.json"), {"system_prompt": "You are a concierge."})
+
+
+@pytest.mark.parametrize("model", [None, "gpt-4o-mini"])
+@pytest.mark.parametrize("turns", [0, 1, len(CONVERSATION)])
+def test_request_body_matches_serialized_request(published, model, turns):
+    runtime = PromptRuntime(published, model=model)
+    conversation = CONVERSATION[:turns]
+
+    body = runtime.build_request_body(conversation)
+
+    assert json.loads(body) == json.loads(json.dumps(runtime.build_request(conversation)))
+
+
+def test_published_history_policy_shapes_requests(tmp_path):
+    path = publish_candidate(str(tmp_path / "best_candidate.json"), {"system_prompt": "You are a concierge."},
+                             history_policy=HistoryPolicy(max_turns=2, pin_slots=False))
+    runtime = PromptRuntime(path)
+
+    messages = runtime.build_request(CONVERSATION)["messages"]
+
+    assert runtime.metadata["history_policy"]["max_turns"] == 2
+    assert messages[1]["content"].startswith(SUMMARY_PREFIX)
+    assert messages[2:] == CONVERSATION[-2:]
+    assert json.loads(runtime.build_request_body(CONVERSATION))["messages"] == messages
+
+
+def test_reload_swaps_in_a_newly_published_candidate(published):
+    runtime = PromptRuntime(published, check_interval=0.0)
+    assert not runtime.maybe_reload()
+
+    publish_candidate(published, {"system_prompt": "You are a new concierge."}, schema_mode="short")
+    os.utime(published, ns=(0, runtime._snapshot.mtime + 1))
+
+    assert runtime.maybe_reload()
+    assert runtime.reloads == 1
+    assert runtime.system_prompt == "You are a new concierge."
+    assert runtime.metadata["schema_mode"] == "short"
+
+
+def test_reload_failure_keeps_the_current_candidate(published, caplog):
+    runtime = PromptRuntime(published, check_interval=0.0)
+    with open(published, "w") as f:
+        f.write("{not json")
+
+    with caplog.at_level(logging.WARNING, logger="src.runtime"):
+        assert not runtime.maybe_reload()
+
+    assert runtime.system_prompt == "You are a concierge."
+    assert "keeping the current prompt" in caplog.text
+
+
+def test_publish_leaves_no_temporary_files(tmp_path):
+    path = str(tmp_path / "best_candidate.json")
+    publish_candidate(path, {"system_prompt": "a"})
+    publish_candidate(path, {"system_prompt": "b"})
+
+    assert os.listdir(tmp_path) == ["best_candidate.json"]
+
+
+def test_parse_tool_call_accepts_a_valid_call(published):
+    runtime = PromptRuntime(published)
+    response = tool_call_response("reply_to_buyer", json.dumps({"text": "How many chairs?"}))
+
+    expected = {"name": "reply_to_buyer", "arguments": {"text": "How many chairs?"}}
+    assert runtime.parse_tool_call(response) == expected
+    assert runtime.parse_tool_call(json.dumps(response)) == expected
+
+
+@pytest.mark.parametrize("response, message", [
+    ({"choices": []}, "no tool call"),
+    ({"choices": [{"message": {"role": "assistant", "content": "Hi"}}]}, "no tool call"),
+    (tool_call_response("reply_to_buyer", "{not json"), "not valid JSON"),
+    (tool_call_response("reply_to_buyer", json.dumps({"message": "Hi"})), "invalid reply_to_buyer call"),
+    (tool_call_response("order_pizza", "{}"), "invalid order_pizza call"),
+])
+def test_parse_tool_call_rejects_invalid_responses(published, response, message):
+    runtime = PromptRuntime(published)
+
+    with pytest.raises(ToolCallError, match=message) as error:
+        runtime.parse_tool_call(response)
+
+    if message.startswith("invalid"):
+        assert error.value.errors
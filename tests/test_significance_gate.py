@@ -0,0 +1,28 @@
+import shutil
+from pathlib import Path
+
+from config.config import DEFAULT_INITIAL_PROMPT
+from src import optimize
+from src.mock_client import MockLMClient
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def test_gate_compares_against_the_seeds_own_scores(tmp_path, monkeypatch):
+    gates = []
+    monkeypatch.setattr(optimize, "_significance_gate",
+                        lambda best, seed, *args: gates.append((list(best), list(seed))) or False)
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+
+    result = optimize.optimize_sourcing_prompt(
+        str(data_dir), MockLMClient(noise=0.3), MockLMClient(), DEFAULT_INITIAL_PROMPT,
+        num_iterations=2, output_dir=str(tmp_path / "results"), show_progress=False,
+        archive_run=False, significance_resamples=1000
+    )
+
+    best_scores, seed_scores = gates[0]
+    # GEPA stores the seed's valset mean before the run raises its Pareto front in place
+    assert sum(seed_scores) / len(seed_scores) == result.val_aggregate_scores[0]
+    assert sum(best_scores) / len(best_scores) == result.val_aggregate_scores[result.best_idx]
+    assert sum(result.val_subscores[0]) > sum(seed_scores)